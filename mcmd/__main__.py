@@ -13,12 +13,14 @@ if sys.version_info < MIN_PYTHON:
 
 import logging
 import signal
+from pathlib import Path
 
-from mcmd.core import update_checker, store
+from mcmd.core import update_checker, store, startup_profiler, metrics
 from mcmd.core.context.base_context import Context
 from mcmd.args.errors import ArgumentSyntaxError
 from mcmd.core.context.home_context import HomeContext
 from mcmd.args.parser import parse_args
+from mcmd.core.errors import McmdError
 from mcmd.config.loader import load_config
 from mcmd.in_out import in_out
 from mcmd.in_out.in_out import set_debug
@@ -43,11 +45,30 @@ def start(argv, context: Context):
         setattr(args, 'arg_string', ' '.join(argv[1:]))
         set_log_level(args)
 
-        args.func(args)
+        if args.profile_startup:
+            startup_profiler.profile([arg for arg in argv[1:] if arg != '--profile-startup'])
+            return 0
+
+        if args.stats or args.trace:
+            metrics.enable()
+        try:
+            args.func(args)
+        finally:
+            _report_metrics(args)
 
         return 0
 
 
+def _report_metrics(args):
+    if args.stats:
+        metrics.print_summary()
+    if args.trace:
+        try:
+            metrics.write_trace(Path(args.trace))
+        except McmdError as e:
+            in_out.error(e.message)
+
+
 def _parse_args(argv):
     try:
         return parse_args(argv[1:])
@@ -1,18 +1,20 @@
 import argparse
-
-import pkg_resources
+import importlib
+from typing import List, Optional
 
 from mcmd.args._formatter import GroupedHelpFormatter, list_subcommands_in_help
 from mcmd.args._raising_parser import RaisingArgumentParser
-# Import all commands:
-# noinspection PyUnresolvedReferences
-from mcmd.commands import *
-from mcmd.commands import get_argument_adders
-from mcmd.core.command import CommandType
+from mcmd.commands import _manifest
+from mcmd.commands._registry import get_argument_adder
+from mcmd.core import distribution
 
 
 # noinspection PyProtectedMember
-def create_parser():
+def create_parser(command: Optional[str] = None):
+    """
+    Creates the argument parser. Only the arguments of the given command are added (which means that only the module of
+    that command is imported), the other commands are listed by name and help string only.
+    """
     parser = RaisingArgumentParser(prog='mcmd',
                                    usage=argparse.SUPPRESS,
                                    formatter_class=GroupedHelpFormatter,
@@ -33,6 +35,18 @@ def create_parser():
     parser.add_argument('--verbose', '-v',
                         action='count',
                         help='print verbose messages')
+    parser.add_argument('--stats',
+                        action='store_true',
+                        help='show how long the command and its HTTP requests took when the command has finished')
+    parser.add_argument('--trace',
+                        type=str,
+                        metavar='FILE',
+                        help='write the timings of the command and its HTTP requests to a file: a Chrome trace if the '
+                             'file name ends with .json, JSON Lines otherwise')
+    parser.add_argument('--profile-startup',
+                        action='store_true',
+                        help='show how long it takes to start the (optionally) given command, and which imports '
+                             'take the most time')
     parser.add_argument('--version',
                         action='version',
                         version='MOLGENIS Commander {version}'.format(version=_get_version()))
@@ -40,17 +54,37 @@ def create_parser():
     # Remove the 'commands' section title because we will be replacing it
     parser._positionals.title = None
 
-    # add each command's arguments
-    for type_ in CommandType:
-        for argument_adder in get_argument_adders(type_):
-            argument_adder(subparsers)
+    # add the arguments of the command that is run, the other commands only need to show up in the help
+    for info in _manifest.get_commands():
+        if info.name == command:
+            importlib.import_module(info.module)
+            get_argument_adder(info.name)(subparsers)
+        else:
+            subparsers.add_parser(info.name, help=info.get_help())
 
-    # add each command's subcommands to its help string
+    # add the command's subcommands to its help string
     list_subcommands_in_help(parser)
 
     return parser
 
 
+# noinspection PyProtectedMember
+def find_command(parser: argparse.ArgumentParser, arg_list: List[str]) -> Optional[str]:
+    """Finds the name of the command in a list of arguments, without parsing the arguments. General optionals that
+    take a value (like --as-user) are skipped."""
+    options_with_value = [option for option, action in parser._option_string_actions.items() if action.nargs != 0]
+
+    skip_value = False
+    for arg in arg_list:
+        if skip_value:
+            skip_value = False
+        elif arg in options_with_value:
+            skip_value = True
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+
 def _description():
     description = '''\
                _             _                     
@@ -69,4 +103,4 @@ or 'mcmd add group -h').'''.format(_get_version())
 
 
 def _get_version():
-    return pkg_resources.get_distribution('molgenis-commander').version
+    return distribution.get_version()
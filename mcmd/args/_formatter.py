@@ -3,7 +3,7 @@
 import argparse
 import textwrap
 
-from mcmd.commands import get_command_names
+from mcmd.commands._manifest import get_command_names
 from mcmd.core.command import CommandType
 
 
@@ -2,25 +2,35 @@ import sys
 
 from mcmd.args import _factory
 
-_parser = None
+# A parser only contains the arguments of one command, so there is a parser per command
+_parsers = dict()
 
 
-def _get_parser():
-    global _parser
-    if not _parser:
-        _parser = _factory.create_parser()
+def _get_parser(arg_list=()):
+    command = _factory.find_command(_get_base_parser(), arg_list)
+    if command not in _parsers:
+        _parsers[command] = _factory.create_parser(command)
 
-    return _parser
+    return _parsers[command]
+
+
+def _get_base_parser():
+    """The parser without the arguments of any command."""
+    if None not in _parsers:
+        _parsers[None] = _factory.create_parser()
+    return _parsers[None]
 
 
 def parse_args(arg_list):
-    args = _get_parser().parse_args(arg_list)
+    args = _get_parser(arg_list).parse_args(arg_list)
     _show_help(args, arg_list)
     return args
 
 
 def _show_help(args, arg_list):
-    if not args.command:
+    if args.profile_startup:
+        return
+    elif not args.command:
         _print_help()
         exit(1)
     elif _is_intermediate_subcommand(args):
@@ -1,15 +1,6 @@
 """
 Every module in this package represents a command.
 
-This package initialization makes every command module available for a global import:
-'from mcmd.commands import *'.
+The command modules are imported lazily: _manifest lists the commands so that the module of a command is only imported
+when the command is run.
 """
-
-import glob
-from os.path import dirname, basename, isfile
-
-from mcmd.commands._registry import get_argument_adders
-from mcmd.commands._registry import get_command_names
-
-modules = glob.glob(dirname(__file__) + "/*.py")
-__all__ = [basename(f)[:-3] for f in modules if isfile(f) and not f.startswith('_')]
@@ -0,0 +1,65 @@
+"""
+A static list of all commands. The argument parser uses it to show the list of commands without importing every command
+module: only the module of the command that is actually run is imported.
+
+Keep this list in sync with the @arguments registrations of the command modules (a unit test checks this).
+"""
+from typing import List, Tuple, Optional
+
+import attr
+
+from mcmd.core.command import CommandType
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class CommandInfo:
+    name: str
+    module: str
+    type: CommandType
+    help: str
+    subcommands: Tuple[str, ...] = ()
+
+    def get_help(self) -> str:
+        """The help string as it's shown in the list of commands."""
+        if self.subcommands:
+            return '{}\r- subcommands: {}'.format(self.help, ', '.join(self.subcommands))
+        else:
+            return self.help
+
+
+_COMMANDS = [
+    CommandInfo('add', 'mcmd.commands.add', CommandType.STANDARD, 'add and upload resources',
+                ('group', 'user', 'users', 'role', 'package', 'token', 'theme', 'logo')),
+    CommandInfo('delete', 'mcmd.commands.delete', CommandType.STANDARD, 'delete resources'),
+    CommandInfo('disable', 'mcmd.commands.disable', CommandType.STANDARD, 'disable resources and functionality',
+                ('row-level-security', 'language')),
+    CommandInfo('enable', 'mcmd.commands.enable', CommandType.STANDARD, 'enable resources and functionality',
+                ('rls', 'theme', 'language')),
+    CommandInfo('export', 'mcmd.commands.export', CommandType.STANDARD, 'export the data of entity types'),
+    CommandInfo('give', 'mcmd.commands.give', CommandType.STANDARD, 'give permissions on resources to roles or users'),
+    CommandInfo('import', 'mcmd.commands.import_', CommandType.STANDARD, 'import a dataset'),
+    CommandInfo('make', 'mcmd.commands.make', CommandType.STANDARD, 'make a user or role member of a role'),
+    CommandInfo('ping', 'mcmd.commands.ping', CommandType.STANDARD, 'ping the selected host'),
+    CommandInfo('set', 'mcmd.commands.set', CommandType.STANDARD, 'update a single entity value'),
+    CommandInfo('config', 'mcmd.commands.config', CommandType.META, 'change the configuration of MOLGENIS Commander',
+                ('set', 'add')),
+    CommandInfo('history', 'mcmd.commands.history', CommandType.META, 'shows the history of commands that were run'),
+    CommandInfo('run', 'mcmd.commands.run', CommandType.META, 'run a commander script'),
+    CommandInfo('script', 'mcmd.commands.script', CommandType.META, 'do actions involving scripts')
+]
+
+
+def get_commands() -> List[CommandInfo]:
+    """Returns all commands, grouped by type."""
+    return [info for type_ in CommandType for info in sorted(_COMMANDS, key=lambda i: i.name) if info.type == type_]
+
+
+def get_command(name: str) -> Optional[CommandInfo]:
+    for info in _COMMANDS:
+        if info.name == name:
+            return info
+    return None
+
+
+def get_command_names(type_: CommandType) -> List[str]:
+    return sorted(info.name for info in _COMMANDS if info.type == type_)
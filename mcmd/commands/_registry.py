@@ -12,6 +12,13 @@ def get_argument_adders(type_: CommandType):
     return [func for name, func in sorted(_ARGUMENT_ADDER_REGISTRY[type_].items())]
 
 
+def get_argument_adder(command_name):
+    for adders in _ARGUMENT_ADDER_REGISTRY.values():
+        if command_name in adders:
+            return adders[command_name]
+    return None
+
+
 def get_command_names(type_: CommandType):
     return [name for name, func in sorted(_ARGUMENT_ADDER_REGISTRY[type_].items())]
 
@@ -1,20 +1,34 @@
+import csv
 import mimetypes
 import textwrap
 from argparse import RawDescriptionHelpFormatter
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
 from os import path as os_path
-from typing import List
+from pathlib import Path
+from typing import List, Iterator, Optional, Tuple, Iterable, Callable
 
 from mcmd.commands._registry import arguments
+from mcmd.config import config
+from mcmd.core import metrics
 from mcmd.core.command import command
 from mcmd.core.compatibility import version, deprecated
 from mcmd.core.context import context
 from mcmd.core.errors import McmdError
 from mcmd.in_out import in_out
 from mcmd.in_out.in_out import highlight
-from mcmd.molgenis import api
+from mcmd.molgenis import api, data
 from mcmd.molgenis.client import post, get, post_files
 from mcmd.molgenis.principals import to_role_name
+from mcmd.molgenis.resources import resolve_resources, ResourceType
 from mcmd.utils import files as file_utils
+from mcmd.utils.iterables import chunks
+
+# The number of chunks of users that are added at the same time
+_USER_WORKERS = 4
+
+_TRUE_VALUES = {'true', 'yes', 'y', '1'}
+_FALSE_VALUES = {'false', 'no', 'n', '0'}
 
 # =========
 # Arguments
@@ -66,6 +80,34 @@ def add_arguments(subparsers):
                             action='store_true',
                             help="set change password to true for user")
 
+    p_add_users = p_add_subparsers.add_parser('users',
+                                              help='add users from a CSV file',
+                                              formatter_class=RawDescriptionHelpFormatter,
+                                              description=textwrap.dedent(
+                                                  """
+                                                  Add users from a CSV file with a header. Only the username column
+                                                  is required, the other columns are optional:
+
+                                                    username         the user's name
+                                                    email            default: <username>@molgenis.org
+                                                    password         default: the username
+                                                    change_password  true or false (default: false)
+                                                    active           true or false (default: true)
+                                                    superuser        true or false (default: false)
+
+                                                  Users that already exist are skipped.
+
+                                                  Example usage:
+                                                    mcmd add users --from-file users.csv
+                                                  """
+                                              ))
+    p_add_users.set_defaults(func=add_users,
+                             write_to_history=True)
+    p_add_users.add_argument('--from-file', '-f',
+                             metavar='FILE',
+                             required=True,
+                             help='the CSV file with the users')
+
     p_add_role = p_add_subparsers.add_parser('role',
                                              help='add a role',
                                              formatter_class=RawDescriptionHelpFormatter,
@@ -187,6 +229,108 @@ def add_user(args):
                })
 
 
+@command
+def add_users(args):
+    file = Path(args.from_file)
+    in_out.start('Adding users from %s' % highlight(file.name))
+
+    def show_progress(added: int, skipped: int):
+        in_out.update('Adding users from {} ({} added, {} skipped)'.format(highlight(file.name), added, skipped))
+
+    added, skipped = _add_users_from_file(file, progress=show_progress)
+    in_out.info('Users added: {}, skipped (already existing): {}'.format(added, skipped))
+
+
+def _add_users_from_file(file: Path, progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int]:
+    """
+    Adds the users of a CSV file in chunks that are sent in parallel.
+    :param file: the CSV file
+    :param progress: called with the number of added and skipped users when chunks are done
+    :return: the number of added users and the number of skipped (already existing) users
+    """
+    if not file.is_file():
+        raise McmdError("File %s doesn't exist" % str(file.resolve()))
+
+    batch_size = min(config.get('settings', 'batch_size'), data.MAX_BATCH_SIZE)
+    added = 0
+    skipped = 0
+    try:
+        with file.open(newline='') as csv_file:
+            with ThreadPoolExecutor(max_workers=_USER_WORKERS) as executor:
+                pending = set()
+                for users in chunks(_read_users(csv_file), batch_size):
+                    # limits the number of chunks in memory when reading the file is faster than adding the users
+                    if len(pending) >= _USER_WORKERS:
+                        done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                        added, skipped = _count_users(done, added, skipped)
+                        if progress:
+                            progress(added, skipped)
+                    pending.add(executor.submit(metrics.propagate(_add_users_chunk), users))
+
+                added, skipped = _count_users(futures.as_completed(pending), added, skipped)
+    except OSError as e:
+        raise McmdError('Error reading file: {}'.format(str(e)))
+    return added, skipped
+
+
+def _read_users(csv_file) -> Iterator[dict]:
+    """
+    Reads the users from a CSV file one by one, so that large files don't have to be in memory all at once. Usernames
+    should be unique in the file: chunks are added in parallel, so a duplicate in another chunk would be added twice.
+    """
+    reader = csv.DictReader(csv_file)
+    if not reader.fieldnames or 'username' not in reader.fieldnames:
+        raise McmdError("The CSV file doesn't have a username column")
+
+    lines = dict()
+    for row in reader:
+        username = (row.get('username') or '').strip()
+        if not username:
+            raise McmdError('Missing username on line {}'.format(reader.line_num))
+        if username in lines:
+            raise McmdError('Duplicate username {} on line {} (first on line {})'.format(username, reader.line_num,
+                                                                                       lines[username]))
+        lines[username] = reader.line_num
+
+        try:
+            yield {'username': username,
+                   'password_': row.get('password') or username,
+                   'changePassword': _to_bool(row.get('change_password'), False),
+                   'Email': row.get('email') or username + '@molgenis.org',
+                   'active': _to_bool(row.get('active'), True),
+                   'superuser': _to_bool(row.get('superuser'), False)}
+        except ValueError as e:
+            raise McmdError('Invalid value on line {}: {}'.format(reader.line_num, str(e)))
+
+
+def _to_bool(value: Optional[str], default: bool) -> bool:
+    if value is None or value.strip() == '':
+        return default
+    elif value.strip().lower() in _TRUE_VALUES:
+        return True
+    elif value.strip().lower() in _FALSE_VALUES:
+        return False
+    else:
+        raise ValueError("'{}' is not true or false".format(value))
+
+
+def _add_users_chunk(users: List[dict]) -> Tuple[int, int]:
+    """Adds the users that don't exist yet in one request. Returns the number of added and skipped users."""
+    existing = resolve_resources([user['username'] for user in users], [ResourceType.USER])
+    new_users = [user for user in users if not existing[user['username']]]
+    if new_users:
+        data.add_rows(ResourceType.USER.get_entity_id(), new_users)
+    return len(new_users), len(users) - len(new_users)
+
+
+def _count_users(done: Iterable[futures.Future], added: int, skipped: int) -> Tuple[int, int]:
+    for future in done:
+        chunk_added, chunk_skipped = future.result()
+        added += chunk_added
+        skipped += chunk_skipped
+    return added, skipped
+
+
 @command
 def add_role(args):
     role_name = to_role_name(args.rolename)
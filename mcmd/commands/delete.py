@@ -1,3 +1,5 @@
+import time
+from functools import partial
 from urllib.parse import urljoin
 
 import mcmd.in_out.ask
@@ -6,7 +8,7 @@ from mcmd.commands._registry import arguments
 from mcmd.core.command import command
 from mcmd.in_out import in_out
 from mcmd.in_out.in_out import highlight
-from mcmd.molgenis import api
+from mcmd.molgenis import api, data, package_tree
 from mcmd.molgenis.resources import detect_resource_type, ensure_resource_exists, ResourceType
 
 
@@ -116,30 +118,22 @@ def _delete_package_contents(args):
     if args.force or (not args.force and mcmd.in_out.ask.confirm(
             'Are you sure you want to delete the contents of package {}?'.format(args.resource))):
         in_out.start('Deleting contents of package {}'.format(highlight(args.resource)))
-        _delete_entity_types_in_package(args.resource)
-        _delete_packages_in_package(args.resource)
+        start = time.monotonic()
+        result = package_tree.delete_contents(args.resource,
+                                              progress=partial(_show_progress, args.resource, start))
 
+        duration = time.monotonic() - start
+        in_out.info('Deleted {} entity types and {} packages in {:.1f}s'.format(result.entity_types,
+                                                                               result.packages,
+                                                                               duration))
 
-def _delete_entity_types_in_package(package_id):
-    response = client.get(api.rest2(ResourceType.ENTITY_TYPE.get_entity_id()),
-                          params={
-                              'attrs': 'id',
-                              'q': 'package==' + package_id
-                          })
-    entity_ids = [entity_type['id'] for entity_type in response.json()['items']]
-    if len(entity_ids) > 0:
-        _delete_rows(ResourceType.ENTITY_TYPE.get_entity_id(), entity_ids)
 
-
-def _delete_packages_in_package(package_id):
-    response = client.get(api.rest2(ResourceType.PACKAGE.get_entity_id()),
-                          params={
-                              'attrs': 'id',
-                              'q': 'parent==' + package_id
-                          })
-    package_ids = [entity_type['id'] for entity_type in response.json()['items']]
-    if len(package_ids) > 0:
-        _delete_rows(ResourceType.PACKAGE.get_entity_id(), package_ids)
+def _show_progress(package_id: str, start: float, deleted: int, total: int):
+    throughput = deleted / max(time.monotonic() - start, 0.001)
+    in_out.update('Deleting contents of package {} ({}/{}, {:.1f} per second)'.format(highlight(package_id),
+                                                                                      deleted,
+                                                                                      total,
+                                                                                      throughput))
 
 
 def _delete_group(args):
@@ -150,7 +144,7 @@ def _delete_group(args):
 
 
 def _delete_rows(entity_type, rows):
-    client.delete_data(api.rest2(entity_type), rows)
+    data.delete_rows(entity_type, rows)
 
 
 def _get_resource_type(args):
@@ -0,0 +1,274 @@
+"""
+Exports the rows of entity types to files.
+
+The rows are requested page by page with the REST API v2 and written to the file as soon as a page arrives, while the
+next page is already being requested. Only two pages are in memory at a time, so entity types of any size can be
+exported. Filtering (--q) and selecting attributes (--attrs) is done by the server.
+"""
+
+import csv
+import gzip
+import json
+import os
+import textwrap
+import threading
+from argparse import RawDescriptionHelpFormatter
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Iterator, TextIO
+
+import attr
+
+from mcmd.commands._registry import arguments
+from mcmd.core import metrics
+from mcmd.core.command import command
+from mcmd.core.errors import McmdError
+from mcmd.in_out import in_out
+from mcmd.in_out.in_out import highlight
+from mcmd.molgenis import data
+from mcmd.molgenis.resources import ensure_resources_exist, ResourceType
+from mcmd.utils.iterables import prefetched
+
+
+# =========
+# Arguments
+# =========
+
+# Store a reference to the parser so that we can show an error message for the custom validation rules
+_p_export = None
+
+
+@arguments('export')
+def add_arguments(subparsers):
+    global _p_export
+    _p_export = subparsers.add_parser('export',
+                                      help='export the data of entity types',
+                                      formatter_class=RawDescriptionHelpFormatter,
+                                      description=textwrap.dedent(
+                                          """
+                                          Export the rows of one or more entity types. Every entity type is written
+                                          to its own file in the output folder, for example: it_emx_Person.csv
+
+                                          Example usage:
+                                            mcmd export it_emx_Person
+                                            mcmd export it_emx_Person --q age=ge=18 --attrs id,name
+                                            mcmd export it_emx_Person it_emx_Country --format jsonl --gzip
+                                          """
+                                      ))
+    _p_export.set_defaults(func=export,
+                           write_to_history=True)
+    _p_export.add_argument('entity_types',
+                           metavar='entity_type',
+                           nargs='+',
+                           help='the id(s) of the entity type(s) to export')
+    _p_export.add_argument('--format', '-f',
+                           choices=[format_.value for format_ in _Format],
+                           default=_Format.CSV.value,
+                           help='the format of the files (default: csv)')
+    _p_export.add_argument('--to-folder', '-t',
+                           metavar='FOLDER',
+                           default='.',
+                           help='the folder to write the files to (default: the current folder)')
+    _p_export.add_argument('--q', '-q',
+                           dest='query',
+                           metavar='RSQL',
+                           help='only export the rows that match this RSQL query')
+    _p_export.add_argument('--attrs', '-a',
+                           metavar='ATTRIBUTES',
+                           help="only export these attributes (in the REST API v2 'attrs' syntax, e.g. id,name)")
+    _p_export.add_argument('--gzip', '-z',
+                           action='store_true',
+                           help='compress the files')
+    _p_export.add_argument('--page-size',
+                           type=int,
+                           metavar='ROWS',
+                           default=data.MAX_PAGE_SIZE,
+                           help='the number of rows per request (default and maximum: {})'.format(data.MAX_PAGE_SIZE))
+    _p_export.add_argument('--parallel', '-P',
+                           type=int,
+                           metavar='N',
+                           default=_WORKERS,
+                           help='the maximum number of entity types that are exported at the same time (default: '
+                                '{})'.format(_WORKERS))
+
+
+# =========
+# Globals
+# =========
+
+class _Format(Enum):
+    CSV = 'csv'
+    TSV = 'tsv'
+    JSONL = 'jsonl'
+
+
+# The number of entity types that are exported at the same time
+_WORKERS = 4
+
+# The suffix of a file while it's being written, it's renamed when the export succeeded
+_PARTIAL_SUFFIX = '.part'
+
+
+# =======
+# Methods
+# =======
+
+@attr.s(auto_attribs=True)
+class _Progress:
+    """The number of exported rows, shared by the threads that export the entity types."""
+    message: str
+    exported: int = 0
+    total: int = 0
+    lock: threading.Lock = attr.ib(factory=threading.Lock)
+
+    def add_total(self, total: int):
+        with self.lock:
+            self.total += total
+            self._show()
+
+    def add_exported(self, exported: int):
+        with self.lock:
+            self.exported += exported
+            self._show()
+
+    def _show(self):
+        in_out.update('{} ({}/{} rows)'.format(self.message, self.exported, self.total))
+
+
+@command
+def export(args):
+    _validate_args(args)
+    entity_type_ids = list(dict.fromkeys(args.entity_types))
+    ensure_resources_exist(entity_type_ids, ResourceType.ENTITY_TYPE)
+
+    files = _export_entity_types(entity_type_ids, Path(args.to_folder), _Format(args.format), args)
+    for file in files:
+        in_out.info('Exported to {}'.format(highlight(str(file))))
+
+
+def _export_entity_types(entity_type_ids: List[str], folder: Path, format_: _Format, args) -> List[Path]:
+    """Exports the entity types in parallel, each to its own file in the folder. Returns the files."""
+    if not folder.is_dir():
+        raise McmdError("Folder %s doesn't exist" % str(folder.resolve()))
+
+    files = [_get_file(folder, entity_type_id, format_, args.gzip) for entity_type_id in entity_type_ids]
+    progress = _Progress('Exporting {}'.format(', '.join(highlight(entity_type_id)
+                                                         for entity_type_id in entity_type_ids)))
+    in_out.start(progress.message)
+
+    with ThreadPoolExecutor(max_workers=min(args.parallel, len(entity_type_ids))) as executor:
+        results = [executor.submit(metrics.propagate(_export), entity_type_id, file, format_, args, progress)
+                   for entity_type_id, file in zip(entity_type_ids, files)]
+        for result in results:
+            result.result()
+    return files
+
+
+def _validate_args(args):
+    if args.page_size < 1 or args.page_size > data.MAX_PAGE_SIZE:
+        _p_export.error('argument --page-size: should be between 1 and {}'.format(data.MAX_PAGE_SIZE))
+    if args.parallel < 1:
+        _p_export.error('argument --parallel: should be at least 1')
+
+
+def _get_file(folder: Path, entity_type_id: str, format_: _Format, compress: bool) -> Path:
+    name = '{}.{}'.format(entity_type_id, format_.value)
+    if compress:
+        name += '.gz'
+    return folder.joinpath(name)
+
+
+def _export(entity_type_id: str, file: Path, format_: _Format, args, progress: _Progress):
+    """Writes the rows to a temporary file first, so that a failed export doesn't leave an incomplete file behind."""
+    partial_file = file.with_name(file.name + _PARTIAL_SUFFIX)
+    pages = prefetched(data.get_pages(entity_type_id, attrs=args.attrs, query=args.query, page_size=args.page_size))
+    try:
+        with _open(partial_file, args.gzip) as output:
+            _write(pages, output, format_, progress)
+        os.replace(str(partial_file), str(file))
+    except OSError as e:
+        raise McmdError('Error writing {}: {}'.format(file, str(e)))
+    finally:
+        if partial_file.exists():
+            partial_file.unlink()
+
+
+def _open(file: Path, compress: bool) -> TextIO:
+    if compress:
+        return gzip.open(str(file), 'wt', encoding='utf-8', newline='')
+    else:
+        return file.open('w', encoding='utf-8', newline='')
+
+
+def _write(pages: Iterator[dict], output: TextIO, format_: _Format, progress: _Progress):
+    writer = None
+    for page in pages:
+        if writer is None:
+            progress.add_total(int(page['total']))
+            writer = _create_writer(output, format_, page['meta'])
+
+        writer(page['items'])
+        progress.add_exported(len(page['items']))
+
+
+def _create_writer(output: TextIO, format_: _Format, meta: dict):
+    """Returns a function that writes a list of rows. For CSV and TSV the header is written right away."""
+    if format_ == _Format.JSONL:
+        def write_json_lines(items: List[dict]):
+            for item in items:
+                output.write(json.dumps(_strip_links(item)) + '\n')
+
+        return write_json_lines
+
+    attributes = _get_attributes(meta['attributes'])
+    csv_writer = csv.writer(output, delimiter='\t' if format_ == _Format.TSV else ',')
+    csv_writer.writerow([attribute['name'] for attribute in attributes])
+
+    def write_rows(items: List[dict]):
+        csv_writer.writerows([[_to_text(item.get(attribute['name']), attribute) for attribute in attributes]
+                              for item in items])
+
+    return write_rows
+
+
+def _get_attributes(attributes: List[dict]) -> List[dict]:
+    """Returns the attributes that have values: the attributes in compound attributes instead of the compounds."""
+    atomic = list()
+    for attribute in attributes:
+        if attribute.get('fieldType') == 'COMPOUND':
+            atomic += _get_attributes(attribute.get('attributes', list()))
+        else:
+            atomic.append(attribute)
+    return atomic
+
+
+def _to_text(value, attribute: dict) -> str:
+    """Formats a value like the importer expects it: references as ids and lists as comma separated values."""
+    if value is None:
+        return ''
+    elif isinstance(value, bool):
+        return 'true' if value else 'false'
+    elif isinstance(value, dict):
+        return _to_text(value.get(_get_id_attribute(value, attribute)), dict())
+    elif isinstance(value, list):
+        return ','.join(_to_text(item, attribute) for item in value)
+    else:
+        return str(value)
+
+
+def _get_id_attribute(reference: dict, attribute: dict) -> Optional[str]:
+    id_attribute = attribute.get('refEntity', dict()).get('idAttribute')
+    if id_attribute:
+        return id_attribute
+    # the first attribute after the link is the id attribute
+    return next((key for key in reference if key != '_href'), None)
+
+
+def _strip_links(value):
+    if isinstance(value, dict):
+        return {key: _strip_links(item) for key, item in value.items() if key != '_href'}
+    elif isinstance(value, list):
+        return [_strip_links(item) for item in value]
+    else:
+        return value
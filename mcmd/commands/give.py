@@ -5,6 +5,8 @@ or principal doesn't exist, the program will terminate.
 """
 import textwrap
 from argparse import RawDescriptionHelpFormatter
+from pathlib import Path
+from typing import List, Tuple, Dict
 
 from mcmd.commands._registry import arguments
 from mcmd.core.command import command
@@ -12,11 +14,13 @@ from mcmd.core.compatibility import version
 from mcmd.core.errors import McmdError
 from mcmd.in_out import in_out
 from mcmd.in_out.in_out import highlight
+from mcmd.molgenis import data
 from mcmd.molgenis.principals import PrincipalType, get_principal_type_from_args
-from mcmd.molgenis.resources import detect_resource_type, ensure_resource_exists, ResourceType
+from mcmd.molgenis.resources import detect_resource_types, ensure_resources_exist, ResourceType
 from mcmd.molgenis.security import security
 from mcmd.molgenis.security.permission import Permission
 from mcmd.molgenis.version import get_version
+from mcmd.utils import files
 
 
 # =========
@@ -48,6 +52,13 @@ def add_arguments(subparsers):
                                          
                                          mcmd give john edit dataset --entity biobank1
                                          mcmd give --user john edit --entity-type dataset --entity biobank1
+                                         
+                                       Multiple receivers, resources and rows can be separated by commas. Rows can
+                                       also be read from a file (one id per line) or selected with a RSQL query:
+                                         mcmd give john,jane read dataset,dataexplorer
+                                         mcmd give group_VIEWER read biobanks --entity bb1,bb2,bb3
+                                         mcmd give group_VIEWER read biobanks --entities-from-file ids.txt
+                                         mcmd give group_VIEWER read biobanks --entities-matching country==NL
                                        """
                                    ))
     p_give.set_defaults(func=give,
@@ -64,9 +75,17 @@ def add_arguments(subparsers):
                                  action='store_true',
                                  help='flag to specify that the resource is a plugin')
     p_give_receiver = p_give.add_mutually_exclusive_group()
-    p_give.add_argument('--entity', '-E',
-                        metavar='ENTITY_ID',
-                        help='use in conjunction with --entity-type to give permissions for a row')
+    p_give_rows = p_give.add_mutually_exclusive_group()
+    p_give_rows.add_argument('--entity', '-E',
+                             metavar='ENTITY_ID',
+                             help='use in conjunction with --entity-type to give permissions for a row (or multiple '
+                                  'rows, separated by commas)')
+    p_give_rows.add_argument('--entities-from-file', '-F',
+                             metavar='FILE',
+                             help='give permissions for the rows listed in a file (one id per line)')
+    p_give_rows.add_argument('--entities-matching', '-Q',
+                             metavar='RSQL',
+                             help='give permissions for all rows that match a RSQL query')
     p_give_receiver.add_argument('--user', '-u',
                                  action='store_true',
                                  help='flag to specify that the receiver is a user')
@@ -75,13 +94,15 @@ def add_arguments(subparsers):
                                  help='flag to specify that the receiver is a role')
     p_give.add_argument('receiver',
                         type=str,
-                        help='the role (or user) to give the permission to')
+                        help='the role (or user) to give the permission to - multiple receivers can be separated by '
+                             'commas')
     p_give.add_argument('permission',
                         choices=['none', 'writemeta', 'readmeta', 'write', 'edit', 'read', 'view', 'count'],
                         help='the permission type to give - synonyms are allowed (e.g. write/edit)')
     p_give.add_argument('resource',
                         type=str,
-                        help='the resource to which permission is given')
+                        help='the resource to which permission is given - multiple resources can be separated by '
+                             'commas')
 
 
 # =======
@@ -94,26 +115,31 @@ def give(args):
 
     permission = Permission[args.permission.upper()]
 
-    principal_type = get_principal_type_from_args(args, principal_name=args.receiver)
+    receivers = _split(args.receiver)
+    principals = [(get_principal_type_from_args(args, principal_name=receiver), receiver) for receiver in receivers]
 
-    if args.entity:
-        _grant_rls(principal_type=principal_type,
-                   principal_name=args.receiver,
-                   entity_type_id=args.resource,
-                   entity_id=args.entity,
-                   permission=permission)
+    if _is_row_permission(args):
+        for entity_type_id in _split(args.resource):
+            _grant_rls(principals=principals,
+                       entity_type_id=entity_type_id,
+                       entity_ids=_get_entity_ids(args, entity_type_id),
+                       permission=permission)
     else:
-        resource_type = _get_resource_type(args)
-        _grant(principal_type=principal_type,
-               principal_name=args.receiver,
-               resource_type=resource_type,
-               entity_type_id=args.resource,
-               permission=permission)
+        resource_ids = _split(args.resource)
+        resource_types = _get_resource_types(args, resource_ids)
+        for resource_id in resource_ids:
+            resource_type = resource_types[resource_id]
+            for principal_type, principal_name in principals:
+                _grant(principal_type=principal_type,
+                       principal_name=principal_name,
+                       resource_type=resource_type,
+                       entity_type_id=resource_id,
+                       permission=permission)
 
 
 @version('7.0.0')
 def _validate_args(args):
-    if args.entity:
+    if _is_row_permission(args):
         raise McmdError(
             "Giving row level permissions is only possible since MOLGENIS 8.1.1 (you are using {})".format(
                 get_version()))
@@ -125,6 +151,27 @@ def _validate_args(args):
     pass
 
 
+def _is_row_permission(args) -> bool:
+    return bool(args.entity or args.entities_from_file or args.entities_matching)
+
+
+def _split(value: str) -> List[str]:
+    """Splits a comma separated argument into its values."""
+    return [item.strip() for item in value.split(',') if len(item.strip()) > 0]
+
+
+def _get_entity_ids(args, entity_type_id: str) -> List[str]:
+    if args.entity:
+        return _split(args.entity)
+    elif args.entities_from_file:
+        lines = files.read_file_lines(Path(args.entities_from_file))
+        return [line.strip() for line in lines if len(line.strip()) > 0]
+    else:
+        in_out.start('Selecting rows of entity type {} matching {}'.format(highlight(entity_type_id),
+                                                                          highlight(args.entities_matching)))
+        return list(data.get_row_ids(entity_type_id, args.entities_matching))
+
+
 def _grant(principal_type: PrincipalType, principal_name: str, resource_type: ResourceType, entity_type_id: str,
            permission: Permission):
     in_out.start('Giving %s %s permission to %s on %s %s' % (principal_type.value,
@@ -136,29 +183,52 @@ def _grant(principal_type: PrincipalType, principal_name: str, resource_type: Re
     security.grant_permission(principal_type, principal_name, resource_type, entity_type_id, permission)
 
 
-def _grant_rls(principal_type: PrincipalType, principal_name: str, entity_type_id: str,
-               entity_id: str, permission: Permission):
-    in_out.start('Giving %s %s permission to %s on row %s of entity type %s' % (principal_type.value,
-                                                                            highlight(principal_name),
-                                                                            highlight(permission.value),
-                                                                            highlight(entity_id),
-                                                                            highlight(entity_type_id)))
+def _grant_rls(principals: List[Tuple[PrincipalType, str]], entity_type_id: str, entity_ids: List[str],
+               permission: Permission):
+    if len(entity_ids) == 0:
+        in_out.info('No rows of entity type {} to give permissions on'.format(highlight(entity_type_id)))
+        return
+
+    in_out.start('Giving %s permission to %s on %s of entity type %s' % (_describe_principals(principals),
+                                                                     highlight(permission.value),
+                                                                     _describe_rows(entity_ids),
+                                                                     highlight(entity_type_id)))
+
+    changes = security.grant_row_permissions(principals, entity_type_id, entity_ids, permission)
+    if len(principals) > 1 or len(entity_ids) > 1:
+        in_out.info('Permissions added: {}, updated: {}, removed: {}, unchanged: {}'.format(changes.added,
+                                                                                          changes.updated,
+                                                                                          changes.removed,
+                                                                                          changes.unchanged))
 
-    security.grant_row_permission(principal_type, principal_name, entity_type_id, entity_id, permission)
+
+def _describe_principals(principals: List[Tuple[PrincipalType, str]]) -> str:
+    if len(principals) == 1:
+        principal_type, principal_name = principals[0]
+        return '{} {}'.format(principal_type.value, highlight(principal_name))
+    else:
+        return '{} principals'.format(highlight(str(len(principals))))
 
 
-def _get_resource_type(args):
+def _describe_rows(entity_ids: List[str]) -> str:
+    if len(entity_ids) == 1:
+        return 'row {}'.format(highlight(entity_ids[0]))
+    else:
+        return '{} rows'.format(highlight(str(len(entity_ids))))
+
+
+def _get_resource_types(args, resource_ids: List[str]) -> Dict[str, ResourceType]:
     # The permission manager doesn't check if the resources actually exist so we need to do that ourselves
 
-    resource_id = args.resource
     if args.entity_type:
-        ensure_resource_exists(resource_id, ResourceType.ENTITY_TYPE)
-        return ResourceType.ENTITY_TYPE
+        resource_type = ResourceType.ENTITY_TYPE
     elif args.package:
-        ensure_resource_exists(resource_id, ResourceType.PACKAGE)
-        return ResourceType.PACKAGE
+        resource_type = ResourceType.PACKAGE
     elif args.plugin:
-        ensure_resource_exists(resource_id, ResourceType.PLUGIN)
-        return ResourceType.PLUGIN
+        resource_type = ResourceType.PLUGIN
     else:
-        return detect_resource_type(resource_id, [ResourceType.ENTITY_TYPE, ResourceType.PACKAGE, ResourceType.PLUGIN])
+        return detect_resource_types(resource_ids,
+                                     [ResourceType.ENTITY_TYPE, ResourceType.PACKAGE, ResourceType.PLUGIN])
+
+    ensure_resources_exist(resource_ids, resource_type)
+    return {resource_id: resource_type for resource_id in resource_ids}
@@ -1,6 +1,11 @@
+import re
+from datetime import datetime, timedelta
+
 from mcmd.commands._registry import arguments
 from mcmd.core import history as hist
 from mcmd.core.command import command, CommandType
+from mcmd.core.errors import McmdError
+from mcmd.core.history import HistoryEntry
 from mcmd.in_out import in_out
 from mcmd.in_out.logging import get_logger
 
@@ -22,6 +27,15 @@ def add_arguments(subparsers):
     p_history.add_argument('--clear', '-c',
                            action='store_true',
                            help='clears the history')
+    p_history.add_argument('--grep', '-g',
+                           metavar='PATTERN',
+                           help='only show commands that match a regular expression')
+    p_history.add_argument('--since', '-s',
+                           help='only show commands that were run after a moment, either a date and time '
+                                '(2020-01-31, 2020-01-31T14:30) or a period before now (30m, 12h, 7d, 2w)')
+    p_history.add_argument('--failed', '-f',
+                           action='store_true',
+                           help='only show commands that failed')
 
 
 # =======
@@ -30,6 +44,9 @@ def add_arguments(subparsers):
 
 log = get_logger()
 
+_PERIOD_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+_DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S']
+
 
 # =======
 # Methods
@@ -41,12 +58,40 @@ def history(args):
         in_out.start('Clearing history')
         hist.clear()
     else:
-        lines = hist.read(args.number, include_fails=True)
-        if len(lines) == 0:
+        entries = hist.read(args.number,
+                            include_fails=True,
+                            grep=args.grep,
+                            since=_parse_since(args.since) if args.since else None,
+                            only_fails=args.failed)
+        if len(entries) == 0:
             log.info('History is empty.')
-        for line in lines:
-            in_out.start(line[1])
-            if line[0]:
+        for entry in entries:
+            in_out.start(_format_entry(entry))
+            if entry.success:
                 in_out.succeed()
             else:
                 in_out.error(None)
+
+
+def _format_entry(entry: HistoryEntry) -> str:
+    if entry.timestamp is None:
+        return entry.command
+
+    message = '{} {}'.format(in_out.dim(entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')), entry.command)
+    if entry.duration is not None:
+        message += in_out.dim(' ({:.1f}s)'.format(entry.duration))
+    return message
+
+
+def _parse_since(since: str) -> datetime:
+    period = re.fullmatch(r'(\d+)([mhdw])', since)
+    if period:
+        return datetime.now() - timedelta(**{_PERIOD_UNITS[period.group(2)]: int(period.group(1))})
+
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(since, date_format)
+        except ValueError:
+            pass
+    raise McmdError("Invalid value for --since: {}".format(since),
+                    info='Use a date and time (2020-01-31, 2020-01-31T14:30) or a period (30m, 12h, 7d, 2w)')
@@ -1,22 +1,33 @@
+import threading
+import time
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from fnmatch import fnmatch
+from glob import glob
 from os import path as os_path
 from pathlib import Path
-from urllib.parse import urljoin
+from typing import List, Optional
 
-import polling
-import requests
+import attr
+from ruamel.yaml import YAML, YAMLError
 
 import mcmd.config.config as config
 import mcmd.in_out.ask
 from mcmd.commands._registry import arguments
+from mcmd.core import metrics
 from mcmd.core.command import command
 from mcmd.core.context import context
 from mcmd.core.errors import McmdError
 from mcmd.github import client as github
+from mcmd.github.client import Attachment
 from mcmd.in_out import in_out
-from mcmd.in_out.in_out import highlight
-from mcmd.molgenis import api
-from mcmd.molgenis.client import post_file, get, post
-from mcmd.utils import files
+from mcmd.in_out.in_out import highlight, bold
+from mcmd.in_out.logging import get_logger
+from mcmd.molgenis import api, import_runs
+from mcmd.molgenis.client import post_file, post
+from mcmd.molgenis.import_runs import ImportRunTracker
+from mcmd.utils import files, downloads, file_index
 
 # =========
 # Arguments
@@ -34,9 +45,9 @@ def add_arguments(subparsers):
     _p_import.set_defaults(func=import_,
                            write_to_history=True)
     _p_import.add_argument('resource',
-                           nargs='?',
-                           help='the resource to import - depending on the other options this can be a path, '
-                                'file name, or URL')
+                           nargs='*',
+                           help='the resources to import - depending on the other options these can be paths, '
+                                'file names, or URLs (paths and file names may contain wildcards, e.g. data/*.csv)')
     p_import_source = _p_import.add_mutually_exclusive_group()
     p_import_source.add_argument('--from-path', '-p',
                                  action='store_true',
@@ -49,6 +60,14 @@ def add_arguments(subparsers):
                                  action='store_true',
                                  help='import a file from a URL - uses the importByUrl endpoint of the MOLGENIS '
                                       'importer, without downloading the file first')
+    p_import_source.add_argument('--status', '-s',
+                                 action='store_true',
+                                 help='show the status of earlier imports - pass the ids of the import runs as '
+                                      'resources')
+    p_import_source.add_argument('--manifest', '-m',
+                                 metavar='FILE',
+                                 help='import the files listed in a YAML manifest - each import in the manifest can '
+                                      'have its own options and a list of imports it should run after')
     _p_import.add_argument('--in',
                            dest='to_package',
                            type=str,
@@ -64,6 +83,23 @@ def add_arguments(subparsers):
                            type=str,
                            choices=['add', 'add_update_existing', 'update'],
                            help='strategy to use when importing')
+    _p_import.add_argument('--parallel', '-P',
+                           type=int,
+                           metavar='N',
+                           help='the maximum number of files that are imported at the same time (default: the '
+                                'max_parallel_imports setting)')
+    _p_import.add_argument('--timeout', '-t',
+                           type=int,
+                           metavar='SECONDS',
+                           help='stop waiting for the imports after this many seconds (the imports themselves will '
+                                'continue)')
+    _p_import.add_argument('--no-wait', '-n',
+                           action='store_true',
+                           help="don't wait for the imports to finish - prints the ids of the import runs so their "
+                                "status can be checked later with --status")
+    _p_import.add_argument('--gzip', '-z',
+                           action='store_true',
+                           help='compress VCF files while uploading them')
     return _p_import
 
 
@@ -75,6 +111,54 @@ _IMPORT_ACTIONS = {'.owl': 'add',
                    '.obo': 'add',
                    '.vcf': 'add'}
 
+# Text formats that the importer also accepts when they're gzipped
+_COMPRESSIBLE_TYPES = ['.vcf']
+
+log = get_logger()
+
+
+class _Status(Enum):
+    WAITING = 'waiting'
+    UPLOADING = 'uploading'
+    RUNNING = 'running'
+    STARTED = 'started'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+
+@attr.s(auto_attribs=True)
+class _Import:
+    """A file (or URL) to import and the state of its import."""
+    name: str
+    path: Optional[Path] = None
+    url: Optional[str] = None
+    params: dict = attr.Factory(dict)
+    after: List[str] = attr.Factory(list)
+    compress: bool = False
+    status: _Status = _Status.WAITING
+    message: Optional[str] = None
+    run_url: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    def get_names(self) -> List[str]:
+        """An import can be referred to by its file name, with or without extension."""
+        return [self.name, os_path.splitext(self.name)[0]]
+
+    def is_done(self) -> bool:
+        return self.status in (_Status.STARTED, _Status.FINISHED, _Status.FAILED, _Status.SKIPPED)
+
+    def finish(self, status: _Status, message: Optional[str]):
+        self.status = status
+        self.message = message
+        self.finished = time.monotonic()
+
+    def get_duration(self) -> str:
+        if self.started is None or self.finished is None:
+            return '-'
+        return '{:.0f}s'.format(self.finished - self.started)
+
 
 # =======
 # Methods
@@ -83,76 +167,195 @@ _IMPORT_ACTIONS = {'.owl': 'add',
 @command
 def import_(args):
     _validate_args(args)
-    _choose_import_method(args)
+    if args.status:
+        _show_status(args.resource)
+        return
+
+    imports = _choose_import_method(args)
+    _run_imports(imports,
+                 parallel=args.parallel or config.get('settings', 'max_parallel_imports'),
+                 timeout=args.timeout,
+                 wait=not args.no_wait)
 
 
 def _validate_args(args):
     """The 'resource' argument can't be made required at the parser level because the '--from-issue' argument can be
     used with or without specifying a file name."""
-    if not args.resource and not args.from_issue:
+    if not args.resource and not args.from_issue and not args.manifest:
         _p_import.error("the following argument is required: resource")
+    if args.parallel is not None and args.parallel < 1:
+        _p_import.error("argument --parallel: should be at least 1")
+    if args.timeout is not None and args.timeout < 1:
+        _p_import.error("argument --timeout: should be at least 1")
 
 
-def _choose_import_method(args):
-    if args.from_path:
-        _import_from_path(args)
+def _choose_import_method(args) -> List[_Import]:
+    if args.manifest:
+        return _import_from_manifest(args)
+    elif args.from_path:
+        return _import_from_path(args)
     elif args.from_url:
-        _import_from_url(args)
+        return _import_from_url(args)
     elif args.from_issue:
-        _import_from_issue(args)
+        return _import_from_issue(args)
     else:
-        _import_from_quick_folders(args)
+        return _import_from_quick_folders(args)
+
+
+def _import_from_url(args) -> List[_Import]:
+    return [_Import(name=file_url.split("/")[-1],
+                    url=file_url,
+                    params=_get_params(file_url.split("/")[-1], args.to_package, args.entity_type_id,
+                                       args.import_action))
+            for file_url in args.resource]
+
 
+def _import_from_quick_folders(args) -> List[_Import]:
+    folders = context().get_git_folders() + context().get_dataset_folders()
+    paths = list()
+    for resource in args.resource:
+        if _is_glob(resource):
+            paths += _match_files(file_index.get_files(folders), resource)
+        else:
+            file_name = os_path.splitext(resource)[0]
+            paths.append(files.select_file_from_folders(folders=folders, file_name=file_name))
+    return _to_imports(paths, args)
+
+
+def _import_from_issue(args) -> List[_Import]:
+    issue_num = args.from_issue
+    attachments = _select_attachments(issue_num, args.resource)
+    paths = _download_attachments(attachments, issue_num)
+    return _to_imports(paths, args)
 
-def _import_from_url(args):
-    file_url = args.resource
-    file_name = file_url.split("/")[-1]
-    in_out.start('Importing from URL %s' % highlight(file_url))
 
-    if args.import_action:
-        action = args.import_action
+def _import_from_path(args) -> List[_Import]:
+    paths = list()
+    for resource in args.resource:
+        if _is_glob(resource):
+            paths += _match_paths(resource)
+        else:
+            file = Path(resource)
+            if not file.is_file():
+                raise McmdError("File %s doesn't exist" % str(file.resolve()))
+            paths.append(file)
+    return _to_imports(paths, args)
+
+
+def _import_from_manifest(args) -> List[_Import]:
+    """
+    Reads the imports from a manifest file. A manifest is a YAML file with a list of imports, for example:
+
+    imports:
+      - file: base.xlsx
+      - file: data/*.csv
+        in: base
+        after: [base.xlsx]
+      - url: https://example.org/ontology.owl
+        action: add
+
+    Relative paths are resolved from the folder of the manifest. Options that aren't in the manifest are taken from the
+    command line.
+    """
+    manifest_file = Path(args.manifest)
+    if not manifest_file.is_file():
+        raise McmdError("Manifest %s doesn't exist" % str(manifest_file.resolve()))
+
+    try:
+        manifest = YAML(typ='safe').load(manifest_file)
+    except YAMLError as e:
+        raise McmdError('Error reading manifest: {}'.format(str(e)))
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('imports'), list):
+        raise McmdError("Manifest %s doesn't contain a list of imports" % manifest_file.name)
+
+    imports = list()
+    for entry in manifest['imports']:
+        imports += _read_manifest_entry(entry, manifest_file.parent, args)
+    return imports
+
+
+def _read_manifest_entry(entry: dict, folder: Path, args) -> List[_Import]:
+    if not isinstance(entry, dict) or ('file' in entry) == ('url' in entry):
+        raise McmdError('Every import in the manifest should have either a file or a url: {}'.format(entry))
+
+    package = entry.get('in', args.to_package)
+    entity_type_id = entry.get('as', args.entity_type_id)
+    import_action = entry.get('action', args.import_action)
+    compress = entry.get('gzip', args.gzip)
+    after = entry.get('after', list())
+    if isinstance(after, str):
+        after = [after]
+
+    if 'url' in entry:
+        name = entry['url'].split("/")[-1]
+        return [_Import(name=name,
+                        url=entry['url'],
+                        params=_get_params(name, package, entity_type_id, import_action),
+                        after=after)]
+
+    pattern = str(folder.joinpath(entry['file']))
+    if _is_glob(entry['file']):
+        paths = _match_paths(pattern)
+    elif Path(pattern).is_file():
+        paths = [Path(pattern)]
     else:
-        action = _get_import_action(file_name)
+        raise McmdError("File %s doesn't exist" % pattern)
 
-    params = {'action': action,
-              'metadataAction': 'upsert'}
+    return [_Import(name=path.name,
+                    path=path,
+                    params=_get_params(path.name, package, entity_type_id, import_action),
+                    after=after,
+                    compress=compress and _is_compressible(path))
+            for path in paths]
 
-    if args.to_package:
-        params['packageId'] = args.to_package
 
-    params['url'] = file_url
+def _to_imports(paths: List[Path], args) -> List[_Import]:
+    return [_Import(name=path.name,
+                    path=path,
+                    params=_get_params(path.name, args.to_package, args.entity_type_id, args.import_action),
+                    compress=args.gzip and _is_compressible(path))
+            for path in paths]
 
-    response = post(api.import_by_url(), params=params)
-    import_run_url = urljoin(config.get('host', 'selected'), response.text)
-    status, message = _poll_for_completion(import_run_url)
-    if status == 'FAILED':
-        raise McmdError(message)
 
+def _is_compressible(path: Path) -> bool:
+    return path.suffix.lower() in _COMPRESSIBLE_TYPES
 
-def _import_from_quick_folders(args):
-    file_name = os_path.splitext(args.resource)[0]
-    path = files.select_file_from_folders(folders=context().get_git_folders() + context().get_dataset_folders(),
-                                          file_name=file_name)
-    _do_import(path, args.to_package, args.entity_type_id, args.import_action)
 
+def _is_glob(pattern: str) -> bool:
+    return any(char in pattern for char in '*?[')
 
-def _import_from_issue(args):
-    issue_num = args.from_issue
-    attachment = _select_attachment(issue_num, args.resource)
-    file_path = _download_attachment(attachment, issue_num)
-    _do_import(file_path, args.to_package, args.entity_type_id, args.import_action)
+
+def _match_paths(pattern: str) -> List[Path]:
+    paths = [Path(path) for path in sorted(glob(pattern)) if Path(path).is_file()]
+    if len(paths) == 0:
+        raise McmdError('No files found for {}'.format(pattern))
+    return paths
 
 
-def _import_from_path(args):
-    file = Path(args.resource)
-    if not file.is_file():
-        raise McmdError("File %s doesn't exist" % str(file.resolve()))
-    _do_import(file, args.to_package, args.entity_type_id, args.import_action)
+def _match_files(candidates: List[Path], pattern: str) -> List[Path]:
+    paths = [path for path in candidates if fnmatch(path.name, pattern)]
+    if len(paths) == 0:
+        raise McmdError('No files found for {}'.format(pattern))
+    return sorted(paths)
 
 
-def _select_attachment(issue_num, wanted_attachment):
-    """Gets attachments from a GitHub issue. If wanted_attachment is specified it will try to select that attachment."""
+def _select_attachments(issue_num, wanted_attachments: List[str]) -> List[Attachment]:
+    """Gets attachments from a GitHub issue. If wanted_attachments are specified it will try to select those
+    attachments."""
     attachments = github.get_attachments(issue_num)
+    if not wanted_attachments:
+        return [_select_attachment(attachments, issue_num, None)]
+
+    selected = list()
+    for wanted_attachment in wanted_attachments:
+        attachment = _select_attachment(attachments, issue_num, wanted_attachment)
+        if attachment not in selected:
+            selected.append(attachment)
+    return selected
+
+
+def _select_attachment(attachments: List[Attachment], issue_num, wanted_attachment):
     if len(attachments) == 0:
         raise McmdError("Issue #%s doesn't contain any files" % issue_num)
 
@@ -197,35 +400,46 @@ def _choose_attachment(attachments):
     return attachment_map[answer]
 
 
-def _download_attachment(attachment, issue_num):
+def _download_attachments(attachments: List[Attachment], issue_num) -> List[Path]:
+    """Downloads the attachments of an issue at the same time. Attachments that didn't change are not downloaded
+    again."""
     issue_folder = context().get_issues_folder().joinpath(issue_num)
     issue_folder.mkdir(parents=True, exist_ok=True)
-    file_path = issue_folder.joinpath(attachment.name)
-
-    if file_path.exists():
-        overwrite = mcmd.in_out.ask.confirm('File %s already exists. Re-download?' % file_path.name)
-        if not overwrite:
-            return file_path
-
-    in_out.start('Downloading %s from GitHub issue %s' % (highlight(attachment.name), highlight('#' + issue_num)))
-    try:
-        r = requests.get(attachment.url)
-        r.raise_for_status()
-        with file_path.open('wb') as f:
-            f.write(r.content)
-    except (OSError, requests.RequestException, requests.HTTPError) as e:
-        raise McmdError('Error downloading GitHub attachment: %s' % str(e))
+    paths = [issue_folder.joinpath(attachment.name) for attachment in attachments]
+
+    to_download = list()
+    for attachment, file_path in zip(attachments, paths):
+        # files that were downloaded before the download cache existed can't be checked for changes
+        if file_path.exists() and not downloads.is_cached(file_path):
+            overwrite = mcmd.in_out.ask.confirm('File %s already exists. Re-download?' % file_path.name)
+            if not overwrite:
+                continue
+        to_download.append((attachment, file_path))
+
+    if len(to_download) == 0:
+        return paths
+
+    names = ', '.join(highlight(attachment.name) for attachment, _ in to_download)
+    in_out.start('Downloading %s from GitHub issue %s' % (names, highlight('#' + issue_num)))
+    workers = min(len(to_download), config.get('settings', 'max_parallel_imports'))
+    download = metrics.propagate(lambda attachment, path: downloads.download(attachment.url, path))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        downloaded = list(executor.map(download, *zip(*to_download)))
     in_out.succeed()
-    return file_path
 
+    unchanged = [attachment.name for (attachment, _), is_downloaded in zip(to_download, downloaded)
+                 if not is_downloaded]
+    if unchanged:
+        in_out.info('Using the earlier download of unchanged attachment(s) {}'.format(
+            ', '.join(highlight(name) for name in unchanged)))
+    return paths
 
-def _do_import(file_path, package, entity_type_id, import_action):
-    in_out.start('Importing %s' % (highlight(file_path.name)))
 
+def _get_params(file_name, package, entity_type_id, import_action) -> dict:
     if import_action:
         action = import_action
     else:
-        action = _get_import_action(file_path.name)
+        action = _get_import_action(file_name)
 
     params = {'action': action,
               'metadataAction': 'upsert'}
@@ -234,12 +448,222 @@ def _do_import(file_path, package, entity_type_id, import_action):
         params['packageId'] = package
     if entity_type_id:
         params['entityTypeId'] = entity_type_id
+    return params
+
+
+def _show_status(run_ids: List[str]):
+    failed = list()
+    for run_id in run_ids:
+        import_run = import_runs.get_import_run(run_id)
+        if import_run.status == import_runs.FAILED:
+            failed.append(import_run)
+        elif import_run.status == import_runs.RUNNING:
+            in_out.info('Import run {} is still running'.format(highlight(run_id)))
+        else:
+            in_out.info('Import run {} has finished: {}'.format(highlight(run_id), import_run.message or ''))
+
+    for import_run in failed:
+        in_out.error('Import run {} has failed: {}'.format(highlight(import_run.id), import_run.message or ''))
+    if failed:
+        raise McmdError('{} of {} imports failed'.format(len(failed), len(run_ids)))
+
+
+def _run_imports(imports: List[_Import], parallel: int, timeout: Optional[int], wait: bool):
+    if len(imports) == 1:
+        _run_import(imports[0], timeout, wait)
+    else:
+        _run_import_pipeline(imports, parallel, timeout, wait)
+
+
+def _run_import(import_: _Import, timeout: Optional[int], wait: bool):
+    if import_.url:
+        in_out.start('Importing from URL %s' % highlight(import_.url))
+    else:
+        in_out.start('Importing %s' % (highlight(import_.name)))
+
+    def show_progress(sent: int, total: int):
+        percentage = sent * 100 // total if total > 0 else 100
+        in_out.update('Importing %s (uploaded %s of %s, %d%%)' % (highlight(import_.name),
+                                                                  files.format_size(sent),
+                                                                  files.format_size(total),
+                                                                  percentage))
+
+    import_run_url = _start_import(import_, progress=show_progress)
+    if import_.path:
+        in_out.update('Importing %s' % (highlight(import_.name)))
+    if not wait:
+        in_out.info('Import started, the id of the import run is {}'.format(
+            highlight(import_runs.get_run_id(import_run_url))))
+        return
+
+    import_run = import_runs.wait_for(import_run_url, timeout)
+    if import_run.status == import_runs.FAILED:
+        raise McmdError(import_run.message)
+
+
+def _run_import_pipeline(imports: List[_Import], parallel: int, timeout: Optional[int], wait: bool):
+    """
+    Uploads up to 'parallel' files at the same time and tracks all the resulting import runs together. An import only
+    starts when the imports it should run after have finished. Imports that should run after a failed import are
+    skipped.
+    """
+    _validate_dependencies(imports, wait)
+    in_out.start('Importing %s files' % highlight(str(len(imports))))
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    tracker = ImportRunTracker()
+    uploads = dict()
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=parallel)
+    try:
+        while True:
+            _start_ready_imports(imports, uploads, executor, parallel, cancel)
+            _collect_uploads(uploads, tracker, wait)
+            if tracker.is_tracking():
+                _finish_runs(imports, tracker.poll())
+            _skip_unreachable_imports(imports)
+            in_out.update('Importing %s files (%s)' % (highlight(str(len(imports))), _summarize(imports)))
+
+            if all(import_.is_done() for import_ in imports):
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                raise import_runs.timeout_error(tracker.get_outstanding(), timeout)
+
+            delay = tracker.next_delay() if tracker.is_tracking() else None
+            if deadline is not None:
+                delay = min(delay or timeout, max(deadline - time.monotonic(), 0))
+            if uploads:
+                # the time spent here is upload time, the requests of the uploads are recorded themselves
+                futures.wait(list(uploads), timeout=delay, return_when=futures.FIRST_COMPLETED)
+            elif delay:
+                with metrics.timed(metrics.WAIT, 'import runs'):
+                    time.sleep(delay)
+    except BaseException:
+        # uploads that are still running stop at the next chunk they send, there's no need to wait for them
+        cancel.set()
+        for future in uploads:
+            future.cancel()
+        executor.shutdown(wait=False)
+        raise
+    executor.shutdown()
+
+    failed = [import_ for import_ in imports if import_.status not in (_Status.FINISHED, _Status.STARTED)]
+    if failed:
+        in_out.error(None)
+    else:
+        in_out.succeed()
+
+    _print_status_table(imports)
+
+    if failed:
+        raise McmdError('{} of {} imports did not succeed'.format(len(failed), len(imports)))
+
+
+def _validate_dependencies(imports: List[_Import], wait: bool):
+    if not wait and any(import_.after for import_ in imports):
+        raise McmdError("Imports that should run after other imports can't be combined with --no-wait")
+
+    names = {name for import_ in imports for name in import_.get_names()}
+    for import_ in imports:
+        for dependency in import_.after:
+            if dependency not in names:
+                raise McmdError('Import {} should run after {}, but {} is not imported'.format(import_.name,
+                                                                                             dependency,
+                                                                                             dependency))
+
+    visited = set()
+
+    def visit(import_: _Import, path: List[str]):
+        if import_.name in path:
+            raise McmdError('Imports depend on each other: {}'.format(' -> '.join(path + [import_.name])))
+        if import_.name in visited:
+            return
+        for dependency in _get_dependencies(import_, imports):
+            visit(dependency, path + [import_.name])
+        visited.add(import_.name)
+
+    for import_ in imports:
+        visit(import_, list())
+
+
+def _get_dependencies(import_: _Import, imports: List[_Import]) -> List[_Import]:
+    return [other for other in imports
+            if other is not import_ and any(name in import_.after for name in other.get_names())]
+
+
+def _start_ready_imports(imports: List[_Import], uploads: dict, executor: ThreadPoolExecutor, parallel: int,
+                         cancel: threading.Event):
+    in_flight = len([import_ for import_ in imports if import_.status in (_Status.UPLOADING, _Status.RUNNING)])
+    for import_ in imports:
+        if in_flight >= parallel:
+            break
+        if import_.status == _Status.WAITING and all(dependency.status == _Status.FINISHED
+                                                     for dependency in _get_dependencies(import_, imports)):
+            import_.status = _Status.UPLOADING
+            import_.started = time.monotonic()
+            uploads[executor.submit(metrics.propagate(_start_import), import_, cancel=cancel)] = import_
+            in_flight += 1
+
+
+def _collect_uploads(uploads: dict, tracker: ImportRunTracker, wait: bool):
+    for future in [future for future in uploads if future.done()]:
+        import_ = uploads.pop(future)
+        try:
+            import_.run_url = future.result()
+        except McmdError as e:
+            import_.finish(_Status.FAILED, e.message)
+            continue
+
+        if wait:
+            import_.status = _Status.RUNNING
+            tracker.track(import_.run_url)
+        else:
+            import_.finish(_Status.STARTED, 'Import run {}'.format(import_runs.get_run_id(import_.run_url)))
+
+
+def _finish_runs(imports: List[_Import], done: List[import_runs.ImportRun]):
+    for import_run in done:
+        for import_ in imports:
+            if import_.run_url == import_run.url:
+                import_.finish(_Status[import_run.status], import_run.message)
+
+
+def _skip_unreachable_imports(imports: List[_Import]):
+    for import_ in imports:
+        if import_.status == _Status.WAITING:
+            failed = [dependency.name for dependency in _get_dependencies(import_, imports)
+                      if dependency.status in (_Status.FAILED, _Status.SKIPPED)]
+            if failed:
+                import_.finish(_Status.SKIPPED, 'Depends on {}'.format(', '.join(failed)))
+
+
+def _start_import(import_: _Import, progress=None, cancel: Optional[threading.Event] = None) -> str:
+    if import_.url:
+        params = dict(import_.params)
+        params['url'] = import_.url
+        response = post(api.import_by_url(), params=params)
+    else:
+        response = post_file(api.import_(), import_.path.resolve(), import_.params, compress=import_.compress,
+                             progress=progress, cancel=cancel)
+    return import_runs.get_run_url(response.text)
+
+
+def _summarize(imports: List[_Import]) -> str:
+    counts = [(status, len([import_ for import_ in imports if import_.status == status])) for status in _Status]
+    return ', '.join('{} {}'.format(count, status.value) for status, count in counts if count > 0)
+
+
+def _print_status_table(imports: List[_Import]):
+    rows = [('File', 'Status', 'Time', 'Message')]
+    for import_ in imports:
+        rows.append((import_.name, import_.status.value, import_.get_duration(), import_.message or ''))
 
-    response = post_file(api.import_(), file_path.resolve(), params)
-    import_run_url = urljoin(config.get('host', 'selected'), response.text)
-    status, message = _poll_for_completion(import_run_url)
-    if status == 'FAILED':
-        raise McmdError(message)
+    widths = [max(len(row[column]) for row in rows) for column in range(3)]
+
+    in_out.newline()
+    for number, row in enumerate(rows):
+        line = '  '.join(value.ljust(width) for value, width in zip(row, widths)) + '  ' + row[3]
+        log.info(bold(line.rstrip()) if number == 0 else line.rstrip())
 
 
 def _get_import_action(file_name):
@@ -249,17 +673,3 @@ def _get_import_action(file_name):
         if file_name.endswith(file_type):
             return action
     return config.get('settings', 'import_action')
-
-
-def _poll_for_completion(url):
-    def step_function(step):
-        """Increases time between polls with one second each time, with a maximum of 10 seconds."""
-        step += 1
-        return min(step, 10)
-
-    polling.poll(lambda: get(url).json()['status'] != 'RUNNING',
-                 step=0,
-                 step_function=step_function,
-                 poll_forever=True)
-    import_run = get(url).json()
-    return import_run['status'], import_run['message']
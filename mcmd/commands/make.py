@@ -1,5 +1,5 @@
 """
-Makes a user a member of a role or includes a group role in another role.
+Makes users members of roles or includes group roles in other roles.
 
 Differentiates between 'normal' roles and 'group' roles:
 - Normal roles are roles that do not belong to a group. A user can be a member of more than one of these roles.
@@ -7,28 +7,48 @@ Differentiates between 'normal' roles and 'group' roles:
 
 This command won't do anything if a user is already member of the specified role. In the case a user is already member
 of another role within the same group, this command will ask for confirmation before updating it.
+
+Many memberships can be made at once (with multiple subjects or a CSV file). The roles, users and current memberships
+are looked up with a few '=in=' queries before anything is changed, the changes are then sent in parallel.
 """
 
+import csv
 import json
 import textwrap
 from argparse import RawDescriptionHelpFormatter
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Optional, List, Dict, Set, Tuple, Callable
 from urllib.parse import urljoin
 
+import attr
+
 from mcmd.commands._registry import arguments
+from mcmd.core import metrics
 from mcmd.core.command import command
 from mcmd.core.compatibility import version
 from mcmd.core.errors import McmdError
 from mcmd.in_out import in_out, ask
 from mcmd.in_out.in_out import highlight
-from mcmd.molgenis import api
-from mcmd.molgenis.client import post, get, put
-from mcmd.molgenis.principals import to_role_name, get_principal_type_from_args, PrincipalType
+from mcmd.molgenis import api, data
+from mcmd.molgenis.client import post, put
+from mcmd.molgenis.principals import to_role_name, PrincipalType
 from mcmd.molgenis.rest_api_v2_mapper import map_to_role, map_to_user, map_to_role_membership
-from mcmd.molgenis.system import User, Group, Role, RoleMembership
+from mcmd.molgenis.system import User, Group, Role
 from mcmd.molgenis.version import get_version
+from mcmd.utils.iterables import chunks
 from mcmd.utils.time import timestamp
 
+# The number of requests that are sent at the same time
+_WORKERS = 4
+
+_ROLE_ATTRS = 'id,name,label,group(id,name)'
+_MEMBERSHIP_ATTRS = 'id,user(id,username),role(id,name,label,group(id,name))'
+
+# Store a reference to the parser so that we can show an error message for the custom validation rules
+_p_make = None
+
 
 # =========
 # Arguments
@@ -36,40 +56,48 @@ from mcmd.utils.time import timestamp
 
 @arguments('make')
 def add_arguments(subparsers):
-    p_make = subparsers.add_parser('make',
-                                   help='make a user or role member of a role',
-                                   formatter_class=RawDescriptionHelpFormatter,
-                                   description=textwrap.dedent(
-                                       """
-                                       Make a user or role member of a (group) role.  
-                                       
-                                       When no subject type is specified (with --user or --role), the Commander will 
-                                       try to detect it. 
-                                       
-                                       Version notes: 
-                                       - since MOLGENIS 8.1 it is possible to let roles include group roles (can be
-                                         used to make role ANONYMOUS or USER member of a group).
-                                       - since MOLGENIS 8.3 group and role names are case sensitive and need
-                                         to be typed exactly as-is. (Before 8.3 all role names will be upper cased 
-                                         automatically).
-                                       
-                                       example usage:
-                                         mcmd make john Biobanks_MANAGER
-                                         mcmd make jane GCC_EDITOR                                        
-                                         mcmd make --user jane GCC_EDITOR
-                                         mcmd make --role ANONYMOUS GCC_VIEWER
-                                       """
-                                   ))
-    p_make.set_defaults(func=make,
-                        write_to_history=True)
-    p_make.add_argument('subject',
-                        type=str,
-                        help='the user or role')
-    p_make.add_argument('target_role',
-                        metavar='role',
-                        type=str,
-                        help='the role to make the subject a member of')
-    p_make_subject = p_make.add_mutually_exclusive_group()
+    global _p_make
+    _p_make = subparsers.add_parser('make',
+                                    help='make a user or role member of a role',
+                                    usage='mcmd make [-h] [--user | --role] (subject [subject ...] role | '
+                                          '--from-file FILE)',
+                                    formatter_class=RawDescriptionHelpFormatter,
+                                    description=textwrap.dedent(
+                                        """
+                                        Make one or more users or roles member of a (group) role.
+
+                                        When no subject type is specified (with --user or --role), the Commander will
+                                        try to detect it.
+
+                                        Many memberships can be made at once with a CSV file with the columns
+                                        'subject' and 'role', and optionally 'type' (user or role).
+
+                                        Version notes:
+                                        - since MOLGENIS 8.1 it is possible to let roles include group roles (can be
+                                          used to make role ANONYMOUS or USER member of a group).
+                                        - since MOLGENIS 8.3 group and role names are case sensitive and need
+                                          to be typed exactly as-is. (Before 8.3 all role names will be upper cased
+                                          automatically).
+
+                                        example usage:
+                                          mcmd make john Biobanks_MANAGER
+                                          mcmd make jane GCC_EDITOR
+                                          mcmd make --user jane GCC_EDITOR
+                                          mcmd make --role ANONYMOUS GCC_VIEWER
+                                          mcmd make john jane GCC_EDITOR
+                                          mcmd make --from-file memberships.csv
+                                        """
+                                    ))
+    _p_make.set_defaults(func=make,
+                         write_to_history=True)
+    _p_make.add_argument('principals',
+                         metavar='subject [subject ...] role',
+                         nargs='*',
+                         help='the user(s) or role(s), followed by the role to make them a member of')
+    _p_make.add_argument('--from-file', '-f',
+                         metavar='FILE',
+                         help='a CSV file with the memberships to make')
+    p_make_subject = _p_make.add_mutually_exclusive_group()
     p_make_subject.add_argument('--user', '-u',
                                 action='store_true',
                                 help='flag to specify that the subject is a user')
@@ -82,169 +110,329 @@ def add_arguments(subparsers):
 # Methods
 # =======
 
+@attr.s(frozen=True, auto_attribs=True)
+class _Request:
+    """A request to make a subject (a user or a role) a member of a role."""
+    subject: str
+    role: str
+    subject_type: Optional[PrincipalType] = None
+
+
+@attr.s(auto_attribs=True)
+class _Index:
+    """The roles, users and current memberships that the requests refer to, looked up in bulk."""
+    roles: Dict[str, Role] = attr.ib(factory=dict)
+    users: Dict[str, User] = attr.ib(factory=dict)
+    group_memberships: Dict[Tuple[str, str], Role] = attr.ib(factory=dict)
+    role_memberships: Set[Tuple[str, str]] = attr.ib(factory=set)
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class _Action:
+    description: str
+    send: Callable[[], None]
+
+
+@attr.s(auto_attribs=True)
+class _Changes:
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
 @command
 def make(args):
-    role_name = to_role_name(args.target_role)
-    role = _get_role(role_name)
-    subject_type = _get_subject_type(args)
-    if subject_type == PrincipalType.USER:
-        user = _get_user(args.subject)
-        if role.group:
-            _make_member_of_group_role(user, role)
-        else:
-            _make_member_of_role(role, user)
-    elif subject_type == PrincipalType.ROLE:
-        subject = _get_role(args.subject)
-        _include_group_role(subject, role)
+    requests = _get_requests(args)
+    changes = _make_memberships(requests)
+
+    if len(requests) > 1:
+        in_out.info('Memberships added: {}, updated: {}, unchanged: {}'.format(changes.added,
+                                                                             changes.updated,
+                                                                             changes.unchanged))
+
+
+def _make_memberships(requests: List[_Request]) -> _Changes:
+    """Looks up everything the requests refer to, plans the changes and sends them."""
+    requests = _check_subject_types(requests)
+
+    index = _create_index(requests)
+    # the same membership can be requested more than once
+    requests = list(dict.fromkeys(attr.evolve(request, subject_type=_get_subject_type(request, index))
+                                  for request in requests))
+    _add_memberships(requests, index)
+
+    changes = _Changes()
+    actions = _plan(requests, index, changes, verbose=len(requests) == 1)
+    _send(actions)
+    return changes
+
+
+def _get_requests(args) -> List[_Request]:
+    if args.from_file and args.principals:
+        _p_make.error('argument --from-file: not allowed with subjects and a role')
+    if not args.from_file and len(args.principals) < 2:
+        _p_make.error('the following arguments are required: subject, role')
+
+    default_type = PrincipalType.USER if args.user else PrincipalType.ROLE if args.role else None
+    if args.from_file:
+        requests = _read_requests(Path(args.from_file), default_type)
     else:
-        raise ValueError("Unknown principal type")
+        requests = [_Request(subject=subject, role=args.principals[-1], subject_type=default_type)
+                    for subject in args.principals[:-1]]
+
+    requests = [attr.evolve(request, role=to_role_name(request.role)) for request in requests]
+    if len(requests) == 0:
+        raise McmdError('No memberships to make')
+    return requests
+
+
+def _read_requests(file: Path, default_type: Optional[PrincipalType]) -> List[_Request]:
+    if not file.is_file():
+        raise McmdError("File %s doesn't exist" % str(file.resolve()))
+
+    requests = list()
+    try:
+        with file.open(newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            if not reader.fieldnames or not {'subject', 'role'}.issubset(reader.fieldnames):
+                raise McmdError("The CSV file doesn't have a subject and a role column")
+
+            for row in reader:
+                subject = (row.get('subject') or '').strip()
+                role = (row.get('role') or '').strip()
+                if not subject or not role:
+                    raise McmdError('Missing subject or role on line {}'.format(reader.line_num))
+
+                requests.append(_Request(subject=subject,
+                                         role=role,
+                                         subject_type=_to_principal_type(row.get('type'), reader.line_num) or
+                                                      default_type))
+    except OSError as e:
+        raise McmdError('Error reading file: {}'.format(str(e)))
+    return requests
+
+
+def _to_principal_type(value: Optional[str], line: int) -> Optional[PrincipalType]:
+    if value is None or value.strip() == '':
+        return None
+    try:
+        return PrincipalType(value.strip().lower())
+    except ValueError:
+        raise McmdError("Unknown subject type '{}' on line {} (should be user or role)".format(value, line))
 
 
 # noinspection PyUnusedLocal
 @version('7.0.0')
-def _get_subject_type(args) -> PrincipalType:
+def _check_subject_types(requests: List[_Request]) -> List[_Request]:
     """
     Prior to 8.1 roles can't be included with the identities API so the subject is always a user.
     """
-    if args.role:
+    if any(request.subject_type == PrincipalType.ROLE for request in requests):
         raise McmdError(
             "Including group roles is only possible in MOLGENIS 8.3 and up (you are using {})".format(get_version()))
     else:
-        return PrincipalType.USER
+        return [attr.evolve(request, subject_type=PrincipalType.USER) for request in requests]
 
 
 @version('8.1.0')
-def _get_subject_type(args) -> PrincipalType:
+def _check_subject_types(requests: List[_Request]) -> List[_Request]:
     """
     From 8.1 and up, group roles can be included with the identities API so the subject can be a user or a role.
     """
-    return get_principal_type_from_args(args, principal_name=args.subject)
+    return requests
+
+
+def _create_index(requests: List[_Request]) -> _Index:
+    role_names = [request.role for request in requests]
+    role_names += [to_role_name(request.subject) for request in requests if request.subject_type != PrincipalType.USER]
+    usernames = [request.subject for request in requests if request.subject_type != PrincipalType.ROLE]
+
+    index = _Index()
+    for item in data.get_rows_in('sys_sec_Role', 'name', role_names, attrs=_ROLE_ATTRS):
+        role = map_to_role(item)
+        index.roles[role.name] = role
+    for item in data.get_rows_in('sys_sec_User', 'username', usernames, attrs='id,username'):
+        user = map_to_user(item)
+        index.users[user.username] = user
+
+    for request in requests:
+        if request.role not in index.roles:
+            raise McmdError('No role found with name {}'.format(request.role))
+    return index
+
+
+def _get_subject_type(request: _Request, index: _Index) -> PrincipalType:
+    is_user = request.subject in index.users
+    is_role = to_role_name(request.subject) in index.roles
+
+    if request.subject_type == PrincipalType.USER and not is_user:
+        raise McmdError('Unknown user {}'.format(request.subject))
+    elif request.subject_type == PrincipalType.ROLE and not is_role:
+        raise McmdError('No role found with name {}'.format(request.subject))
+    elif request.subject_type:
+        return request.subject_type
+    elif is_user and is_role:
+        answer = ask.multi_choice('Multiple principals found with name %s. Choose one:' % request.subject,
+                                  [PrincipalType.USER.value, PrincipalType.ROLE.value])
+        return PrincipalType(answer)
+    elif is_user:
+        return PrincipalType.USER
+    elif is_role:
+        return PrincipalType.ROLE
+    else:
+        raise McmdError('No principals found with name %s' % request.subject)
+
+
+def _add_memberships(requests: List[_Request], index: _Index):
+    """Adds the current memberships of the users to the index: of the roles and of the groups of the group roles."""
+    user_requests = [request for request in requests if request.subject_type == PrincipalType.USER]
+    if len(user_requests) == 0:
+        return
+
+    target_roles = [index.roles[request.role] for request in user_requests]
+    group_ids = {role.group.id for role in target_roles if role.group}
+    role_ids = {role.id for role in target_roles if not role.group}
+    role_ids.update(role['id'] for role in data.get_rows_in('sys_sec_Role', 'group', group_ids, attrs='id'))
+
+    user_ids = {index.users[request.subject].id for request in user_requests}
+    for user_ids_chunk in chunks(sorted(user_ids), data.IDS_PER_QUERY):
+        for role_ids_chunk in chunks(sorted(role_ids), data.IDS_PER_QUERY):
+            query = "user=in=({});role=in=({});(to=='',to=ge={})".format(','.join(user_ids_chunk),
+                                                                          ','.join(role_ids_chunk),
+                                                                          timestamp())
+            for page in data.get_pages('sys_sec_RoleMembership', attrs=_MEMBERSHIP_ATTRS, query=query):
+                for item in page['items']:
+                    membership = map_to_role_membership(item)
+                    if membership.role.group:
+                        index.group_memberships[(membership.user.id, membership.role.group.id)] = membership.role
+                    else:
+                        index.role_memberships.add((membership.user.id, membership.role.id))
+
+
+def _plan(requests: List[_Request], index: _Index, changes: _Changes, verbose: bool) -> List[_Action]:
+    """Determines which memberships should be added or updated. Nothing is changed yet."""
+    actions = list()
+    new_role_memberships = list()
+    planned_group_roles = dict()
+    for request in requests:
+        role = index.roles[request.role]
+        if request.subject_type == PrincipalType.ROLE:
+            actions.append(_plan_include(index.roles[to_role_name(request.subject)], role))
+            changes.added += 1
+            continue
+
+        user = index.users[request.subject]
+        if role.group:
+            planned = planned_group_roles.setdefault((user.id, role.group.id), role)
+            if planned != role:
+                raise McmdError("User {} can't be a member of both {} and {}".format(user.username, planned.name,
+                                                                                     role.name))
+            action = _plan_group_role_membership(user, role, index, changes, verbose)
+            if action:
+                actions.append(action)
+        elif (user.id, role.id) in index.role_memberships:
+            changes.unchanged += 1
+            if verbose:
+                in_out.info('User {} is already a member of role {}'.format(highlight(user.username),
+                                                                            highlight(role.name)))
+        else:
+            new_role_memberships.append((user, role))
+            changes.added += 1
 
+    for memberships in chunks(new_role_memberships, data.MAX_BATCH_SIZE):
+        actions.append(_plan_role_memberships(memberships))
+    return actions
 
-def _make_member_of_group_role(user: User, role: Role):
+
+def _plan_group_role_membership(user: User, role: Role, index: _Index, changes: _Changes,
+                                verbose: bool) -> Optional[_Action]:
     group = role.group
-    membership = _get_group_membership(user, group)
-    if membership:
-        if membership.role.name == role.name:
-            in_out.info('User {} is already {} of group {}'.format(highlight(user.username),
-                                                               highlight(role.label),
-                                                               highlight(group.name)))
-        else:
-            update = ask.confirm(
-                'User {} is {} of group {}. Do you want to update his/her role to {}?'.format(user.username,
-                                                                                              membership.role.label,
-                                                                                              group.name,
-                                                                                              role.label))
-            if update:
-                _update_group_role_membership(user, group, role)
+    current_role = index.group_memberships.get((user.id, group.id))
+    if current_role:
+        if current_role.name == role.name:
+            changes.unchanged += 1
+            if verbose:
+                in_out.info('User {} is already {} of group {}'.format(highlight(user.username),
+                                                                   highlight(role.label),
+                                                                   highlight(group.name)))
+            return None
+
+        update = ask.confirm(
+            'User {} is {} of group {}. Do you want to update his/her role to {}?'.format(user.username,
+                                                                                          current_role.label,
+                                                                                          group.name,
+                                                                                          role.label))
+        if not update:
+            changes.unchanged += 1
+            return None
+
+        changes.updated += 1
+        return _Action(description=_describe_membership(user, role),
+                       send=partial(_update_group_role_membership, user, group, role))
     else:
-        _add_group_role_membership(user, group, role)
+        changes.added += 1
+        return _Action(description=_describe_membership(user, role),
+                       send=partial(_add_group_role_membership, user, group, role))
 
 
-def _make_member_of_role(role, user):
-    if _is_member(user, role):
-        in_out.info('User {} is already a member of role {}'.format(highlight(user.username), highlight(role.name)))
+def _plan_role_memberships(memberships: List[Tuple[User, Role]]) -> _Action:
+    if len(memberships) == 1:
+        description = _describe_membership(*memberships[0])
     else:
-        _add_role_membership(user, role)
+        description = 'Adding {} role memberships'.format(len(memberships))
+    return _Action(description=description, send=partial(_add_role_memberships, memberships))
 
 
-def _add_group_role_membership(user: User, group: Group, role: Role):
-    in_out.start('Making user {} a member of role {}'.format(highlight(user.username), highlight(role.name)))
-    url = api.member(group.name)
-    post(url, data={'username': user.username, 'roleName': role.name})
-
-
-def _update_group_role_membership(user: User, group: Group, role: Role):
-    in_out.start('Making user {} a member of role {}'.format(highlight(user.username), highlight(role.name)))
-    url = urljoin(api.member(group.name), user.username)
-    put(url, data=json.dumps({'roleName': role.name}))
-
-
-def _add_role_membership(user: User, role: Role):
-    """
-    Adds a membership manually because the identities API can't add memberships to non-group roles.
-    """
-    in_out.start('Making user {} a member of role {}'.format(highlight(user.username), highlight(role.name)))
-    membership = {'user': user.id,
-                  'role': role.id,
-                  'from': timestamp()}
-    data = {'entities': [membership]}
-    post(api.rest2('sys_sec_RoleMembership'), data=data)
-
-
-@version('8.1.0')
-def _include_group_role(subject: Role, target_role: Role):
+def _plan_include(subject: Role, target_role: Role) -> _Action:
     if not target_role.group:
         raise McmdError('Role {} is not a group role'.format(target_role.name))
     if subject.name == target_role.name:
         raise McmdError("A role can't include itself")
 
-    in_out.start('Including role {} in role {}'.format(highlight(target_role.name), highlight(subject.name)))
-    include = {'role': target_role.name}
-    put(api.role(target_role.group.name, subject.name), data=json.dumps(include))
-
-
-def _get_group_membership(user: User, group: Group) -> Optional[RoleMembership]:
-    group_roles = _get_group_roles(group)
-    group_role_ids = [role.id for role in group_roles]
-
-    memberships = get(api.rest2('sys_sec_RoleMembership'),
-                      params={
-                          'attrs': 'id,user(id,username),role(id,name,label,group(id,name))',
-                          'q': "user=={};role=in=({});(to=='',to=ge={})".format(user.id, ','.join(group_role_ids),
-                                                                                timestamp())
-                      }).json()['items']
+    return _Action(description='Including role {} in role {}'.format(highlight(target_role.name),
+                                                                      highlight(subject.name)),
+                   send=partial(_include_group_role, subject, target_role))
 
-    if len(memberships) == 0:
-        return None
-    else:
-        return map_to_role_membership(memberships[0])
 
+def _describe_membership(user: User, role: Role) -> str:
+    return 'Making user {} a member of role {}'.format(highlight(user.username), highlight(role.name))
 
-def _get_group_roles(group: Group) -> List[Role]:
-    roles = get(api.rest2('sys_sec_Role'),
-                params={
-                    'attrs': 'id,name,label,group(id,name)',
-                    'q': 'group=={}'.format(group.id)
-                }).json()['items']
 
-    if len(roles) == 0:
-        raise McmdError('No roles found for group {}'.format(group.name))
+def _send(actions: List[_Action]):
+    if len(actions) == 0:
+        return
+    elif len(actions) == 1:
+        in_out.start(actions[0].description)
+        actions[0].send()
+        return
 
-    return [map_to_role(role) for role in roles]
+    in_out.start('Sending {} membership changes'.format(len(actions)))
+    with ThreadPoolExecutor(max_workers=min(_WORKERS, len(actions))) as executor:
+        results = [executor.submit(metrics.propagate(action.send)) for action in actions]
+        for result in results:
+            result.result()
 
 
-def _is_member(user: User, role: Role) -> bool:
-    memberships = get(api.rest2('sys_sec_RoleMembership'),
-                      params={
-                          'attrs': 'id',
-                          'q': "user=={};role=={};(to=='',to=ge={})".format(user.id, role.id, timestamp())
-                      }).json()['items']
+def _add_group_role_membership(user: User, group: Group, role: Role):
+    url = api.member(group.name)
+    post(url, data={'username': user.username, 'roleName': role.name})
 
-    return len(memberships) > 0
 
+def _update_group_role_membership(user: User, group: Group, role: Role):
+    url = urljoin(api.member(group.name), user.username)
+    put(url, data=json.dumps({'roleName': role.name}))
 
-def _get_user(user_name: str) -> User:
-    users = get(api.rest2('sys_sec_User'),
-                params={
-                    'attrs': 'id,username',
-                    'q': 'username=={}'.format(user_name)
-                }).json()['items']
-
-    if len(users) == 0:
-        raise McmdError('Unknown user {}'.format(user_name))
-    else:
-        return map_to_user(users[0])
 
+def _add_role_memberships(memberships: List[Tuple[User, Role]]):
+    """
+    Adds memberships manually because the identities API can't add memberships to non-group roles.
+    """
+    data.add_rows('sys_sec_RoleMembership', [{'user': user.id,
+                                              'role': role.id,
+                                              'from': timestamp()} for user, role in memberships])
 
-def _get_role(role_name: str) -> Role:
-    roles = get(api.rest2('sys_sec_Role'),
-                params={
-                    'attrs': 'id,name,label,group(id,name)',
-                    'q': 'name=={}'.format(role_name)
-                }).json()['items']
 
-    if len(roles) == 0:
-        raise McmdError('No role found with name {}'.format(role_name))
-    else:
-        return map_to_role(roles[0])
+@version('8.1.0')
+def _include_group_role(subject: Role, target_role: Role):
+    include = {'role': target_role.name}
+    put(api.role(target_role.group.name, subject.name), data=json.dumps(include))
@@ -2,6 +2,7 @@ from colorama import Fore
 
 import mcmd.config.config as config
 from mcmd.commands._registry import arguments
+from mcmd.core import store
 from mcmd.core.command import command
 from mcmd.core.errors import McmdError
 from mcmd.in_out.in_out import highlight
@@ -18,20 +19,26 @@ def add_arguments(subparsers):
                                    help='ping the selected host')
     p_make.set_defaults(func=ping,
                         write_to_history=False)
+    p_make.add_argument('--refresh', '-r',
+                        action='store_true',
+                        help='refresh all cached information about the host: besides the MOLGENIS version (which is '
+                             'always updated by ping) the token will be validated again by the next command')
 
 
 # =======
 # Methods
 # =======
 
-# noinspection PyUnusedLocal
 @command
 def ping(args):
     host = config.get('host', 'selected')
     user = config.username()
     status = Fore.LIGHTGREEN_EX + 'Online' + Fore.RESET
+    if args.refresh:
+        store.set_token_validity(config.url(), None)
     try:
-        version = molgenis_version.get_version()
+        # always ask the server itself, otherwise an offline host could be reported as online
+        version = molgenis_version.refresh()
     except McmdError:
         status = Fore.LIGHTRED_EX + 'Offline' + Fore.RESET
         version = None
@@ -1,16 +1,16 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from mcmd.args.actions import ParseKeyValue
 from mcmd.commands._registry import arguments
+from mcmd.core import metrics
 from mcmd.core.command import command, CommandType
 from mcmd.core.context import context
 from mcmd.core.errors import McmdError
 from mcmd.in_out import in_out
-from mcmd.script import script_runner
+from mcmd.script import script_runner, profile_report, script_cache
 from mcmd.script.model.script import Script
 from mcmd.script.options import ScriptOptions
-from mcmd.script.parser import script_parser
 from mcmd.script.parser.errors import InvalidScriptError, ScriptValidationError
 from mcmd.utils import files
 
@@ -49,10 +49,27 @@ def add_arguments(subparsers):
     p_run.add_argument('--dry', '-d',
                        action='store_true',
                        help='runs the script without actually executing any of the commands')
+    p_run.add_argument('--parallel', '-P',
+                       type=int,
+                       default=1,
+                       metavar='N',
+                       help='run up to N commands at the same time - commands run in batches that are separated by '
+                            'inputs, waits and $barrier statements')
+    p_run.add_argument('--profile', '-r',
+                       action='store_true',
+                       help='show the time, the number of requests, the transferred bytes and the time spent waiting '
+                            'for imports of every line, the most expensive lines first')
+    p_run.add_argument('--profile-output', '-o',
+                       metavar='FILE',
+                       help='write the profile of every line to a file (implies --profile): JSON if the file name '
+                            'ends with .json, CSV otherwise')
 
 
 @command
 def run(args):
+    if args.parallel < 1:
+        raise McmdError('The number of parallel commands should be at least 1')
+
     script_file = _get_script(args)
     lines = files.read_file_lines(script_file)
 
@@ -62,13 +79,30 @@ def run(args):
                             dry_run=args.dry,
                             start_at=args.from_line,
                             log_comments=not args.hide_comments,
-                            exit_on_error=not args.ignore_errors)
-    script_runner.run(script, options)
+                            exit_on_error=not args.ignore_errors,
+                            parallel=args.parallel)
+
+    if not (args.profile or args.profile_output):
+        script_runner.run(script, options)
+        return
+
+    metrics.enable()
+    try:
+        script_runner.run(script, options)
+    finally:
+        _report_profile(script, args.profile_output)
+
+
+def _report_profile(script: Script, output: Optional[str]):
+    report = profile_report.create_report(script.lines)
+    profile_report.print_report(report)
+    if output:
+        profile_report.write_report(report, Path(output))
 
 
 def _try_parse_script(lines: List[str]) -> Script:
     try:
-        return script_parser.parse(lines)
+        return script_cache.parse(lines)
     except InvalidScriptError as e:
         _print_errors_and_exit(e.errors)
 
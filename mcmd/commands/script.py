@@ -100,7 +100,7 @@ def _create_script(args):
         log.info('History is empty.')
         return
 
-    options = [line[1] for line in lines]
+    options = [line.command for line in lines]
     commands = mcmd.in_out.ask.checkbox('Pick the lines that will form the script:', options)
     file_name = _input_script_name()
     try:
@@ -2,6 +2,8 @@
 Provides access to the configuration.
 """
 
+import hashlib
+import io
 import operator
 from functools import reduce
 from pathlib import Path
@@ -10,14 +12,22 @@ from typing import Optional
 from ruamel.yaml import YAML
 
 import mcmd.core.errors as errors
+from mcmd.utils import file_lock
 
 _config = None
 _properties_file: Optional[Path] = None
 
+# The hash of the properties file as it is on disk, used to skip writes that wouldn't change the file
+_persisted_hash: Optional[str] = None
 
-def set_config(config, properties_file):
+
+def set_config(config, properties_file, persisted_hash: Optional[str] = None, persist: bool = True):
     """The config module must not have dependencies on other modules in the config package so the necessary information
-    should be passed here."""
+    should be passed here.
+
+    :param persisted_hash: the hash of the properties file's current content (see get_hash)
+    :param persist: whether the config might differ from the properties file and should be written (if it changed)
+    """
     global _config
     if _config:
         raise ValueError('config already set')
@@ -28,12 +38,39 @@ def set_config(config, properties_file):
         raise ValueError('properties file already set')
     _properties_file = properties_file
 
-    _persist()
+    global _persisted_hash
+    _persisted_hash = persisted_hash
+
+    if persist:
+        _persist()
+
+
+def get_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_persisted_hash() -> Optional[str]:
+    return _persisted_hash
 
 
 def _persist():
-    """Writes the config to disk."""
-    YAML().dump(_config, _properties_file)
+    """Writes the config to disk, unless the file already has the same content."""
+    global _persisted_hash
+
+    stream = io.StringIO()
+    YAML().dump(_config, stream)
+    content = stream.getvalue().encode('utf-8')
+
+    content_hash = get_hash(content)
+    if content_hash == _persisted_hash:
+        return
+
+    try:
+        with file_lock.locked(_properties_file):
+            file_lock.replace_atomically(_properties_file, content)
+    except OSError as e:
+        raise errors.McmdError('Unable to save the configuration file: {}'.format(str(e)))
+    _persisted_hash = content_hash
 
 
 def get(*args):
@@ -5,13 +5,17 @@ Some properties require user input (the username and password of the host for ex
 API endpoints). New properties should always be added to the 'defaults.yaml' file. Properties that also require user
 input can define a custom configurer in this module that will help the user on the CLI instead of letting them edit
 the property file directly.
+
+Loading and merging the YAML files is relatively slow, so the merged config is cached in a pickle file. The cache is
+used as long as the contents of the properties file and the defaults file haven't changed (both files are small, so
+hashing them is cheap and, unlike modification times, doesn't miss changes made shortly after each other).
 """
 
 import os
+import pickle
 from collections import OrderedDict
 from pathlib import Path
 
-import pkg_resources
 from ruamel.yaml import YAML, YAMLError
 
 import mcmd.config.config as config
@@ -20,8 +24,10 @@ import mcmd.in_out.in_out
 from mcmd.core.context import context
 from mcmd.in_out import in_out
 from mcmd.in_out.in_out import highlight
+from mcmd.utils import file_lock
 
-_DEFAULT_PROPERTIES = pkg_resources.resource_stream('mcmd.config', 'defaults.yaml')
+_DEFAULT_PROPERTIES = Path(__file__).parent.joinpath('defaults.yaml')
+_CACHE_SUFFIX = '.cache'
 
 
 def property_configurers():
@@ -34,16 +40,23 @@ def property_configurers():
 def load_config():
     yaml = YAML()
 
-    default_config = _try_load_yaml(yaml, _DEFAULT_PROPERTIES)
-
     if _is_install_required():
+        default_config = _try_load_yaml(yaml, _DEFAULT_PROPERTIES)
         if os.getenv('MCMD_INSTALL_NON_INTERACTIVE', 'False').lower() == 'true':
             _install_non_interactive(default_config)
         else:
             _install(default_config)
         exit(0)
 
-    user_config = _try_load_yaml(yaml, context().get_properties_file())
+    properties_file = context().get_properties_file()
+    content = properties_file.read_bytes()
+    cached = _load_cache(properties_file, content)
+    if cached:
+        config.set_config(cached['config'], properties_file, cached['hash'], persist=False)
+        return
+
+    default_config = _try_load_yaml(yaml, _DEFAULT_PROPERTIES)
+    user_config = _try_load_yaml(yaml, content)
 
     if _is_upgrade_required(user_config):
         _upgrade(default_config, user_config)
@@ -51,13 +64,50 @@ def load_config():
     # merge the configs so that new properties and list items are added
     _merge(default_config, user_config)
 
-    # pass result to the config module and save to disk
-    config.set_config(default_config, context().get_properties_file())
+    # pass result to the config module and save to disk (if the merge changed anything)
+    config.set_config(default_config, properties_file, config.get_hash(content))
+    _save_cache(properties_file, default_config)
+
+
+def _load_cache(properties_file: Path, content: bytes):
+    try:
+        with _get_cache_file(properties_file).open('rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+        return None
+
+    if not isinstance(cached, dict) or cached.get('key') != _get_cache_key(content):
+        return None
+    return cached
+
+
+def _save_cache(properties_file: Path, config_):
+    """Caches the merged config. Failing to do so only makes the next startup slower."""
+    try:
+        content = properties_file.read_bytes()
+        if config.get_hash(content) != config.get_persisted_hash():
+            # the file has been changed by another process in the meantime
+            return
+
+        cached = {'key': _get_cache_key(content),
+                  'hash': config.get_persisted_hash(),
+                  'config': config_}
+        file_lock.replace_atomically(_get_cache_file(properties_file), pickle.dumps(cached))
+    except (OSError, pickle.PickleError):
+        pass
+
+
+def _get_cache_key(content: bytes):
+    return config.get_hash(content), config.get_hash(_DEFAULT_PROPERTIES.read_bytes())
+
+
+def _get_cache_file(properties_file: Path) -> Path:
+    return properties_file.with_name('.' + properties_file.name + _CACHE_SUFFIX)
 
 
-def _try_load_yaml(yaml: YAML, path: Path):
+def _try_load_yaml(yaml: YAML, source):
     try:
-        return yaml.load(path)
+        return yaml.load(source)
     except YAMLError as e:
         in_out.error("There's an error in the configuration file: {}".format(e))
         exit(1)
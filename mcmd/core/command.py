@@ -1,9 +1,10 @@
 import sys
+import time
 from enum import Enum
 
 from mcmd.args.errors import ArgumentSyntaxError
 from mcmd.config import config
-from mcmd.core import history
+from mcmd.core import history, metrics
 from mcmd.core.errors import McmdError, ScriptError
 from mcmd.in_out import in_out
 from mcmd.molgenis import auth
@@ -31,9 +32,11 @@ def command(func):
         """
 
         success = True
+        start = time.monotonic()
         try:
             _set_authentication(args)
-            func(args)
+            with metrics.timed(metrics.COMMAND, args.command, arguments=getattr(args, 'arg_string', None)):
+                func(args)
         except ArgumentSyntaxError as error:
             # Some commands have additional argument checks that are evaluated at runtime
             success = False
@@ -53,7 +56,7 @@ def command(func):
             in_out.succeed()
         finally:
             if args.write_to_history:
-                history.write(args.arg_string, success=success)
+                history.write(args.arg_string, success=success, duration=time.monotonic() - start)
 
     return wrapper
 
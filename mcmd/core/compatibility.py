@@ -14,6 +14,10 @@ from mcmd.molgenis import version as molgenis_version
 MIN_VERSION = '7.0.0'
 _registry = defaultdict(dict)
 
+# Maps function ids to the implementation that belongs to the MOLGENIS version the table was built for
+_dispatch_table = dict()
+_dispatch_version = None
+
 
 def version(version_: str):
     """
@@ -36,30 +40,22 @@ def version(version_: str):
 
     def registrar(func):
         """
-        Registers all functions with the @version decorator and replaces them with a general getter that will decide at
-        runtime which implementation to return.
+        Registers all functions with the @version decorator and replaces them with a dispatcher that will call the
+        implementation that matches the MOLGENIS version.
         """
 
-        @wraps(func)
-        def wrapper():
-            def getter(*args, **kwargs):
-                """Returns the needed implementation based on the MOLGENIS version."""
-
-                id_ = _get_func_id(func)
-                available_versions = list(_registry[id_].keys())
-                v = _get_closest_version(available_versions)
-                wanted_func = _registry[_get_func_id(func)][v]
-                return wanted_func(*args, **kwargs)
-
-            return getter
-
         func_id = _get_func_id(func)
         if version_ in _registry[func_id]:
             raise ValueError('Function already registered: {}'.format(func_id))
 
         _registry[func_id][version_] = func
+        _dispatch_table.pop(func_id, None)
+
+        @wraps(func)
+        def dispatcher(*args, **kwargs):
+            return _resolve(func_id)(*args, **kwargs)
 
-        return wrapper()
+        return dispatcher
 
     return registrar
 
@@ -94,8 +90,27 @@ def deprecated(since: str, action: str = 'This feature', info: str = None):
     return decorator
 
 
-def _get_closest_version(versions: List[str]):
+def _resolve(func_id: str):
+    """
+    Returns the implementation of a function for the current MOLGENIS version. The implementations are looked up once
+    per version and kept in a dispatch table, which is cleared when the MOLGENIS version changes.
+    """
+    global _dispatch_version
     mol_version = molgenis_version.get_version_number()
+    if mol_version != _dispatch_version:
+        _dispatch_table.clear()
+        _dispatch_version = mol_version
+
+    try:
+        return _dispatch_table[func_id]
+    except KeyError:
+        implementations = _registry[func_id]
+        func = implementations[_get_closest_version(list(implementations.keys()), mol_version)]
+        _dispatch_table[func_id] = func
+        return func
+
+
+def _get_closest_version(versions: List[str], mol_version: str):
     if mol_version in versions:
         return mol_version
     else:
@@ -54,6 +54,10 @@ class Context(ABC):
     def get_storage_file(self) -> Path:
         pass
 
+    @abstractmethod
+    def get_cache_folder(self) -> Path:
+        pass
+
     def __enter__(self):
         """Replace the previous context (if any) with this context."""
         self.previous_context = context_holder.get_context()
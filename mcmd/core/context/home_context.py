@@ -12,9 +12,10 @@ class HomeContext(Context):
     _SCRIPT_FOLDER = 'scripts'
     _BACKUP_FOLDER = 'backups'
     _ISSUE_FOLDER = 'issues'
+    _CACHE_FOLDER = 'cache'
     _PROPERTIES_FILE = 'mcmd.yaml'
     _HISTORY_FILE = 'history.log'
-    _STORAGE_FILE = '.storage.pkl'
+    _STORAGE_FILE = '.storage.db'
 
     def _get_mcmd_home(self) -> Path:
         mcmd_home = Path().home().joinpath(self._MCMD_FOLDER)
@@ -32,6 +33,10 @@ class HomeContext(Context):
         issues_folder = self._get_mcmd_home().joinpath(self._ISSUE_FOLDER)
         return self._mkdir_if_not_exists(issues_folder)
 
+    def get_cache_folder(self) -> Path:
+        cache_folder = self._get_mcmd_home().joinpath(self._CACHE_FOLDER)
+        return self._mkdir_if_not_exists(cache_folder)
+
     def get_history_file(self) -> Path:
         return self._get_mcmd_home().joinpath(self._HISTORY_FILE)
 
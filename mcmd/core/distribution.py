@@ -0,0 +1,20 @@
+"""
+Information about the installed molgenis-commander package. Uses importlib.metadata when it's available, because
+importing pkg_resources takes a considerable part of the startup time.
+"""
+
+try:
+    from importlib import metadata
+except ImportError:  # Python 3.6 and 3.7
+    metadata = None
+
+_DISTRIBUTION = 'molgenis-commander'
+
+
+def get_version() -> str:
+    """Returns the installed version of the commander."""
+    if metadata:
+        return metadata.version(_DISTRIBUTION)
+    else:
+        import pkg_resources
+        return pkg_resources.get_distribution(_DISTRIBUTION).version
@@ -1,52 +1,167 @@
-from collections import deque
+"""
+The history of the commands that were run.
+
+The history is an append-only log file with one line per command. It is read backwards from the end in blocks, so
+reading the last entries doesn't depend on the size of the file. When the file grows larger than _MAX_SIZE it is
+rotated: the previous file is kept as 'history.log.1', older files are removed.
+"""
+
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Iterator
+
+import attr
 
 from mcmd.core.context import context
 from mcmd.core.errors import McmdError
+from mcmd.utils import file_lock
 
 _INDICATOR_SUCCESS = 'v'
 _INDICATOR_FAILURE = 'x'
 
+# Fields of an entry are separated by tabs, entries of older versions only contain the indicator and the command
+_SEPARATOR = '\t'
+_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+_MAX_SIZE = 10 * 1024 * 1024
+_ROTATED_FILES = 1
+_BLOCK_SIZE = 64 * 1024
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class HistoryEntry:
+    success: bool
+    command: str
+    timestamp: Optional[datetime] = None
+    duration: Optional[float] = None
 
-def write(arg_string, success):
-    try:
-        history = open(str(context().get_history_file()), 'a')
 
-        indicator = _INDICATOR_SUCCESS
-        if not success:
-            indicator = _INDICATOR_FAILURE
+def write(arg_string, success, duration: Optional[float] = None):
+    indicator = _INDICATOR_SUCCESS if success else _INDICATOR_FAILURE
+    fields = [indicator,
+              datetime.now().strftime(_TIMESTAMP_FORMAT),
+              '' if duration is None else '{:.3f}'.format(duration),
+              arg_string.replace('\n', ' ')]
 
-        history.write('%s %s\n' % (indicator, arg_string))
+    history_file = context().get_history_file()
+    try:
+        with history_file.open('a') as history:
+            history.write(_SEPARATOR.join(fields) + '\n')
+
+        if history_file.stat().st_size > _MAX_SIZE:
+            _rotate(history_file)
     except OSError as e:
         raise McmdError("Error writing to history: %s" % str(e))
 
 
-def read(num_lines, include_fails):
-    lines = deque()
-
-    if not context().get_history_file().is_file():
-        return lines
+def read(num_lines, include_fails, grep: Optional[str] = None, since: Optional[datetime] = None,
+         only_fails: bool = False) -> List[HistoryEntry]:
+    """
+    Reads the last entries of the history, starting at the end of the file. The file is only read as far as necessary.
+    :param num_lines: the maximum number of entries to return
+    :param include_fails: whether to include commands that failed
+    :param grep: a regular expression that the command should contain
+    :param since: only include commands that were run after this moment
+    :param only_fails: only include commands that failed
+    :return: the entries, the oldest first
+    """
+    try:
+        pattern = re.compile(grep) if grep else None
+    except re.error as e:
+        raise McmdError('Invalid regular expression: %s' % str(e))
 
+    entries = list()
     try:
-        with open(str(context().get_history_file()), 'r') as history:
-            for line in history:
-                line = line.rstrip('\n')
-
-                if line.startswith(_INDICATOR_FAILURE):
-                    if include_fails:
-                        lines.append((False, line[2:]))
-                else:
-                    lines.append((True, line[2:]))
-
-                if len(lines) > num_lines:
-                    lines.popleft()
+        for entry in _read_backwards():
+            if len(entries) >= num_lines:
+                break
+            if since and (entry.timestamp is None or entry.timestamp < since):
+                # the history is chronological, so all remaining entries are older
+                break
+            if (entry.success and only_fails) or (not entry.success and not include_fails):
+                continue
+            if pattern and not pattern.search(entry.command):
+                continue
+            entries.append(entry)
     except OSError as e:
         raise McmdError("Error reading from history: %s" % str(e))
 
-    return lines
+    entries.reverse()
+    return entries
 
 
 def clear():
+    history_file = context().get_history_file()
     try:
-        open(str(context().get_history_file()), 'w').close()
+        with file_lock.locked(history_file):
+            open(str(history_file), 'w').close()
+            for rotated_file in _get_rotated_files(history_file):
+                if rotated_file.exists():
+                    rotated_file.unlink()
     except OSError as e:
         raise McmdError("Error clearing history: %s" % str(e))
+
+
+def _rotate(history_file: Path):
+    with file_lock.locked(history_file):
+        # another process might have rotated the file while this one was waiting for the lock
+        if history_file.stat().st_size <= _MAX_SIZE:
+            return
+
+        rotated_files = _get_rotated_files(history_file)
+        for older, newer in zip(reversed(rotated_files), reversed([history_file] + rotated_files[:-1])):
+            if newer.exists():
+                os.replace(str(newer), str(older))
+
+
+def _get_rotated_files(history_file: Path) -> List[Path]:
+    return [history_file.with_name('{}.{}'.format(history_file.name, i)) for i in range(1, _ROTATED_FILES + 1)]
+
+
+def _read_backwards() -> Iterator[HistoryEntry]:
+    history_file = context().get_history_file()
+    for file in [history_file] + _get_rotated_files(history_file):
+        if file.is_file():
+            for line in _read_lines_backwards(file):
+                if line:
+                    yield _parse(line)
+
+
+def _read_lines_backwards(file: Path) -> Iterator[str]:
+    """Yields the lines of a file, starting with the last line. The file is read in blocks of _BLOCK_SIZE bytes."""
+    with file.open('rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+        while position > 0:
+            size = min(_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+
+            # the first line might continue in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode('utf-8', errors='replace')
+        yield remainder.decode('utf-8', errors='replace')
+
+
+def _parse(line: str) -> HistoryEntry:
+    success = not line.startswith(_INDICATOR_FAILURE)
+    if line[1:2] != _SEPARATOR:
+        # an entry of an older version
+        return HistoryEntry(success=success, command=line[2:])
+
+    __, timestamp, duration, arg_string = line.split(_SEPARATOR, 3)
+    return HistoryEntry(success=success,
+                        command=arg_string,
+                        timestamp=_parse_timestamp(timestamp),
+                        duration=float(duration) if duration else None)
+
+
+def _parse_timestamp(timestamp: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(timestamp, _TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
@@ -0,0 +1,237 @@
+"""
+Instrumentation: records how long commands and HTTP requests take and counts things like retries and token checks.
+
+Nothing is recorded until the instrumentation is enabled (with the --stats or --trace options). The recorded data can be
+shown as a summary table or written to a trace file: a Chrome trace (open it in chrome://tracing or Perfetto) when the
+file name ends with '.json', otherwise a JSON Lines file with one event per line.
+
+Events can be attributed to a scope (like the line of a script that is being run) with the scope context manager. The
+scope is kept per thread; functions that are run in other threads can be wrapped with propagate to keep the scope.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, List, Any, Callable
+from urllib.parse import urlsplit
+
+import attr
+
+from mcmd.core.errors import McmdError
+from mcmd.in_out.in_out import bold
+from mcmd.in_out.logging import get_logger
+from mcmd.utils.files import format_size
+
+log = get_logger()
+
+COMMAND = 'command'
+REQUEST = 'request'
+LINE = 'line'
+WAIT = 'wait'
+
+# Path segments that look like identifiers are replaced so that requests to the same endpoint are grouped together
+# (numbers, UUIDs and the generated identifiers of MOLGENIS)
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F-]{32,36}|(?=[a-z]*\d)[a-z0-9]{20,})$')
+
+_enabled = False
+_start = time.perf_counter()
+_events: List['Event'] = list()
+_counters = Counter()
+_lock = threading.Lock()
+_local = threading.local()
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class Event:
+    category: str
+    name: str
+    start: float
+    duration: float
+    thread: int
+    details: dict = attr.ib(factory=dict)
+    scope: Any = None
+
+
+def enable():
+    global _enabled, _start
+    if not _enabled:
+        _enabled = True
+        _start = time.perf_counter()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def timed(category: str, name: str, **details):
+    """Records the time that the body of the with-statement takes."""
+    if not _enabled:
+        yield details
+        return
+
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        _add_event(category, name, start, time.perf_counter() - start, details)
+
+
+@contextmanager
+def scope(name: Any):
+    """Attributes the events that are recorded in the body of the with-statement (in this thread) to a scope."""
+    previous = get_scope()
+    _local.scope = name
+    try:
+        yield
+    finally:
+        _local.scope = previous
+
+
+def get_scope() -> Any:
+    return getattr(_local, 'scope', None)
+
+
+def propagate(func: Callable) -> Callable:
+    """Wraps a function that will be run in another thread, so that its events are attributed to the current scope."""
+    current = get_scope()
+
+    def run_in_scope(*args, **kwargs):
+        with scope(current):
+            return func(*args, **kwargs)
+
+    return run_in_scope
+
+
+def record_request(method: str, url: str, start: float, status: Optional[int], bytes_sent: Optional[int],
+                   bytes_received: Optional[int], retries: int):
+    """Records an HTTP request. The start is a time.perf_counter() value."""
+    if not _enabled:
+        return
+
+    _add_event(REQUEST, '{} {}'.format(method.upper(), get_url_template(url)), start, time.perf_counter() - start,
+               {'status': status,
+                'url': url,
+                'bytes_sent': bytes_sent,
+                'bytes_received': bytes_received,
+                'retries': retries})
+    if retries:
+        increment('http retries', retries)
+
+
+def increment(counter: str, amount: int = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[counter] += amount
+
+
+def get_url_template(url: str) -> str:
+    """Returns the path of a URL with identifiers replaced by '{id}', for example: /api/v2/sys_sec_User/{id}"""
+    path = urlsplit(url).path
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def get_events() -> List[Event]:
+    with _lock:
+        return list(_events)
+
+
+def get_counters() -> Counter:
+    with _lock:
+        return Counter(_counters)
+
+
+def print_summary():
+    """Shows the number of commands and requests, the time they took and the counters, slowest first."""
+    events = get_events()
+
+    log.info('')
+    log.info(bold('{:<50} {:>6} {:>10} {:>10} {:>10} {:>10}'.format('', 'count', 'total (s)', 'avg (ms)', 'max (ms)',
+                                                                    'received')))
+    for category, title in [(COMMAND, 'commands'), (REQUEST, 'requests')]:
+        groups = OrderedDict()
+        for event in events:
+            if event.category == category:
+                groups.setdefault(event.name, list()).append(event)
+        if not groups:
+            continue
+
+        log.info(bold(title))
+        for name, group in sorted(groups.items(), key=lambda item: -sum(e.duration for e in item[1])):
+            durations = [event.duration for event in group]
+            received = sum(event.details.get('bytes_received') or 0 for event in group)
+            log.info('{:<50} {:>6} {:>10.2f} {:>10.1f} {:>10.1f} {:>10}'.format(
+                _shorten(name, 50), len(group), sum(durations), 1000 * sum(durations) / len(group),
+                1000 * max(durations), format_size(received) if category == REQUEST else ''))
+
+    counters = get_counters()
+    if counters:
+        log.info(bold('counters'))
+        for name, count in sorted(counters.items()):
+            log.info('{:<50} {:>6}'.format(name, count))
+
+    log.info('{:<50} {:>6} {:>10.2f}'.format('total time', '', time.perf_counter() - _start))
+
+
+def write_trace(file: Path):
+    """Writes the events to a Chrome trace file (*.json) or to a JSON Lines file (any other extension)."""
+    events = get_events()
+    try:
+        with file.open('w') as f:
+            if file.suffix == '.json':
+                json.dump(_to_chrome_trace(events), f)
+            else:
+                for event in events:
+                    f.write(json.dumps(_to_json(event)) + '\n')
+                for name, count in sorted(get_counters().items()):
+                    f.write(json.dumps({'category': 'counter', 'name': name, 'count': count}) + '\n')
+    except OSError as e:
+        raise McmdError('Error writing trace file: {}'.format(str(e)))
+
+
+def _add_event(category: str, name: str, start: float, duration: float, details: dict):
+    event = Event(category=category,
+                  name=name,
+                  start=start - _start,
+                  duration=duration,
+                  thread=threading.get_ident(),
+                  details=details,
+                  scope=get_scope())
+    with _lock:
+        _events.append(event)
+
+
+def _to_json(event: Event) -> dict:
+    return dict({'category': event.category,
+                 'name': event.name,
+                 'start': round(event.start, 6),
+                 'duration': round(event.duration, 6),
+                 'thread': event.thread,
+                 'scope': event.scope}, **event.details)
+
+
+def _to_chrome_trace(events: List[Event]) -> dict:
+    trace_events = [{'name': event.name,
+                     'cat': event.category,
+                     'ph': 'X',
+                     'ts': round(event.start * 1000000),
+                     'dur': round(event.duration * 1000000),
+                     'pid': os.getpid(),
+                     'tid': event.thread,
+                     'args': event.details} for event in events]
+    trace_events.extend({'name': name,
+                         'ph': 'C',
+                         'ts': round((time.perf_counter() - _start) * 1000000),
+                         'pid': os.getpid(),
+                         'args': {'count': count}} for name, count in sorted(get_counters().items()))
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+def _shorten(text: str, length: int) -> str:
+    return text if len(text) <= length else text[:length - 3] + '...'
@@ -0,0 +1,86 @@
+"""
+Measures how long it takes to start a command. The startup is measured in a new Python process (with the -X importtime
+option), so that no module has been imported yet. The command itself is not run: the startup consists of importing the
+commander and building the argument parser for the command.
+"""
+
+import subprocess
+import sys
+from typing import List
+
+import attr
+
+from mcmd.core.errors import McmdError
+from mcmd.in_out.in_out import bold, highlight
+from mcmd.in_out.logging import get_logger
+
+log = get_logger()
+
+_SLOWEST_IMPORTS = 20
+
+_STARTUP_SCRIPT = '''
+import sys
+import time
+
+start = time.perf_counter()
+import mcmd.__main__
+from mcmd.args import parser
+parser._get_parser(sys.argv[1:])
+sys.stdout.write(str(time.perf_counter() - start))
+'''
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile(arg_list: List[str]):
+    """Shows the startup time of a command and the slowest imports."""
+    startup_time, imports = measure(arg_list)
+    import_time = sum(import_.cumulative_us for import_ in imports if import_.depth == 0) / 1000
+
+    command = ' '.join(['mcmd'] + arg_list)
+    log.info('Starting {} takes {} ms'.format(highlight(command), highlight('{:.0f}'.format(startup_time * 1000))))
+    log.info('Importing modules takes {} ms in total (including the modules that Python imports on startup)'.format(
+        highlight('{:.0f}'.format(import_time))))
+    log.info('')
+    log.info(bold('{:>10}  {:>10}  {}'.format('self (ms)', 'total (ms)', 'slowest imports')))
+    for import_ in sorted(imports, key=lambda i: i.self_us, reverse=True)[:_SLOWEST_IMPORTS]:
+        log.info('{:>10.1f}  {:>10.1f}  {}'.format(import_.self_us / 1000, import_.cumulative_us / 1000,
+                                                   import_.module))
+
+
+def measure(arg_list: List[str]):
+    """
+    Starts the command in a new process.
+    :return: the startup time in seconds and the times of all imports
+    """
+    try:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _STARTUP_SCRIPT] + arg_list,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True,
+                                check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise McmdError('Error measuring the startup time: {}'.format(str(e)))
+
+    return float(result.stdout), _parse_import_times(result.stderr)
+
+
+def _parse_import_times(output: str) -> List[ImportTime]:
+    imports = list()
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append(ImportTime(module=module,
+                                  self_us=int(self_us),
+                                  cumulative_us=int(cumulative_us),
+                                  depth=depth))
+    return imports
@@ -1,31 +1,125 @@
 """
 On-disk memory. Used to store data between separate commander runs.
+
+The data is stored in an SQLite database (in WAL mode), one row per key, so commander processes that run at the same
+time can read and write it without overwriting each other's data. The values are pickled. A storage file of an older
+version of the commander (a single pickled dictionary) is migrated automatically.
 """
 
 import pickle
-from datetime import datetime
-from typing import Optional
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Any
 
+import attr
 from packaging.version import Version
 
 from mcmd.core.context import context
 from mcmd.core.errors import McmdError
 
+# The number of seconds to wait for another process that is writing to the database
+_BUSY_TIMEOUT = 10
+
+_LEGACY_SUFFIX = '.pkl'
+
+# Keys of values that are stored per host are prefixed with the name of the value
+_PER_HOST = ['token_validity', 'molgenis_versions']
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class TokenValidity:
+    """Remembers that a token (stored as a hash) was valid at a certain moment and for how long that is trusted."""
+    token_hash: str
+    validated_at: datetime
+    ttl: timedelta
+
+    def is_valid(self, token_hash: str) -> bool:
+        return self.token_hash == token_hash and datetime.now() < self.validated_at + self.ttl
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class CachedVersion:
+    """The MOLGENIS version of a host, the moment it was looked up and for how long it is trusted."""
+    version: str
+    fetched_at: datetime
+    ttl: timedelta
+
+    def is_expired(self) -> bool:
+        return datetime.now() >= self.fetched_at + self.ttl
+
+
 _store = {
     'last_version_check': datetime.now(),
-    'update_available': None
+    'update_available': None,
+    'token_validity': dict(),
+    'molgenis_versions': dict()
 }
 
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.RLock()
+
 
 def load():
+    global _connection
+    storage_file = context().get_storage_file()
     try:
-        if context().get_storage_file().exists():
-            with context().get_storage_file().open('rb') as f:
-                _store.update(pickle.load(f))
-        else:
-            _persist()
-    except (pickle.PickleError, IOError) as e:
-        raise McmdError("Unable to read storage from file: {}".format(e.message))
+        with _lock:
+            _connection = sqlite3.connect(str(storage_file), timeout=_BUSY_TIMEOUT, check_same_thread=False,
+                                          isolation_level=None)
+            _connection.execute('PRAGMA journal_mode=WAL')
+            _connection.execute('CREATE TABLE IF NOT EXISTS store (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+            _migrate(storage_file.with_suffix(_LEGACY_SUFFIX))
+
+            rows = _connection.execute('SELECT key, value FROM store').fetchall()
+            for key, value in rows:
+                _put(key, pickle.loads(value))
+
+            if 'last_version_check' not in [key for key, value in rows]:
+                _persist('last_version_check', _store['last_version_check'])
+    except (sqlite3.Error, pickle.PickleError, IOError) as e:
+        raise McmdError("Unable to read storage from file: {}".format(str(e)))
+
+
+def _migrate(legacy_file: Path):
+    """Moves the values of a pickled storage file to the database."""
+    if not legacy_file.exists():
+        return
+
+    with legacy_file.open('rb') as f:
+        legacy = pickle.load(f)
+
+    _connection.execute('BEGIN IMMEDIATE')
+    try:
+        for name, value in legacy.items():
+            if name in _PER_HOST:
+                for host, host_value in value.items():
+                    _insert(_key(name, host), host_value, replace=False)
+            else:
+                _insert(name, value, replace=False)
+        _connection.execute('COMMIT')
+    except Exception:
+        _connection.execute('ROLLBACK')
+        raise
+
+    try:
+        legacy_file.unlink()
+    except FileNotFoundError:
+        # another process has just migrated it
+        pass
+
+
+def _put(key: str, value: Any):
+    name, _, host = key.partition(':')
+    if name in _PER_HOST:
+        _store[name][host] = value
+    else:
+        _store[key] = value
+
+
+def _key(name: str, host: str) -> str:
+    return '{}:{}'.format(name, host)
 
 
 def get_last_version_check() -> datetime:
@@ -34,7 +128,7 @@ def get_last_version_check() -> datetime:
 
 def set_last_version_check(last_check: datetime):
     _store['last_version_check'] = last_check
-    _persist()
+    _persist('last_version_check', last_check)
 
 
 def get_update_available() -> Optional[Version]:
@@ -44,12 +138,45 @@ def get_update_available() -> Optional[Version]:
 # noinspection PyTypeChecker
 def set_update_available(version: Optional[Version]):
     _store['update_available'] = version
-    _persist()
+    _persist('update_available', version)
+
+
+def get_token_validity(host: str) -> Optional[TokenValidity]:
+    return _store['token_validity'].get(host, None)
+
+
+def set_token_validity(host: str, validity: Optional[TokenValidity]):
+    if validity is None:
+        _store['token_validity'].pop(host, None)
+    else:
+        _store['token_validity'][host] = validity
+    _persist(_key('token_validity', host), validity)
+
+
+def get_molgenis_version(host: str) -> Optional[CachedVersion]:
+    return _store['molgenis_versions'].get(host, None)
+
+
+def set_molgenis_version(host: str, version: Optional[CachedVersion]):
+    if version is None:
+        _store['molgenis_versions'].pop(host, None)
+    else:
+        _store['molgenis_versions'][host] = version
+    _persist(_key('molgenis_versions', host), version)
 
 
-def _persist():
+def _persist(key: str, value: Any):
+    """Writes a single value to the database. Per host values that are None are deleted."""
     try:
-        with context().get_storage_file().open('wb') as f:
-            pickle.dump(_store, f)
-    except (pickle.PickleError, IOError) as e:
-        raise McmdError("Unable to save storage to file: {}".format(e.message))
+        with _lock:
+            if value is None and key.partition(':')[0] in _PER_HOST:
+                _connection.execute('DELETE FROM store WHERE key = ?', (key,))
+            else:
+                _insert(key, value)
+    except (sqlite3.Error, pickle.PickleError) as e:
+        raise McmdError("Unable to save storage to file: {}".format(str(e)))
+
+
+def _insert(key: str, value: Any, replace: bool = True):
+    statement = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+    _connection.execute(statement + ' INTO store (key, value) VALUES (?, ?)', (key, pickle.dumps(value)))
@@ -1,31 +1,50 @@
+"""
+Checks if a new version of the commander is available on PyPI.
+
+The check never slows down a command: it is done by a detached background process that writes the result to the store.
+The next command that is run shows the update message. The check can be disabled with the 'update_check' setting or by
+setting the MCMD_NO_UPDATE_CHECK environment variable.
+"""
+
+import os
 import re
+import subprocess
+import sys
+import threading
 from datetime import datetime, timedelta
 from typing import Optional
 
-import pkg_resources
 import requests
 from packaging.version import Version
 from requests import RequestException
 
-from mcmd.core import store
+from mcmd.config import config
+from mcmd.core import store, distribution
 from mcmd.in_out import in_out
 
+# The number of hours between two checks
+_CHECK_INTERVAL = 8
+
+# The maximum number of seconds that the background process spends on the check
+_TIMEOUT = 10
+
+_DISABLE_VARIABLE = 'MCMD_NO_UPDATE_CHECK'
+
 
 def check():
     """
-    Checks if a new version is available. Checks once every 8 hours at most. If a new version is available, a message
-    will be shown for every executed command until the update has been installed.
+    Checks if a new version is available. Checks once every 8 hours at most, in the background. If a new version is
+    available, a message will be shown for every executed command until the update has been installed.
     """
-    current = _current_version()
-
-    if datetime.now() - timedelta(hours=8) > store.get_last_version_check():
-        latest = _latest_version()
-
-        if latest and latest > current:
-            store.set_update_available(latest)
+    if not _is_enabled():
+        return
 
+    if datetime.now() - timedelta(hours=_CHECK_INTERVAL) > store.get_last_version_check():
+        # the check is registered before it's done, so that commands that are started meanwhile don't start it again
         store.set_last_version_check(datetime.now())
+        _start_worker()
 
+    current = _current_version()
     latest = store.get_update_available()
     if latest:
         if latest <= current:
@@ -35,8 +54,53 @@ def check():
             _show_update_message(current, latest)
 
 
+def _is_enabled() -> bool:
+    return not os.environ.get(_DISABLE_VARIABLE) and config.get('settings', 'update_check')
+
+
+def _start_worker():
+    """Starts the check in a separate process that keeps running when the command has finished."""
+    options = dict()
+    if os.name == 'nt':
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True
+
+    try:
+        subprocess.Popen([sys.executable, '-m', 'mcmd.core.update_checker'],
+                         stdin=subprocess.DEVNULL,
+                         stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL,
+                         close_fds=True,
+                         **options)
+    except OSError:
+        # not being able to check for updates should never break a command
+        pass
+
+
+def _run_worker():
+    """
+    The background process. The request is done in a daemon thread so that the process ends after _TIMEOUT seconds,
+    even if the request is stuck somewhere the request timeout doesn't cover (like a DNS lookup).
+    """
+    worker = threading.Thread(target=_update_latest_version, daemon=True)
+    worker.start()
+    worker.join(_TIMEOUT)
+
+
+def _update_latest_version():
+    latest = _latest_version()
+    if latest is None:
+        return
+
+    store.load()
+    if latest > _current_version():
+        store.set_update_available(latest)
+    store.set_last_version_check(datetime.now())
+
+
 def _current_version() -> Version:
-    return Version(pkg_resources.get_distribution('molgenis-commander').version)
+    return Version(distribution.get_version())
 
 
 def _latest_version() -> Optional[Version]:
@@ -44,7 +108,7 @@ def _latest_version() -> Optional[Version]:
     Gets the latest version from PyPi. Because there is no API for this, we regex it from the 'simple' page.
     """
     try:
-        response = requests.get('https://pypi.org/simple/molgenis-commander/')
+        response = requests.get('https://pypi.org/simple/molgenis-commander/', timeout=_TIMEOUT)
 
         if response.status_code == 200:
             versions = re.findall(r'molgenis-commander-(\d+\.\d+\.\d+)', response.text)
@@ -58,3 +122,10 @@ def _show_update_message(current: Version, latest: Version):
     in_out.warn(
         'A new version of MOLGENIS Commander is available: {}! You are using {}.'.format(latest, current))
     in_out.info("To upgrade, run 'pip install --upgrade molgenis-commander'")
+
+
+if __name__ == '__main__':
+    from mcmd.core.context.home_context import HomeContext
+
+    with HomeContext():
+        _run_worker()
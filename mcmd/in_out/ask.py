@@ -1,5 +1,3 @@
-import questionary
-
 from mcmd.config import config
 from mcmd.core.errors import McmdError
 from mcmd.in_out import in_out
@@ -8,7 +6,7 @@ from mcmd.in_out import in_out
 def multi_choice(message, choices):
     raise_if_non_interactive(message)
 
-    question = questionary.select(message, choices=choices)
+    question = _questionary().select(message, choices=choices)
     return _ask(question)
 
 
@@ -17,7 +15,7 @@ def checkbox(message, choices):
 
     checks = [{'name': choice, 'value': idx} for idx, choice in enumerate(choices)]
 
-    question = questionary.checkbox(message, choices=checks)
+    question = _questionary().checkbox(message, choices=checks)
 
     answer_ids = _ask(question, _validate_empty_list)
     return [choices[idx] for idx in answer_ids]
@@ -26,7 +24,7 @@ def checkbox(message, choices):
 def input_(message, required=False):
     raise_if_non_interactive(message)
 
-    question = questionary.text(message)
+    question = _questionary().text(message)
 
     if required:
         return _ask(question, _validate_empty_input)
@@ -37,7 +35,7 @@ def input_(message, required=False):
 def password(message, required=False):
     raise_if_non_interactive(message)
 
-    question = questionary.password(message)
+    question = _questionary().password(message)
 
     if required:
         return _ask(question, _validate_empty_input)
@@ -48,7 +46,7 @@ def password(message, required=False):
 def confirm(message):
     raise_if_non_interactive(message)
 
-    question = questionary.confirm(message, default=False)
+    question = _questionary().confirm(message, default=False)
     return _ask(question)
 
 
@@ -80,3 +78,12 @@ def raise_if_non_interactive(message: str):
         raise McmdError('User input required but running in non-interactive mode. Message: {}'.format(message),
                         info="Please specify your command more precisely or switch to interactive mode with 'mcmd "
                              "config set interactive'")
+    if in_out.is_buffered():
+        raise McmdError('User input required but running in parallel. Message: {}'.format(message),
+                        info='Please specify your command more precisely or run the script without --parallel')
+
+
+def _questionary():
+    """Questionary (and prompt_toolkit) take a while to import, so they're only imported when a question is asked."""
+    import questionary
+    return questionary
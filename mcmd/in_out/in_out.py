@@ -1,4 +1,8 @@
-from typing import Optional
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional, List, Iterator
 
 from colorama import Fore, Style
 from halo import Halo
@@ -12,7 +16,58 @@ log = get_logger()
 _debug_mode = False
 spinner: Optional[Halo] = None
 
+# Output of threads that run in the background is buffered (per thread) so it can be replayed in the right order
+_local = threading.local()
 
+
+def _bufferable(func):
+    """Decorator for output functions. Records the call in the buffer of the current thread if it has one."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        buffer = getattr(_local, 'buffer', None)
+        if buffer is not None:
+            buffer.append(lambda: func(*args, **kwargs))
+        else:
+            func(*args, **kwargs)
+
+    return wrapper
+
+
+def _buffer_log_record(record: logging.LogRecord) -> bool:
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is not None:
+        buffer.append(lambda: log.handle(record))
+        return False
+    return True
+
+
+log.addFilter(_buffer_log_record)
+
+
+@contextmanager
+def buffered() -> Iterator[List]:
+    """Buffers all output of the current thread (including log messages) until the buffer is replayed with replay()."""
+    buffer = list()
+    _local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _local.buffer = None
+
+
+def is_buffered() -> bool:
+    """Whether the output of the current thread is being buffered."""
+    return getattr(_local, 'buffer', None) is not None
+
+
+def replay(buffer: List):
+    """Outputs everything that has been buffered, in the original order."""
+    for output in buffer:
+        output()
+
+
+@_bufferable
 def start(message):
     global spinner
     if config.has_option('settings', 'non_interactive') and config.get('settings', 'non_interactive') is True:
@@ -22,6 +77,14 @@ def start(message):
         spinner.start(message)
 
 
+@_bufferable
+def update(message):
+    """Changes the message of the running spinner. Does nothing if there is no spinner running."""
+    if spinner:
+        spinner.text = message
+
+
+@_bufferable
 def succeed():
     global spinner
     if spinner:
@@ -33,6 +96,7 @@ def succeed():
         spinner = None
 
 
+@_bufferable
 def info(message):
     """Replaces an existing spinner with an info message and restarts the previous spinner afterwards. Just shows the
     info message if there was no spinner running."""
@@ -49,6 +113,7 @@ def info(message):
         spinner.start(prev_text)
 
 
+@_bufferable
 def warn(message):
     """Turns the current spinner in a warning message (with icon) and starts a new spinner"""
     if spinner:
@@ -59,18 +124,21 @@ def warn(message):
         spinner.start()
 
 
+@_bufferable
 def pause():
     """Pause the spinner (with a warning icon), restart it with unpause()"""
     if spinner:
         spinner.warn()
 
 
+@_bufferable
 def unpause():
     """Unpause a paused spinner"""
     if spinner:
         spinner.start()
 
 
+@_bufferable
 def error(message):
     global spinner
     if spinner:
@@ -81,6 +149,7 @@ def error(message):
         log.error('  ' + message.strip('\"\''))
 
 
+@_bufferable
 def debug(message):
     global spinner
     if not _debug_mode:
@@ -112,6 +181,7 @@ def set_debug():
     _debug_mode = True
 
 
+@_bufferable
 def newline():
     log.info('')
 
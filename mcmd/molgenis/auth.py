@@ -1,23 +1,34 @@
 """
 Handles the authentication and provides the REST token to the rest of the application. If a token was
 invalidated or simply not present it tries to login with the provided credentials.
+
+A token is validated at most once per process. The result of a validation is remembered in the store for a configurable
+amount of time, so that subsequent runs don't have to validate the same token again. Requests can be sent from multiple
+threads, so checking and renewing the token is guarded by a lock to make sure only one thread logs in.
 """
 
+import hashlib
 import json
+import threading
+from datetime import datetime, timedelta
 
 import requests
 from requests import HTTPError
 
 import mcmd.in_out.ask
 from mcmd.config import config
+from mcmd.core import store, metrics
 from mcmd.core.errors import McmdError, MolgenisOfflineError
 from mcmd.in_out import in_out
 from mcmd.molgenis import api
+from mcmd.molgenis.session import get_session
 
 _username = None
 _password = None
 _token = None
 _as_user = False
+_validated_token = None
+_lock = threading.RLock()
 
 
 def get_token():
@@ -36,17 +47,40 @@ def set_(username, password=None, token=None, as_user=False):
 
 def check_token():
     """Queries the Token table to see if the set token is valid. The Token table is an arbitrary choice but will work
-    because it should always be accessible to the superuser exclusively."""
-    if _as_user:
+    because it should always be accessible to the superuser exclusively. Tokens that have been validated before (in this
+    process or recently in an earlier run) aren't checked again."""
+    metrics.increment('token checks')
+    if _as_user or (_token and _token == _validated_token):
+        return
+
+    with _lock:
+        _check_token()
+
+
+def _check_token():
+    global _validated_token
+    if _token and _token == _validated_token:
+        return
+
+    if not _token:
+        _login()
+        return
+
+    validity = store.get_token_validity(config.url())
+    if validity and validity.is_valid(_hash(_token)):
+        _validated_token = _token
         return
 
+    metrics.increment('token validations')
     try:
-        response = requests.get(api.rest2('sys_sec_Token'),
-                                params={
-                                    'q': 'token=={}'.format(_token)
-                                },
-                                headers={'Content-Type': 'application/json', 'x-molgenis-token': _token})
+        url = api.rest2('sys_sec_Token')
+        response = get_session(url).get(url,
+                                        params={
+                                            'q': 'token=={}'.format(_token)
+                                        },
+                                        headers={'Content-Type': 'application/json', 'x-molgenis-token': _token})
         response.raise_for_status()
+        _remember_valid_token()
     except HTTPError as e:
         if e.response.status_code == 401:
             _login()
@@ -54,6 +88,33 @@ def check_token():
             raise McmdError(str(e))
     except requests.exceptions.ConnectionError:
         raise MolgenisOfflineError()
+    except requests.RequestException as e:
+        raise McmdError(str(e))
+
+
+def renew_token():
+    """Logs in again. Used when the server rejects a token that was assumed to be valid."""
+    global _validated_token
+    metrics.increment('token renewals')
+    with _lock:
+        _validated_token = None
+        if not _as_user:
+            store.set_token_validity(config.url(), None)
+        _login()
+
+
+def _remember_valid_token():
+    global _validated_token
+    _validated_token = _token
+    if not _as_user:
+        ttl = timedelta(minutes=config.get('settings', 'token_check_interval'))
+        store.set_token_validity(config.url(), store.TokenValidity(token_hash=_hash(_token),
+                                                                   validated_at=datetime.now(),
+                                                                   ttl=ttl))
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
 
 def _login():
@@ -63,18 +124,26 @@ def _login():
     if not _password:
         _password = _ask_password()
 
+    metrics.increment('logins')
+
     try:
         in_out.debug('Logging in as user {}'.format(_username))
-        response = requests.post(api.login(),
-                                 headers={'Content-Type': 'application/json'},
-                                 data=json.dumps({"username": _username, "password": _password}))
+        url = api.login()
+        response = get_session(url).post(url,
+                                         headers={'Content-Type': 'application/json'},
+                                         data=json.dumps({"username": _username, "password": _password}))
         response.raise_for_status()
         _token = response.json()['token']
+        _remember_valid_token()
     except HTTPError as e:
         if e.response.status_code == 401:
             raise McmdError('Invalid login credentials')
         else:
             raise McmdError(str(e))
+    except requests.exceptions.ConnectionError:
+        raise MolgenisOfflineError()
+    except requests.RequestException as e:
+        raise McmdError(str(e))
     finally:
         if not _as_user:
             config.set_token(_token)
@@ -1,17 +1,18 @@
 import json
+from pathlib import Path
 
-import requests
 from requests import Response
 
-from mcmd.molgenis import auth
+from mcmd.molgenis import auth, multipart
 from mcmd.molgenis.request_handler import request
+from mcmd.molgenis.session import get_session
 
 
 @request
 def get(url, params=None) -> Response:
-    return requests.get(url,
-                        params=params,
-                        headers=_get_default_headers())
+    return get_session(url).get(url,
+                                params=params,
+                                headers=_get_default_headers())
 
 
 @request
@@ -22,7 +23,7 @@ def post(url, data=None, params=None):
     if params:
         kwargs['params'] = params
 
-    return requests.post(url, **kwargs)
+    return get_session(url).post(url, **kwargs)
 
 
 @request
@@ -33,31 +34,39 @@ def patch(url, data=None, params=None):
     if params:
         kwargs['params'] = params
 
-    return requests.patch(url, **kwargs)
+    return get_session(url).patch(url, **kwargs)
 
 
 @request
-def post_file(url, file_path, params):
-    return requests.post(url,
-                         headers={'x-molgenis-token': auth.get_token()},
-                         files={'file': open(file_path, 'rb')},
-                         params=params)
+def post_file(url, file_path, params, compress=False, progress=None, cancel=None):
+    """
+    Streams a file to the server as a multipart upload, optionally gzipping it on the fly. The upload stops when the
+    (optional) cancel event is set.
+    """
+    with open(file_path, 'rb') as file:
+        body = multipart.encode(file, field='file', file_name=Path(file_path).name, compress=compress,
+                                progress=progress, cancel=cancel)
+        return get_session(url).post(url,
+                                     headers={'x-molgenis-token': auth.get_token(),
+                                              'Content-Type': body.content_type},
+                                     data=body,
+                                     params=params)
 
 
 @request
 def post_files(files, url):
-    return requests.post(url,
-                         headers={'x-molgenis-token': auth.get_token()},
-                         files=files)
+    return get_session(url).post(url,
+                                 headers={'x-molgenis-token': auth.get_token()},
+                                 files=files)
 
 
 @request
 def post_form(url, data):
-    return requests.post(url,
-                         headers={
-                             'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                             'x-molgenis-token': auth.get_token()},
-                         data=data)
+    return get_session(url).post(url,
+                                 headers={
+                                     'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+                                     'x-molgenis-token': auth.get_token()},
+                                 data=data)
 
 
 @request
@@ -66,21 +75,21 @@ def delete(url, data=None):
     if data:
         kwargs['data'] = json.dumps(data)
 
-    return requests.delete(url, **kwargs)
+    return get_session(url).delete(url, **kwargs)
 
 
 @request
 def delete_data(url, data):
-    return requests.delete(url,
-                           headers=_get_default_headers(),
-                           data=json.dumps({"entityIds": data}))
+    return get_session(url).delete(url,
+                                   headers=_get_default_headers(),
+                                   data=json.dumps({"entityIds": data}))
 
 
 @request
 def put(url, data):
-    return requests.put(url=url,
-                        headers=_get_default_headers(),
-                        data=data)
+    return get_session(url).put(url=url,
+                                headers=_get_default_headers(),
+                                data=data)
 
 
 def _get_default_headers():
@@ -0,0 +1,94 @@
+"""
+Reads, adds and deletes the rows of entity types with the REST API v2. Results are requested page by page so that large
+entity types don't have to be fetched in one response.
+"""
+
+from typing import Iterator, Optional, List, Iterable
+
+from mcmd.molgenis import api
+from mcmd.molgenis.client import get, post, delete_data
+from mcmd.utils.iterables import chunks
+
+# The maximum number of rows the REST API v2 returns in one response
+MAX_PAGE_SIZE = 10000
+
+# The maximum number of rows the REST API v2 accepts in one request
+MAX_BATCH_SIZE = 1000
+
+# The number of values in one '=in=' query, which keeps the query string well below the maximum URL length
+IDS_PER_QUERY = 100
+
+
+def get_pages(entity_type_id: str,
+              attrs: Optional[str] = None,
+              query: Optional[str] = None,
+              page_size: int = MAX_PAGE_SIZE) -> Iterator[dict]:
+    """
+    Gets the rows of an entity type page by page.
+    :param entity_type_id: the id of the entity type
+    :param attrs: the attributes to select (in the REST API v2 'attrs' syntax)
+    :param query: a RSQL query to filter the rows
+    :param page_size: the number of rows per page
+    :return: a generator of REST API v2 responses
+    """
+    start = 0
+    while True:
+        params = {'num': page_size,
+                  'start': start}
+        if attrs:
+            params['attrs'] = attrs
+        if query:
+            params['q'] = query
+
+        page = get(api.rest2(entity_type_id), params=params).json()
+        yield page
+
+        start += len(page['items'])
+        if len(page['items']) == 0 or start >= int(page['total']):
+            break
+
+
+def get_rows_in(entity_type_id: str,
+                attribute: str,
+                values: Iterable[str],
+                attrs: Optional[str] = None) -> Iterator[dict]:
+    """
+    Gets the rows of which an attribute has one of the values, with one query per IDS_PER_QUERY values.
+    :param entity_type_id: the id of the entity type
+    :param attribute: the name of the attribute to filter on
+    :param values: the values of the attribute
+    :param attrs: the attributes to select (in the REST API v2 'attrs' syntax)
+    :return: a generator of rows
+    """
+    for values_chunk in chunks(sorted(set(values)), IDS_PER_QUERY):
+        query = '{}=in=({})'.format(attribute, ','.join(values_chunk))
+        for page in get_pages(entity_type_id, attrs=attrs, query=query):
+            yield from page['items']
+
+
+def get_row_ids(entity_type_id: str, query: Optional[str] = None) -> Iterator[str]:
+    """
+    Gets the ids of the rows of an entity type, optionally only of the rows that match a RSQL query.
+    """
+    for page in get_pages(entity_type_id, attrs='~id', query=query):
+        id_attribute = page['meta']['idAttribute']
+        for item in page['items']:
+            yield str(item[id_attribute])
+
+
+def add_rows(entity_type_id: str, rows: List[dict]):
+    """
+    Adds rows to an entity type in one request.
+    :param entity_type_id: the id of the entity type
+    :param rows: the rows to add (at most MAX_BATCH_SIZE)
+    """
+    post(api.rest2(entity_type_id), data={'entities': rows})
+
+
+def delete_rows(entity_type_id: str, row_ids: List[str]):
+    """
+    Deletes rows of an entity type in one request.
+    :param entity_type_id: the id of the entity type
+    :param row_ids: the ids of the rows to delete
+    """
+    delete_data(api.rest2(entity_type_id), row_ids)
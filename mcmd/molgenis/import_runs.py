@@ -0,0 +1,148 @@
+"""
+Tracks the import runs that MOLGENIS creates for every import.
+
+All outstanding import runs are polled together in one loop. The time between two polls adapts to the observed progress:
+it starts short so that small imports are reported as soon as they're done, and grows while none of the runs make any
+progress. Some random jitter is added to every delay so that parallel commanders don't poll a server in lockstep.
+"""
+
+import random
+import time
+from typing import Optional, List, Dict
+from urllib.parse import urljoin
+
+import attr
+
+from mcmd.config import config
+from mcmd.core import metrics
+from mcmd.core.errors import McmdError
+from mcmd.molgenis import api
+from mcmd.molgenis.client import get
+
+_MIN_INTERVAL = 0.5
+_MAX_INTERVAL = 10
+_BACKOFF_FACTOR = 1.5
+_JITTER = 0.2
+
+RUNNING = 'RUNNING'
+FINISHED = 'FINISHED'
+FAILED = 'FAILED'
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class ImportRun:
+    id: str
+    url: str
+    status: str
+    message: Optional[str] = None
+    progress: Optional[int] = None
+
+    def is_done(self) -> bool:
+        return self.status != RUNNING
+
+
+class ImportRunTracker:
+    """Keeps track of outstanding import runs and polls them until they're done."""
+
+    def __init__(self):
+        self._runs: Dict[str, Optional[ImportRun]] = dict()
+        self._interval = _MIN_INTERVAL
+
+    def track(self, url: str):
+        """Starts tracking an import run. New runs are polled quickly at first."""
+        self._runs[url] = None
+        self._interval = _MIN_INTERVAL
+
+    def is_tracking(self) -> bool:
+        return len(self._runs) > 0
+
+    def get_outstanding(self) -> List[str]:
+        """Returns the ids of the runs that aren't done yet."""
+        return [get_run_id(url) for url in self._runs]
+
+    def poll(self) -> List[ImportRun]:
+        """
+        Polls all outstanding import runs once.
+        :return: the runs that are done, these aren't tracked anymore
+        """
+        changed = False
+        done = list()
+        for url, previous in list(self._runs.items()):
+            run = _to_import_run(url, get(url).json())
+            if run.is_done():
+                done.append(run)
+                del self._runs[url]
+                changed = True
+            else:
+                changed |= previous is None or run.progress != previous.progress
+                self._runs[url] = run
+
+        if changed:
+            self._interval = _MIN_INTERVAL
+        else:
+            self._interval = min(self._interval * _BACKOFF_FACTOR, _MAX_INTERVAL)
+        return done
+
+    def next_delay(self) -> float:
+        """Returns the number of seconds to wait before the next poll."""
+        return self._interval * random.uniform(1 - _JITTER, 1 + _JITTER)
+
+    def wait(self, timeout: Optional[float] = None) -> List[ImportRun]:
+        """
+        Polls until all tracked import runs are done.
+        :param timeout: the maximum number of seconds to wait
+        :return: the runs in the order that they were done
+
+        :exception McmdError if the runs aren't done within the timeout
+        """
+        with metrics.timed(metrics.WAIT, 'import runs'):
+            return self._wait(timeout)
+
+    def _wait(self, timeout: Optional[float]) -> List[ImportRun]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        done = list()
+        while True:
+            done += self.poll()
+            if not self.is_tracking():
+                return done
+
+            delay = self.next_delay()
+            if deadline is not None:
+                if time.monotonic() >= deadline:
+                    raise timeout_error(self.get_outstanding(), timeout)
+                delay = min(delay, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+
+
+def wait_for(url: str, timeout: Optional[float] = None) -> ImportRun:
+    """Waits for an import run to be done and returns the import run as it was at the last poll."""
+    tracker = ImportRunTracker()
+    tracker.track(url)
+    return tracker.wait(timeout)[0]
+
+
+def get_import_run(run_id: str) -> ImportRun:
+    url = api.rest2('sys_ImportRun/{}'.format(run_id))
+    return _to_import_run(url, get(url).json())
+
+
+def get_run_url(response_text: str) -> str:
+    """The import endpoints respond with the (relative) location of the import run."""
+    return urljoin(config.get('host', 'selected'), response_text)
+
+
+def get_run_id(url: str) -> str:
+    return url.rstrip('/').split('/')[-1]
+
+
+def timeout_error(run_ids: List[str], timeout: float) -> McmdError:
+    return McmdError('Import not done after {} seconds'.format(timeout),
+                     info="Check the status later with 'mcmd import --status {}'".format(' '.join(run_ids)))
+
+
+def _to_import_run(url: str, import_run: dict) -> ImportRun:
+    return ImportRun(id=get_run_id(url),
+                     url=url,
+                     status=import_run['status'],
+                     message=import_run.get('message'),
+                     progress=import_run.get('progress'))
@@ -0,0 +1,167 @@
+"""
+Streams multipart/form-data request bodies. The file is read in chunks while the request is sent, so the memory that an
+upload takes doesn't depend on the size of the file.
+
+A plain file is sent with a known Content-Length by a seekable, file-like encoder (so failed requests can be retried).
+A file that is compressed while it's being sent has no known length and is sent with chunked transfer encoding.
+
+An upload can be cancelled from another thread with an event: the body raises an error when the next chunk is read.
+"""
+
+import os
+import threading
+import time
+import uuid
+import zlib
+from typing import Optional, Callable, BinaryIO, Iterator
+
+from mcmd.core.errors import McmdError
+
+# The size of the pieces in which files are read (and compressed)
+_CHUNK_SIZE = 64 * 1024
+
+# The minimal number of seconds between two progress reports
+_PROGRESS_INTERVAL = 0.2
+
+# Progress callbacks are called with the number of bytes of the file that have been sent and the size of the file
+ProgressCallback = Callable[[int, int], None]
+
+
+def encode(file: BinaryIO, field: str, file_name: str, compress: bool = False,
+           progress: Optional[ProgressCallback] = None, cancel: Optional[threading.Event] = None):
+    """
+    Creates a streaming multipart body for a file.
+    :param file: the file, opened in binary mode
+    :param field: the name of the form field
+    :param file_name: the name of the file as it's sent to the server
+    :param compress: whether to gzip the file while sending it ('.gz' is added to the file name)
+    :param progress: called with the number of bytes of the file that have been read
+    :param cancel: an event that stops the upload when it's set
+    :return: the body, which has a content_type property that should be used as the Content-Type header
+    """
+    if compress:
+        return MultipartStream(file, field, file_name + '.gz', progress, cancel)
+    else:
+        return MultipartEncoder(file, field, file_name, progress, cancel)
+
+
+class _Progress:
+    """Reports progress, but not more often than every _PROGRESS_INTERVAL seconds (and always at the end)."""
+
+    def __init__(self, callback: Optional[ProgressCallback], total: int):
+        self._callback = callback
+        self._total = total
+        self._last_report = 0.0
+
+    def report(self, done: int):
+        if not self._callback:
+            return
+        now = time.monotonic()
+        if done >= self._total or now - self._last_report >= _PROGRESS_INTERVAL:
+            self._last_report = now
+            self._callback(min(done, self._total), self._total)
+
+
+class _Multipart:
+    def __init__(self, field: str, file_name: str, cancel: Optional[threading.Event]):
+        self._file_name = file_name
+        self._cancel = cancel
+        self.boundary = uuid.uuid4().hex
+        self._head = ('--{}\r\n'
+                      'Content-Disposition: form-data; name="{}"; filename="{}"\r\n'
+                      'Content-Type: application/octet-stream\r\n'
+                      '\r\n').format(self.boundary, field, file_name.replace('"', '%22')).encode('utf-8')
+        self._tail = '\r\n--{}--\r\n'.format(self.boundary).encode('utf-8')
+
+    @property
+    def content_type(self) -> str:
+        return 'multipart/form-data; boundary={}'.format(self.boundary)
+
+    def _check_cancelled(self):
+        if self._cancel and self._cancel.is_set():
+            raise McmdError('The upload of {} was cancelled'.format(self._file_name))
+
+
+class MultipartEncoder(_Multipart):
+    """A read-only file-like body with a known length. Reads the file only when the body is read."""
+
+    def __init__(self, file: BinaryIO, field: str, file_name: str, progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[threading.Event] = None):
+        super().__init__(field, file_name, cancel)
+        self._file = file
+        self._file_start = file.tell()
+        self._file_size = os.fstat(file.fileno()).st_size - self._file_start
+        self._length = len(self._head) + self._file_size + len(self._tail)
+        self._position = 0
+        self._progress = _Progress(progress, self._file_size)
+
+    def __len__(self):
+        return self._length
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._length
+        self._position = max(0, min(offset, self._length))
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        self._check_cancelled()
+        if size is None or size < 0:
+            size = self._length - self._position
+
+        chunks = list()
+        while size > 0 and self._position < self._length:
+            chunk = self._read_segment(size)
+            self._position += len(chunk)
+            size -= len(chunk)
+            chunks.append(chunk)
+
+        self._progress.report(self._position - len(self._head))
+        return b''.join(chunks)
+
+    def _read_segment(self, size: int) -> bytes:
+        file_end = len(self._head) + self._file_size
+        if self._position < len(self._head):
+            return self._head[self._position:self._position + size]
+        elif self._position < file_end:
+            self._file.seek(self._file_start + self._position - len(self._head))
+            chunk = self._file.read(min(size, file_end - self._position, _CHUNK_SIZE))
+            if not chunk:
+                raise IOError('File {} changed while it was being sent'.format(getattr(self._file, 'name', '')))
+            return chunk
+        else:
+            offset = self._position - file_end
+            return self._tail[offset:offset + size]
+
+
+class MultipartStream(_Multipart):
+    """An iterable body that gzips the file while it's being sent. Its length isn't known in advance."""
+
+    def __init__(self, file: BinaryIO, field: str, file_name: str, progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[threading.Event] = None):
+        super().__init__(field, file_name, cancel)
+        self._file = file
+        self._progress = _Progress(progress, os.fstat(file.fileno()).st_size)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+
+        # wbits=31 produces a gzip container instead of a raw zlib stream
+        compressor = zlib.compressobj(wbits=31)
+        chunk = self._file.read(_CHUNK_SIZE)
+        while chunk:
+            self._check_cancelled()
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+            self._progress.report(self._file.tell())
+            chunk = self._file.read(_CHUNK_SIZE)
+        yield compressor.flush()
+        self._progress.report(self._file.tell())
+
+        yield self._tail
@@ -0,0 +1,182 @@
+"""
+Deletes the contents of a package: its entity types and its subpackages, including everything in them.
+
+The packages and entity types in the package tree are read page by page with '=in=' queries. The entity types are
+deleted in waves: an entity type can only be deleted when no other entity type in the tree references or extends it
+anymore. The entity types in a wave don't depend on each other, so they are deleted in chunks that are sent in parallel.
+Entity types that reference each other (in a cycle) are deleted in one request, MOLGENIS resolves the order itself.
+Only the entity types that are part of the cycle are in that request, so its size is bounded by the size of the cycle.
+After the entity types the (by then empty) packages are deleted, starting with the deepest ones.
+"""
+
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Set, Callable, Optional
+
+import attr
+
+from mcmd.core import metrics
+from mcmd.molgenis import data
+from mcmd.utils.iterables import chunks
+
+_ENTITY_TYPE = 'sys_md_EntityType'
+_PACKAGE = 'sys_md_Package'
+
+# The number of ids in one delete request
+_IDS_PER_REQUEST = 100
+
+# The number of delete requests that are sent at the same time
+_WORKERS = 4
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class PackageTree:
+    """The contents of a package: the levels of subpackages (the children first) and the entity types."""
+    package_levels: List[List[str]]
+    entity_types: Dict[str, Set[str]]
+
+    def size(self) -> int:
+        return len(self.entity_types) + sum(len(level) for level in self.package_levels)
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class DeleteResult:
+    entity_types: int
+    packages: int
+
+
+def read(package_id: str) -> PackageTree:
+    """
+    Reads the contents of a package.
+    :param package_id: the id of the package
+    :return: the subpackages per level and the entity types with the ids of the entity types in the tree that they
+    reference or extend
+    """
+    package_levels = list()
+    parents = [package_id]
+    while parents:
+        parents = [item['id'] for item in data.get_rows_in(_PACKAGE, 'parent', parents, attrs='id')]
+        if parents:
+            package_levels.append(parents)
+
+    package_ids = [package_id] + [package for level in package_levels for package in level]
+    references = dict()
+    for item in data.get_rows_in(_ENTITY_TYPE, 'package', package_ids, attrs='id,extends,attributes(refEntityType)'):
+        references[item['id']] = {_get_id(item.get('extends'))}
+        references[item['id']].update(_get_id(attribute.get('refEntityType'))
+                                      for attribute in item.get('attributes') or list())
+
+    entity_types = {entity_type_id: {reference for reference in ids if reference in references}
+                    for entity_type_id, ids in references.items()}
+    return PackageTree(package_levels=package_levels, entity_types=entity_types)
+
+
+def get_waves(entity_types: Dict[str, Set[str]]) -> List[List[List[str]]]:
+    """
+    Determines the order in which entity types can be deleted.
+    :param entity_types: the entity types with the ids of the entity types that they reference or extend
+    :return: the waves of chunks of entity types: all chunks of a wave can be deleted at the same time, but only after
+    the previous wave was deleted
+    """
+    remaining = {entity_type_id: ids - {entity_type_id} for entity_type_id, ids in entity_types.items()}
+    waves = list()
+    while remaining:
+        referenced = set().union(*remaining.values())
+        wave = sorted(entity_type_id for entity_type_id in remaining if entity_type_id not in referenced)
+        if wave:
+            waves.append(list(chunks(wave, _IDS_PER_REQUEST)))
+        else:
+            # every remaining entity type is referenced: delete the cycles that no other entity type references, each
+            # cycle in one request
+            cycles = _get_unreferenced_cycles(remaining)
+            waves.append(cycles)
+            wave = [entity_type_id for cycle in cycles for entity_type_id in cycle]
+
+        for entity_type_id in wave:
+            del remaining[entity_type_id]
+    return waves
+
+
+def _get_unreferenced_cycles(references: Dict[str, Set[str]]) -> List[List[str]]:
+    """Returns the strongly connected components that aren't referenced by entity types outside the component."""
+    components = _get_components(references)
+    component_of = {entity_type_id: i for i, component in enumerate(components) for entity_type_id in component}
+    referenced = {component_of[reference]
+                  for entity_type_id, ids in references.items()
+                  for reference in ids
+                  if component_of[reference] != component_of[entity_type_id]}
+    return sorted(sorted(component) for i, component in enumerate(components) if i not in referenced)
+
+
+def _get_components(references: Dict[str, Set[str]]) -> List[Set[str]]:
+    """Finds the strongly connected components with Tarjan's algorithm (without recursion, cycles can be long)."""
+    index = dict()
+    low = dict()
+    stack = list()
+    on_stack = set()
+    path = list()
+    components = list()
+
+    def visit(entity_type_id: str):
+        index[entity_type_id] = low[entity_type_id] = len(index)
+        stack.append(entity_type_id)
+        on_stack.add(entity_type_id)
+        path.append((entity_type_id, iter(sorted(references[entity_type_id]))))
+
+    for root in sorted(references):
+        if root in index:
+            continue
+        visit(root)
+        while path:
+            entity_type_id, children = path[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    visit(child)
+                elif child in on_stack:
+                    low[entity_type_id] = min(low[entity_type_id], index[child])
+                continue
+
+            path.pop()
+            if path:
+                parent = path[-1][0]
+                low[parent] = min(low[parent], low[entity_type_id])
+            if low[entity_type_id] == index[entity_type_id]:
+                component = set()
+                while entity_type_id not in component:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.add(member)
+                components.append(component)
+    return components
+
+
+def delete_contents(package_id: str, progress: Optional[Callable[[int, int], None]] = None) -> DeleteResult:
+    """
+    Deletes the contents of a package, but not the package itself.
+    :param package_id: the id of the package
+    :param progress: called with the number of deleted items and the total number of items after every request
+    :return: the number of deleted entity types and packages
+    """
+    tree = read(package_id)
+    steps = [(_ENTITY_TYPE, wave) for wave in get_waves(tree.entity_types)]
+    steps += [(_PACKAGE, list(chunks(level, _IDS_PER_REQUEST))) for level in reversed(tree.package_levels)]
+
+    deleted = 0
+    total = tree.size()
+    with ThreadPoolExecutor(max_workers=_WORKERS) as executor:
+        for entity_type_id, requests in steps:
+            results = [executor.submit(metrics.propagate(data.delete_rows), entity_type_id, ids) for ids in requests]
+            sizes = {result: len(ids) for result, ids in zip(results, requests)}
+            for result in futures.as_completed(results):
+                result.result()
+                deleted += sizes[result]
+                if progress:
+                    progress(deleted, total)
+
+    return DeleteResult(entity_types=len(tree.entity_types),
+                        packages=sum(len(level) for level in tree.package_levels))
+
+
+def _get_id(reference: Optional[dict]) -> Optional[str]:
+    return reference.get('id') if isinstance(reference, dict) else None
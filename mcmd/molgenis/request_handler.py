@@ -1,13 +1,18 @@
 """
 Error handling of requests to MOLGENIS.
 
-Error responses can come back in varying forms which this decorator tries to unify.
+Error responses can come back in varying forms which this decorator tries to unify. When the server rejects the token
+of a request, the decorator logs in again and replays the request once. When an endpoint can't be found, the cached
+MOLGENIS version is verified because the server might have been upgraded (or downgraded) in the meantime.
 """
 
 import requests
 
 from mcmd.core.errors import McmdError, MolgenisOfflineError
 from mcmd.molgenis import auth
+from mcmd.molgenis import version as molgenis_version
+
+_UNKNOWN_ENDPOINT_STATUSES = (404, 405)
 
 
 def request(func):
@@ -19,9 +24,15 @@ def request(func):
         response = str()
         try:
             response = func(*args, **kwargs)
+            if response.status_code == 401:
+                auth.renew_token()
+                response = func(*args, **kwargs)
             response.raise_for_status()
             return response
         except requests.HTTPError as e:
+            if response.status_code in _UNKNOWN_ENDPOINT_STATUSES:
+                molgenis_version.verify()
+
             if _is_json(response):
                 _handle_json_error(response.json())
             elif _is_problem(response):
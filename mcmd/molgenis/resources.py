@@ -1,14 +1,30 @@
+"""
+Checks which resources (entity types, packages, groups, etc.) exist on the selected host.
+
+Existence is looked up with one '=in=' query per resource type for many ids at once, and the queries for different
+resource types are sent in parallel. The results are cached per host for the rest of the process, so that the lines of a
+script don't look up the same resources over and over again. The cache of a host is cleared as soon as a request that
+can change data is sent to it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import List
+from typing import List, Dict, Tuple, Iterable, Set
 
-from mcmd.molgenis import api
-from mcmd.molgenis.client import get
+from mcmd.config import config
+from mcmd.core import metrics
+from mcmd.core.errors import McmdError
 from mcmd.in_out.ask import multi_choice
 from mcmd.in_out.logging import get_logger
-from mcmd.core.errors import McmdError
+from mcmd.molgenis import data, session
+from mcmd.utils.iterables import chunks
 
 log = get_logger()
 
+_cache: Dict[str, Dict[Tuple['ResourceType', str], bool]] = dict()
+_cache_lock = threading.Lock()
+
 
 class ResourceType(Enum):
     ENTITY_TYPE = ('sys_md_EntityType', 'entityclass', 'Entity Type', 'id')
@@ -16,6 +32,7 @@ class ResourceType(Enum):
     PACKAGE = ('sys_md_Package', 'package', 'Package', 'id')
     PLUGIN = ('sys_Plugin', 'plugin', 'Plugin', 'id')
     GROUP = ('sys_sec_Group', 'group', 'Group', 'name')
+    USER = ('sys_sec_User', 'user', 'User', 'username')
 
     def get_entity_id(self):
         return self.value[0]
@@ -35,42 +52,118 @@ class ResourceType(Enum):
 
 
 def detect_resource_type(resource_id, types: List[ResourceType]):
-    results = dict()
-    for resource_type in types:
-        if resource_exists(resource_id, resource_type):
-            results[resource_type.get_label()] = resource_id
-
-    if len(results) == 0:
-        raise McmdError('No resources found with id %s' % resource_id)
-    elif len(results) > 1:
-        choices = results.keys()
-        answer = multi_choice('Multiple resources found for %s. Choose one:' % resource_id, choices)
-        return ResourceType.of_label(answer)
-    else:
-        return ResourceType.of_label(list(results)[0])
+    return detect_resource_types([resource_id], types)[resource_id]
+
+
+def detect_resource_types(resource_ids: List[str], types: List[ResourceType]) -> Dict[str, ResourceType]:
+    """
+    Detects the types of many resources at once. When a resource exists as more than one of the given types, the user
+    is asked to choose one.
+    :param resource_ids: the ids of the resources
+    :param types: the candidate resource types
+    :return: a dictionary of resource id to resource type
+    """
+    found = resolve_resources(resource_ids, types)
+
+    resource_types = dict()
+    for resource_id in resource_ids:
+        labels = [resource_type.get_label() for resource_type in found[resource_id]]
+        if len(labels) == 0:
+            raise McmdError('No resources found with id %s' % resource_id)
+        elif len(labels) > 1:
+            answer = multi_choice('Multiple resources found for %s. Choose one:' % resource_id, labels)
+            resource_types[resource_id] = ResourceType.of_label(answer)
+        else:
+            resource_types[resource_id] = ResourceType.of_label(labels[0])
+    return resource_types
+
+
+def resolve_resources(resource_ids: Iterable[str], types: List[ResourceType]) -> Dict[str, List[ResourceType]]:
+    """
+    Looks up which of the resources exist as which of the given types. Resources that aren't in the cache are looked up
+    with one query per resource type (per hundred ids), the queries for the different types are sent in parallel.
+    :param resource_ids: the ids of the resources
+    :param types: the candidate resource types
+    :return: a dictionary of resource id to the types that a resource with that id exists as (in the order of 'types')
+    """
+    resource_ids = list(dict.fromkeys(resource_ids))
+    host = _host()
+    with _cache_lock:
+        cache = dict(_cache.get(host, dict()))
+
+    missing = {resource_type: [resource_id for resource_id in resource_ids if (resource_type, resource_id) not in cache]
+               for resource_type in types}
+    missing = {resource_type: ids for resource_type, ids in missing.items() if len(ids) > 0}
+
+    if len(missing) > 0:
+        looked_up = _look_up(missing)
+        with _cache_lock:
+            _cache.setdefault(host, dict()).update(looked_up)
+        cache.update(looked_up)
+
+    return {resource_id: [resource_type for resource_type in types if cache[(resource_type, resource_id)]]
+            for resource_id in resource_ids}
 
 
 def resource_exists(resource_id, resource_type):
-    log.debug('Checking if %s %s exists' % (resource_type.get_label(), resource_id))
-    query = '{}=={}'.format(resource_type.get_identifying_attribute(), resource_id)
-    response = get(api.rest2(resource_type.get_entity_id()),
-                   params={
-                       'q': query
-                   })
-    return int(response.json()['total']) > 0
+    return len(resolve_resources([resource_id], [resource_type])[resource_id]) > 0
 
 
 def one_resource_exists(resources, resource_type):
-    log.debug('Checking if one of [{}] exists in [{}]'.format(','.join(resources), resource_type.get_label()))
-    query = '{}=in=({})'.format(resource_type.get_identifying_attribute(), ','.join(resources))
-    response = get(api.rest2(resource_type.get_entity_id()),
-                   params={
-                       'q': query
-                   })
-
-    return int(response.json()['total']) > 0
+    return any(len(types) > 0 for types in resolve_resources(resources, [resource_type]).values())
 
 
 def ensure_resource_exists(resource_id, resource_type):
-    if not resource_exists(resource_id, resource_type):
-        raise McmdError('No %s found with id %s' % (resource_type.get_label(), resource_id))
+    ensure_resources_exist([resource_id], resource_type)
+
+
+def ensure_resources_exist(resource_ids: List[str], resource_type: ResourceType):
+    found = resolve_resources(resource_ids, [resource_type])
+    for resource_id in resource_ids:
+        if len(found[resource_id]) == 0:
+            raise McmdError('No %s found with id %s' % (resource_type.get_label(), resource_id))
+
+
+def clear_cache():
+    """Forgets the looked up resources of all hosts."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _look_up(missing: Dict[ResourceType, List[str]]) -> Dict[Tuple[ResourceType, str], bool]:
+    queries = [(resource_type, ids_chunk)
+               for resource_type, ids in missing.items()
+               for ids_chunk in chunks(ids, data.IDS_PER_QUERY)]
+
+    workers = min(len(queries), config.get('http', 'pool_size'))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(metrics.propagate(lambda query: _find_existing(*query)), queries))
+
+    looked_up = dict()
+    for (resource_type, ids), existing in zip(queries, results):
+        for resource_id in ids:
+            looked_up[(resource_type, resource_id)] = resource_id in existing
+    return looked_up
+
+
+def _find_existing(resource_type: ResourceType, resource_ids: List[str]) -> Set[str]:
+    log.debug('Checking which of [{}] exist in [{}]'.format(','.join(resource_ids), resource_type.get_label()))
+    attribute = resource_type.get_identifying_attribute()
+    query = '{}=in=({})'.format(attribute, ','.join(resource_ids))
+
+    existing = set()
+    for page in data.get_pages(resource_type.get_entity_id(), attrs=attribute, query=query):
+        existing.update(str(item[attribute]) for item in page['items'])
+    return existing
+
+
+def _host():
+    return session.get_host(config.get('host', 'selected'))
+
+
+def _invalidate(host: str):
+    with _cache_lock:
+        _cache.pop(host, None)
+
+
+session.add_write_listener(_invalidate)
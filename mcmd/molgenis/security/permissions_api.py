@@ -1,33 +1,75 @@
 """Client for the Permission API of MOLGENIS 8.1.1 and up."""
+from collections import defaultdict
+from typing import List, Tuple, Dict
 from urllib.parse import urljoin, quote
 
+import attr
+
+from mcmd.config import config
 from mcmd.core.errors import McmdError
 from mcmd.molgenis import api
 from mcmd.molgenis.client import get, delete, post, patch
 from mcmd.molgenis.principals import PrincipalType, to_role_name
 from mcmd.molgenis.security.permission import Permission
-
-
-def grant_row_permission(principal_type: PrincipalType,
-                         principal_name: str,
-                         entity_type_id: str,
-                         entity_id: str,
-                         permission: Permission):
-    """Grants a permission on one row to one principal."""
-
-    existing_permissions = _get_existing_permissions('entity-' + entity_type_id,
-                                                     entity_id,
-                                                     principal_type,
-                                                     principal_name)
-
-    if permission == Permission.NONE:
-        if len(existing_permissions) != 0:
-            _delete_permission(entity_type_id, entity_id, principal_type, principal_name)
-    else:
-        if len(existing_permissions) == 0:
-            _add_permission(entity_type_id, entity_id, principal_type, principal_name, permission)
-        else:
-            _update_permission(entity_type_id, entity_id, principal_type, principal_name, permission)
+from mcmd.utils.iterables import chunks
+
+# Up to this number of rows, the existing permissions are requested per row instead of in bulk
+_ROW_LOOKUP_THRESHOLD = 10
+_PERMISSIONS_PAGE_SIZE = 1000
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class PermissionChanges:
+    """Summary of the row permissions that were changed."""
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+
+def grant_row_permissions(principals: List[Tuple[PrincipalType, str]],
+                          entity_type_id: str,
+                          entity_ids: List[str],
+                          permission: Permission) -> PermissionChanges:
+    """
+    Grants a permission on rows to principals. Compares the wanted permissions with the existing permissions (which are
+    retrieved in bulk) and only sends the differences. Additions and updates are sent in chunks of multiple rows.
+    """
+
+    type_id = 'entity-' + entity_type_id
+    principal_bodies = [_get_principal_body(principal_type, principal_name)
+                        for principal_type, principal_name in principals]
+    existing_permissions = _get_existing_row_permissions(type_id, entity_ids, principal_bodies)
+    wanted_permission = permission.value.upper()
+
+    additions = defaultdict(list)
+    updates = defaultdict(list)
+    deletions = list()
+    unchanged = 0
+    for entity_id in entity_ids:
+        for body in principal_bodies:
+            existing_permission = existing_permissions.get((entity_id, _get_principal_key(body)))
+            if permission == Permission.NONE:
+                if existing_permission:
+                    deletions.append((entity_id, body))
+                else:
+                    unchanged += 1
+            elif existing_permission is None:
+                additions[entity_id].append(dict(body, permission=wanted_permission))
+            elif existing_permission != wanted_permission:
+                updates[entity_id].append(dict(body, permission=wanted_permission))
+            else:
+                unchanged += 1
+
+    _send_object_permissions(post, type_id, additions)
+    _send_object_permissions(patch, type_id, updates)
+    for entity_id, body in deletions:
+        delete(_get_entity_url(entity_type_id, entity_id), data=body)
+
+    return PermissionChanges(added=sum(len(permissions) for permissions in additions.values()),
+                             updated=sum(len(permissions) for permissions in updates.values()),
+                             removed=len(deletions),
+                             unchanged=unchanged)
 
 
 def get_user_plugin_permission(plugin: str, user: str) -> Permission:
@@ -93,45 +135,77 @@ def _get_permission(type_id: str, object_id, principal_type: PrincipalType, prin
         return Permission[permissions[0]['permission']]
 
 
-def _get_existing_permissions(type_id: str, object_id: str, principal_type: PrincipalType, principal_name: str):
-    get_url = urljoin(api.permissions(),
-                      '{}/{}?q={}=={}'.format(quote(type_id, safe=''),
-                                              quote(object_id, safe=''),
-                                              quote(principal_type.value),
-                                              quote(principal_name, safe='')))
+def _get_existing_row_permissions(type_id: str, entity_ids: List[str], principal_bodies: List[dict]) -> dict:
+    """
+    Gets the existing permissions of the principals on the rows. When there are only a few rows, the permissions are
+    requested per row. Otherwise all the rows that the principals have permissions on are requested page by page.
+    :return: a dict of (entity id, principal key) -> permission
+    """
+    queries = _get_principal_queries(principal_bodies)
+
+    existing_permissions = dict()
+    if len(entity_ids) <= _ROW_LOOKUP_THRESHOLD:
+        for entity_id in entity_ids:
+            for query in queries:
+                url = urljoin(api.permissions(), '{}/{}'.format(quote(type_id, safe=''), quote(entity_id, safe='')))
+                permissions = get(url, params={'q': query}).json()['data']['permissions']
+                _add_existing_permissions(existing_permissions, entity_id, permissions)
+    else:
+        wanted_ids = set(entity_ids)
+        for query in queries:
+            for object_permissions in _get_paged_object_permissions(type_id, query):
+                object_id = str(object_permissions['id'])
+                if object_id in wanted_ids:
+                    _add_existing_permissions(existing_permissions, object_id, object_permissions['permissions'])
 
-    existing_permissions = get(get_url).json()['data']['permissions']
     return existing_permissions
 
 
-def _delete_permission(entity_type_id: str, entity_id: str, principal_type: PrincipalType, principal_name: str):
-    url = _get_entity_url(entity_type_id, entity_id)
-    body = _get_principal_body(principal_type, principal_name)
-    delete(url, data=body)
+def _get_paged_object_permissions(type_id: str, query: str):
+    url = urljoin(api.permissions(), quote(type_id, safe=''))
+    page_number = 1
+    while True:
+        response = get(url, params={'q': query,
+                                    'page': page_number,
+                                    'pageSize': _PERMISSIONS_PAGE_SIZE}).json()
+        yield from response['data']['objects']
+
+        page = response.get('page')
+        if not page or page_number >= int(page['totalPages']):
+            break
+        page_number += 1
+
+
+def _add_existing_permissions(existing_permissions: dict, entity_id: str, permissions: List[dict]):
+    for permission in permissions:
+        existing_permissions[(entity_id, _get_principal_key(permission))] = permission['permission']
+
 
+def _get_principal_queries(principal_bodies: List[dict]) -> List[str]:
+    """Creates one RSQL query per principal type (user or role)."""
+    names_per_type = defaultdict(list)
+    for body in principal_bodies:
+        principal_type, principal_name = _get_principal_key(body)
+        names_per_type[principal_type].append(principal_name)
 
-def _add_permission(entity_type_id: str,
-                    entity_id: str,
-                    principal_type: PrincipalType,
-                    principal_name: str,
-                    permission: Permission):
-    url = _get_entity_url(entity_type_id, entity_id)
-    body = _get_principal_body(principal_type, principal_name)
+    return ['{}=in=({})'.format(principal_type, ','.join(names)) for principal_type, names in names_per_type.items()]
 
-    body['permission'] = permission.value.upper()
-    post(url, data={'permissions': [body]})
 
+def _get_principal_key(body: dict) -> Tuple[str, str]:
+    """Gets the principal type and name from a permission or principal body, for example: ('user', 'henk')."""
+    for principal_type in PrincipalType:
+        if principal_type.value in body:
+            return principal_type.value, body[principal_type.value]
+    raise McmdError('Unknown principal in permission: {}'.format(body))
 
-def _update_permission(entity_type_id: str,
-                       entity_id: str,
-                       principal_type: PrincipalType,
-                       principal_name: str,
-                       permission: Permission):
-    url = _get_entity_url(entity_type_id, entity_id)
-    body = _get_principal_body(principal_type, principal_name)
 
-    body['permission'] = permission.value.upper()
-    patch(url, data={'permissions': [body]})
+def _send_object_permissions(method, type_id: str, permissions_per_object: Dict[str, List[dict]]):
+    """Sends the permissions of multiple objects per request, using the given method (post or patch)."""
+    url = urljoin(api.permissions(), quote(type_id, safe=''))
+    for object_ids in chunks(permissions_per_object.keys(), config.get('settings', 'batch_size')):
+        objects = [{'objectId': object_id,
+                    'permissions': permissions_per_object[object_id]} for object_id in object_ids]
+        method(url, data={'objects': objects})
 
 
 def _get_entity_url(entity_type_id: str, entity_id: str) -> str:
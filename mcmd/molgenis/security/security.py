@@ -3,12 +3,15 @@ Entry point for security related actions. Delegates to permission_manager.py or
 MOLGENIS version being used and the action being performed.
 """
 
+from typing import List, Tuple
+
 from mcmd.core.compatibility import version
 from mcmd.core.errors import McmdError
 from mcmd.molgenis.principals import PrincipalType
 from mcmd.molgenis.resources import ResourceType
 from mcmd.molgenis.security import permission_manager, permissions_api
 from mcmd.molgenis.security.permission import Permission
+from mcmd.molgenis.security.permissions_api import PermissionChanges
 from mcmd.molgenis.version import get_version
 
 
@@ -25,25 +28,23 @@ def grant_permission(principal_type: PrincipalType,
 
 # noinspection PyUnusedLocal
 @version('7.0.0')
-def grant_row_permission(principal_type: PrincipalType,
-                         principal_name: str,
-                         entity_type_id: str,
-                         entity_id: str,
-                         permission: Permission):
+def grant_row_permissions(principals: List[Tuple[PrincipalType, str]],
+                          entity_type_id: str,
+                          entity_ids: List[str],
+                          permission: Permission) -> PermissionChanges:
     raise McmdError(
         "Giving row level security is only possible since MOLGENIS 8.1.1 (you are using {})".format(
             get_version()))
 
 
 @version('8.1.1')
-def grant_row_permission(principal_type: PrincipalType,
-                         principal_name: str,
-                         entity_type_id: str,
-                         entity_id: str,
-                         permission: Permission):
-    """Grants permission on one row to one principal."""
-
-    permissions_api.grant_row_permission(principal_type, principal_name, entity_type_id, entity_id, permission)
+def grant_row_permissions(principals: List[Tuple[PrincipalType, str]],
+                          entity_type_id: str,
+                          entity_ids: List[str],
+                          permission: Permission) -> PermissionChanges:
+    """Grants permission on one or more rows to one or more principals."""
+
+    return permissions_api.grant_row_permissions(principals, entity_type_id, entity_ids, permission)
 
 
 @version('7.0.0')
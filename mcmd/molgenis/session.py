@@ -0,0 +1,158 @@
+"""
+Pooled HTTP sessions. Every host gets its own requests Session so that connections (and their TLS handshakes) are reused
+between requests instead of opening a new connection for every call. The pool size, retries and timeouts are configured
+in the 'http' section of the configuration file.
+
+Modules that cache information about a host can register a write listener, which is called with the host whenever a
+request that can change data (anything but GET, HEAD and OPTIONS, and logging in or out) has been sent to it.
+"""
+
+import threading
+import time
+from typing import Dict, Callable, List
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+from mcmd.config import config
+from mcmd.core import metrics
+from mcmd.in_out import in_out
+
+_RETRY_STATUSES = (502, 503, 504)
+_RETRY_BACKOFF = 0.5
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+_AUTH_PATHS = ('/api/v1/login', '/api/v1/logout')
+
+_sessions: Dict[str, 'PooledSession'] = dict()
+_write_listeners: List[Callable[[str], None]] = list()
+_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """A Session that applies the configured timeouts to every request that doesn't specify its own timeout."""
+
+    def __init__(self, timeout: tuple):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = super().request(method, url, **kwargs)
+            return response
+        finally:
+            if _changes_data(method, url):
+                _notify_write(url)
+            if metrics.is_enabled():
+                _record(method, url, start, response, kwargs.get('stream', False))
+
+
+class _PoolAdapter(HTTPAdapter):
+    """Transport adapter that logs whether a request used a new or a reused connection (only in verbose mode)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._opened_connections = dict()
+        self._connections_lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self._log_connection(request, response)
+        return response
+
+    def _log_connection(self, request, response):
+        pool = getattr(response.raw, '_pool', None)
+        if pool is None:
+            return
+
+        with self._connections_lock:
+            opened = pool.num_connections
+            reused = self._opened_connections.get(id(pool)) == opened
+            self._opened_connections[id(pool)] = opened
+
+        in_out.debug('{} {} ({} connection, {} opened to {})'.format(request.method,
+                                                                   request.url,
+                                                                   'reused' if reused else 'new',
+                                                                   opened,
+                                                                   pool.host))
+
+
+def get_session(url: str) -> PooledSession:
+    """Returns the shared session of the host of the given URL. Creates the session on first use."""
+    host = get_host(url)
+    with _lock:
+        if host not in _sessions:
+            _sessions[host] = _create_session()
+        return _sessions[host]
+
+
+def add_write_listener(listener: Callable[[str], None]):
+    """Registers a function that is called with the host of every request that can change data."""
+    _write_listeners.append(listener)
+
+
+def close_sessions():
+    """Closes all sessions and their pooled connections."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get_host(url: str) -> str:
+    """Returns the scheme and network location of a URL, for example: https://molgenis.org"""
+    parts = urlsplit(url)
+    return '{}://{}'.format(parts.scheme, parts.netloc)
+
+
+def _create_session() -> PooledSession:
+    retries = Retry(total=config.get('http', 'retries'),
+                    backoff_factor=_RETRY_BACKOFF,
+                    status_forcelist=_RETRY_STATUSES,
+                    raise_on_status=False)
+    adapter = _PoolAdapter(pool_maxsize=config.get('http', 'pool_size'),
+                           max_retries=retries)
+
+    session = PooledSession(timeout=(config.get('http', 'timeout', 'connect'),
+                                     config.get('http', 'timeout', 'read')))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _record(method: str, url: str, start: float, response, stream: bool):
+    if response is None:
+        metrics.record_request(method, url, start, status=None, bytes_sent=None, bytes_received=None, retries=0)
+        return
+
+    body = response.request.body
+    bytes_sent = len(body) if hasattr(body, '__len__') else None
+    if stream:
+        # the body hasn't been read yet
+        content_length = response.headers.get('Content-Length')
+        bytes_received = int(content_length) if content_length else None
+    else:
+        bytes_received = len(response.content)
+
+    retry_state = getattr(response.raw, 'retries', None)
+    retries = len(retry_state.history) if retry_state else 0
+
+    metrics.record_request(method, url, start, status=response.status_code, bytes_sent=bytes_sent,
+                           bytes_received=bytes_received, retries=retries)
+
+
+def _changes_data(method: str, url: str) -> bool:
+    if method.upper() in _SAFE_METHODS:
+        return False
+    path = urlsplit(url).path.rstrip('/')
+    return not path.endswith(_AUTH_PATHS)
+
+
+def _notify_write(url: str):
+    host = get_host(url)
+    for listener in _write_listeners:
+        listener(host)
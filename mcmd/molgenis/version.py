@@ -1,16 +1,29 @@
-"""Contains the MOLGENIS version of the current host."""
+"""
+Contains the MOLGENIS version of the current host.
+
+The version is cached per host in the store, so that it doesn't have to be looked up on every run. The cached version
+expires after a configurable amount of hours and can be refreshed explicitly. When a request hits an unknown endpoint
+the cached version is verified: it's looked up on the server again, but at most once per run.
+"""
 import re
+from datetime import datetime, timedelta
 from urllib.parse import urljoin
 
 import requests
 from requests import HTTPError
 
 from mcmd.config import config
+from mcmd.core import store
 from mcmd.core.errors import McmdError, MolgenisOfflineError
+from mcmd.in_out import in_out
+from mcmd.molgenis.session import get_session
 
 _version_number = None
 _version = None
 
+# The host of which the version was looked up on the server during this run
+_verified_host = None
+
 
 def get_version():
     """
@@ -18,7 +31,7 @@ def get_version():
     """
     global _version
     if not _version:
-        _get_version()
+        _load_version()
     return _version
 
 
@@ -28,24 +41,78 @@ def get_version_number():
     """
     global _version_number
     if not _version_number:
-        _get_version()
+        _load_version()
     return _version_number
 
 
-def _get_version():
+def refresh():
+    """
+    Looks up the MOLGENIS version on the server, ignoring (and replacing) the cached version.
+    """
+    _fetch_version()
+    return _version
+
+
+def verify():
+    """
+    Looks up the MOLGENIS version on the server if the version in use came from the cache. The server might have been
+    upgraded (or downgraded) since the version was cached. The version is looked up at most once per run, so requests
+    for resources that don't exist don't cause a lookup every time. Errors are ignored: the error of the original
+    request is the one that should be reported.
+    """
+    global _verified_host
+    if _version and _verified_host != _host():
+        # a failed lookup counts as well, so a server that can't report its version isn't asked again
+        _verified_host = _host()
+        try:
+            _fetch_version()
+        except McmdError:
+            pass
+
+
+def _load_version():
+    cached = store.get_molgenis_version(_host())
+    if cached and not cached.is_expired():
+        _set_version(cached.version)
+    else:
+        _fetch_version()
+
+
+def _fetch_version():
+    global _verified_host
     try:
-        response = requests.get(urljoin(config.get('host', 'selected'), 'api/v2/version'),
-                                headers={'Content-Type': 'application/json'})
+        url = urljoin(_host(), 'api/v2/version')
+        response = get_session(url).get(url, headers={'Content-Type': 'application/json'})
         response.raise_for_status()
-
-        global _version
-        global _version_number
-        _version = response.json()['molgenisVersion']
-        _version_number = _extract_version_number(_version)
+        version = response.json()['molgenisVersion']
     except HTTPError as e:
         raise McmdError(str(e))
     except requests.exceptions.ConnectionError:
         raise MolgenisOfflineError()
+    except requests.RequestException as e:
+        raise McmdError(str(e))
+
+    cached = store.get_molgenis_version(_host())
+    if cached and cached.version != version:
+        in_out.debug('MOLGENIS version changed from {} to {}'.format(cached.version, version))
+
+    _set_version(version)
+    _verified_host = _host()
+    ttl = timedelta(hours=config.get('settings', 'version_check_interval'))
+    store.set_molgenis_version(_host(), store.CachedVersion(version=version,
+                                                            fetched_at=datetime.now(),
+                                                            ttl=ttl))
+
+
+def _set_version(version: str):
+    global _version
+    global _version_number
+    _version_number = _extract_version_number(version)
+    _version = version
+
+
+def _host():
+    return config.get('host', 'selected')
 
 
 def _extract_version_number(_version):
@@ -135,6 +135,16 @@ class Command(Statement, Templatable):
         return self.command.variables
 
 
+@attr.s(frozen=True)
+class Barrier(Statement):
+    """
+    A barrier. When running a script in parallel, waits for all commands before it to finish before continuing.
+
+    $barrier
+    """
+    pass
+
+
 @attr.s(frozen=True, auto_attribs=True)
 class InvisibleComment(Statement):
     """
@@ -1,30 +1,60 @@
+from functools import lru_cache
 from typing import FrozenSet
 
 import attr
 import jinja2
-from jinja2 import Environment, meta
+from jinja2 import Environment, meta, nodes
 
 _env = Environment(autoescape=False)
 
+# Strings that don't contain any of these (the start of a variable, block or comment) are not templates
+_SYNTAX_STARTS = (_env.variable_start_string, _env.block_start_string, _env.comment_start_string)
+
 
 @attr.s(frozen=True, auto_attribs=True)
 class Template:
     """
     A container for a Jinja2 template. Exposes the variables found in the template through the variables property.
+
+    The template is parsed when it's created (to find syntax errors) and only compiled when it's rendered. Templates
+    with the same string share the parsed and compiled template. Because only the string is stored, a Template is cheap
+    to pickle (and unpickling doesn't parse it again).
+
+    Most lines of a script (plain commands and comments) don't contain any template syntax. These literal templates
+    aren't parsed at all: they have no variables and render to their own string.
     """
 
     string: str
-    _template: jinja2.Template = attr.ib(init=False, eq=False)
-    variables: FrozenSet[str] = attr.ib(init=False)
 
-    @_template.default
-    def __set_template(self):  # NOSONAR method is not unused
-        return _env.from_string(self.string)
+    def __attrs_post_init__(self):
+        if not self.is_literal():
+            _parse(self.string)
 
-    @variables.default
-    def __set_variables(self) -> frozenset:  # NOSONAR method is not unused
-        parsed_content = _env.parse(self.string)
-        return frozenset(meta.find_undeclared_variables(parsed_content))
+    def is_literal(self) -> bool:
+        return not any(start in self.string for start in _SYNTAX_STARTS)
+
+    @property
+    def variables(self) -> FrozenSet[str]:
+        if self.is_literal():
+            return frozenset()
+        return _find_variables(self.string)
 
     def render(self, values: dict) -> str:
-        return self._template.render(values)
+        if self.is_literal():
+            return self.string
+        return _compile(self.string).render(values)
+
+
+@lru_cache(maxsize=None)
+def _parse(string: str) -> nodes.Template:
+    return _env.parse(string)
+
+
+@lru_cache(maxsize=None)
+def _find_variables(string: str) -> FrozenSet[str]:
+    return frozenset(meta.find_undeclared_variables(_parse(string)))
+
+
+@lru_cache(maxsize=None)
+def _compile(string: str) -> jinja2.Template:
+    return _env.from_string(_parse(string))
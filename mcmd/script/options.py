@@ -8,3 +8,4 @@ class ScriptOptions:
     start_at: int = 1
     log_comments: bool = True
     exit_on_error: bool = True
+    parallel: int = 1
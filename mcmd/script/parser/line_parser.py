@@ -6,7 +6,7 @@ from parsy import regex, string, seq, whitespace, from_enum, generate, ParseErro
 
 from mcmd.script.model.lines import Line
 from mcmd.script.model.statements import Statement, Value, Input, Wait, VisibleComment, Command, \
-    InvisibleComment, Empty
+    InvisibleComment, Empty, Barrier
 from mcmd.script.model.templates import Template
 from mcmd.script.model.types_ import InputType
 from mcmd.script.parser.errors import ScriptSyntaxError
@@ -77,8 +77,11 @@ _invisible_comment = seq(__start=string('//'),
 _wait_declaration = seq(__keyword=string("wait"),
                         message=_wait_message).combine_dict(Wait)
 
+# $barrier
+_barrier_declaration = string('barrier').result(Barrier())
+
 # define declaration parser
-_declaration = string('$') >> (_value_declaration | _input_declaration | _wait_declaration)
+_declaration = string('$') >> (_value_declaration | _input_declaration | _wait_declaration | _barrier_declaration)
 
 # define comment parser
 _comment = _visible_comment | _invisible_comment
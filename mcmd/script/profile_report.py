@@ -0,0 +1,101 @@
+"""
+A report of the cost of every line of a script: the time it took, the number of HTTP requests it sent, the number of
+bytes that were transferred and the time that was spent waiting for imports to finish. The report is created from the
+events that the metrics module recorded while the script was running.
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import List
+
+import attr
+
+from mcmd.core import metrics
+from mcmd.core.errors import McmdError
+from mcmd.in_out.in_out import bold
+from mcmd.in_out.logging import get_logger
+from mcmd.script.model.lines import ParsedLine
+from mcmd.utils.files import format_size
+
+log = get_logger()
+
+# The number of lines that are shown in the table, the report file contains all lines
+_TOP_LINES = 25
+_LINE_WIDTH = 60
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class LineProfile:
+    number: int
+    line: str
+    time: float
+    requests: int
+    bytes: int
+    wait: float
+
+
+def create_report(lines: List[ParsedLine]) -> List[LineProfile]:
+    """Creates the profiles of the lines that were run, the most expensive line first."""
+    events_per_line = dict()
+    for event in metrics.get_events():
+        if event.scope is not None:
+            events_per_line.setdefault(event.scope, list()).append(event)
+
+    report = list()
+    for line in lines:
+        if line.number not in events_per_line:
+            continue
+
+        events = events_per_line[line.number]
+        requests = [event for event in events if event.category == metrics.REQUEST]
+        report.append(LineProfile(number=line.number,
+                                  line=line.raw.strip(),
+                                  time=sum(event.duration for event in events if event.category == metrics.LINE),
+                                  requests=len(requests),
+                                  bytes=sum((event.details.get('bytes_sent') or 0) +
+                                            (event.details.get('bytes_received') or 0) for event in requests),
+                                  wait=sum(event.duration for event in events if event.category == metrics.WAIT)))
+
+    report.sort(key=lambda profile: profile.time, reverse=True)
+    return report
+
+
+def print_report(report: List[LineProfile]):
+    log.info('')
+    log.info(bold('{:>6} {:>10} {:>9} {:>10} {:>9}  {}'.format('line', 'time (s)', 'requests', 'transfer', 'wait (s)',
+                                                                'statement')))
+    for profile in report[:_TOP_LINES]:
+        log.info('{:>6} {:>10.2f} {:>9} {:>10} {:>9.2f}  {}'.format(profile.number,
+                                                                     profile.time,
+                                                                     profile.requests,
+                                                                     format_size(profile.bytes),
+                                                                     profile.wait,
+                                                                     _shorten(profile.line)))
+    if len(report) > _TOP_LINES:
+        log.info('{:>6}  ({} more lines)'.format('...', len(report) - _TOP_LINES))
+
+    log.info('{:>6} {:>10.2f} {:>9} {:>10} {:>9.2f}'.format('total',
+                                                             sum(profile.time for profile in report),
+                                                             sum(profile.requests for profile in report),
+                                                             format_size(sum(profile.bytes for profile in report)),
+                                                             sum(profile.wait for profile in report)))
+
+
+def write_report(report: List[LineProfile], file: Path):
+    """Writes the report as JSON if the file name ends with '.json', as CSV otherwise."""
+    rows = [attr.asdict(profile) for profile in report]
+    try:
+        with file.open('w', newline='') as f:
+            if file.suffix == '.json':
+                json.dump(rows, f, indent=2)
+            else:
+                writer = csv.DictWriter(f, fieldnames=[field.name for field in attr.fields(LineProfile)])
+                writer.writeheader()
+                writer.writerows(rows)
+    except OSError as e:
+        raise McmdError('Error writing profile report: {}'.format(str(e)))
+
+
+def _shorten(text: str) -> str:
+    return text if len(text) <= _LINE_WIDTH else text[:_LINE_WIDTH - 3] + '...'
@@ -0,0 +1,90 @@
+"""
+An on-disk cache of parsed scripts. Parsing a large script takes a while, so the parsed Script is pickled and reused
+as long as the script's content and the version of the commander don't change. Only the most recently used scripts are
+kept.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import List, Optional
+
+from mcmd.core import distribution
+from mcmd.core.context import context
+from mcmd.script.model.script import Script
+from mcmd.script.parser import script_parser
+from mcmd.utils import file_lock
+
+_CACHE_FOLDER = 'scripts'
+_SUFFIX = '.pickle'
+_MAX_ENTRIES = 50
+
+# Increase when the model of a Script changes in a way that the version number doesn't reflect (during development)
+_FORMAT = 1
+
+
+def parse(lines: List[str]) -> Script:
+    """
+    Returns the parsed script from the cache, or parses the script and caches the result.
+
+    :exception InvalidScriptError if the script contains errors (invalid scripts aren't cached)
+    """
+    cache_file = _get_cache_folder().joinpath(_get_key(lines) + _SUFFIX)
+
+    script = _read(cache_file)
+    if script is None:
+        script = script_parser.parse(lines)
+        _write(cache_file, script)
+    return script
+
+
+def _get_key(lines: List[str]) -> str:
+    digest = hashlib.sha256('{}\0{}\0'.format(_FORMAT, distribution.get_version()).encode('utf-8'))
+    for line in lines:
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _read(cache_file: Path) -> Optional[Script]:
+    try:
+        with cache_file.open('rb') as f:
+            script = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, TypeError):
+        return None
+
+    # marks the entry as recently used
+    _touch(cache_file)
+    return script if isinstance(script, Script) else None
+
+
+def _write(cache_file: Path, script: Script):
+    """Caching is an optimization: when it fails the script is simply parsed again next time."""
+    try:
+        file_lock.replace_atomically(cache_file, pickle.dumps(script, protocol=pickle.HIGHEST_PROTOCOL))
+        _prune(cache_file.parent)
+    except (OSError, pickle.PickleError, RecursionError):
+        pass
+
+
+def _prune(folder: Path):
+    entries = sorted(folder.glob('*' + _SUFFIX), key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[_MAX_ENTRIES:]:
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+
+
+def _touch(cache_file: Path):
+    try:
+        os.utime(str(cache_file))
+    except OSError:
+        pass
+
+
+def _get_cache_folder() -> Path:
+    folder = context().get_cache_folder().joinpath(_CACHE_FOLDER)
+    folder.mkdir(exist_ok=True)
+    return folder
@@ -1,11 +1,16 @@
 import shlex
 import sys
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
 
 import attr
 
 from mcmd.args import parser as arg_parser
 from mcmd.args.errors import ArgumentSyntaxError
+from mcmd.commands._manifest import get_command_names
+from mcmd.core import metrics
+from mcmd.core.command import CommandType
 from mcmd.core.errors import McmdError, ScriptError
 from mcmd.in_out import in_out, ask
 from mcmd.in_out.in_out import bold, dim
@@ -13,7 +18,7 @@ from mcmd.in_out.logging import get_logger
 from mcmd.script.model.lines import ParsedLine
 from mcmd.script.model.script import Script
 from mcmd.script.model.statements import Value, Input, Wait, VisibleComment, Command, InvisibleComment, \
-    Empty
+    Empty, Barrier
 from mcmd.script.model.types_ import InputType, ValueType
 from mcmd.script.options import ScriptOptions
 
@@ -27,6 +32,21 @@ class _ScriptExecutionState:
     values: dict = attr.Factory(dict)
 
 
+@attr.s(auto_attribs=True)
+class _PendingLine:
+    """A line of a batch of lines that is being run in parallel. Holds the buffered output of the line."""
+    line: ParsedLine
+    future: Optional[Future] = None
+    buffer: list = attr.Factory(list)
+    error: Optional[Exception] = None
+
+    def result(self) -> Tuple[list, Optional[Exception]]:
+        if self.future:
+            return self.future.result()
+        else:
+            return self.buffer, self.error
+
+
 def run(script: Script, options: ScriptOptions):
     """
     Runs a Script by executing it line by line. Keeps track of the script's state in a _ScriptExecutionState.
@@ -51,13 +71,115 @@ def _validate_required_args(lines: List[ParsedLine], args: dict):
 
 
 def _process_lines(lines: List[ParsedLine], state: _ScriptExecutionState):
+    if state.options.parallel > 1:
+        _process_lines_in_parallel(lines, state)
+        return
+
     for line in lines:
         try:
-            _process_line(line, state)
+            with _measured(line):
+                _process_line(line, state)
         except (McmdError, ArgumentSyntaxError) as error:
             _handle_error(error, line_number=line.number, state=state)
 
 
+@contextmanager
+def _measured(line: ParsedLine):
+    """Attributes the time, requests and waits of a line to the line (when metrics are enabled)."""
+    with metrics.scope(line.number), metrics.timed(metrics.LINE, str(line.number)):
+        yield
+
+
+def _process_lines_in_parallel(lines: List[ParsedLine], state: _ScriptExecutionState):
+    """
+    Runs the commands of the script in batches. The commands in a batch are run at the same time, a batch ends at a
+    barrier: a $barrier statement, an input, a wait or a command that has to run on its own. Values and comments are
+    processed in the main thread and the output of all lines is shown in the order of the script.
+    """
+    with ThreadPoolExecutor(max_workers=state.options.parallel) as executor:
+        batch = list()
+        for line in lines:
+            statement = line.statement
+            if isinstance(statement, Command):
+                pending = _PendingLine(line)
+                try:
+                    with in_out.buffered() as pending.buffer:
+                        cmd, sub_args = _prepare_command(statement, state)
+                except (McmdError, ArgumentSyntaxError) as error:
+                    pending.error = error
+                    batch.append(pending)
+                    continue
+
+                if _runs_alone(sub_args):
+                    _finish_batch(batch, state)
+                    batch = list()
+                    _process_line_alone(line, lambda: _execute_command(cmd, sub_args, state), state)
+                else:
+                    pending.future = executor.submit(_execute_buffered, line, cmd, sub_args, state)
+                    batch.append(pending)
+            elif isinstance(statement, (Barrier, Input, Wait)):
+                _finish_batch(batch, state)
+                batch = list()
+                _process_line_alone(line, lambda: _process_line(line, state), state)
+            else:
+                pending = _PendingLine(line)
+                try:
+                    with in_out.buffered() as pending.buffer, _measured(line):
+                        _process_line(line, state)
+                except (McmdError, ArgumentSyntaxError) as error:
+                    pending.error = error
+                batch.append(pending)
+
+        _finish_batch(batch, state)
+
+
+def _process_line_alone(line: ParsedLine, process, state: _ScriptExecutionState):
+    try:
+        with _measured(line):
+            process()
+    except (McmdError, ArgumentSyntaxError) as error:
+        _handle_error(error, line_number=line.number, state=state)
+
+
+def _finish_batch(batch: List[_PendingLine], state: _ScriptExecutionState):
+    """Waits for the lines of a batch in the order of the script and shows their output (and errors)."""
+    try:
+        for pending in batch:
+            buffer, error = pending.result()
+            in_out.replay(buffer)
+            if error:
+                _handle_error(error, line_number=pending.line.number, state=state)
+    except BaseException:
+        for pending in batch:
+            if pending.future:
+                pending.future.cancel()
+        raise
+
+
+def _execute_buffered(line: ParsedLine, cmd: str, sub_args,
+                      state: _ScriptExecutionState) -> Tuple[list, Optional[Exception]]:
+    with in_out.buffered() as buffer:
+        try:
+            with _measured(line):
+                _execute_command(cmd, sub_args, state)
+        except (McmdError, ArgumentSyntaxError) as error:
+            return buffer, error
+    return buffer, None
+
+
+def _runs_alone(sub_args) -> bool:
+    """
+    Commands that run as another user or that aren't MOLGENIS commands (like 'config') change the global state.
+
+    The commands of a batch share the state of the process: the credentials and token in the auth module and the
+    config. Every command sets the credentials when it starts (see command._set_authentication), which is only safe
+    for commands that run at the same time because they all set the same credentials from the config. The token is
+    guarded by the lock of the auth module, so at worst a thread logs in again. Output is buffered per thread. Any
+    command that changes the credentials or the config for the commands after it should run alone.
+    """
+    return bool(sub_args.as_user) or sub_args.command not in get_command_names(CommandType.STANDARD)
+
+
 def _process_line(line: ParsedLine, state: _ScriptExecutionState):
     statement = line.statement
 
@@ -73,6 +195,8 @@ def _process_line(line: ParsedLine, state: _ScriptExecutionState):
         pass
     elif isinstance(statement, Empty):
         pass
+    elif isinstance(statement, Barrier):
+        pass
     elif isinstance(statement, Command):
         _run_command(statement, state)
 
@@ -133,6 +257,11 @@ def _handle_error(error: McmdError, line_number: int, state: _ScriptExecutionSta
 
 
 def _run_command(command: Command, state: _ScriptExecutionState):
+    cmd, sub_args = _prepare_command(command, state)
+    _execute_command(cmd, sub_args, state)
+
+
+def _prepare_command(command: Command, state: _ScriptExecutionState):
     cmd = command.command.render(state.values)
     try:
         sub_args = arg_parser.parse_args(shlex.split(cmd))
@@ -140,7 +269,10 @@ def _run_command(command: Command, state: _ScriptExecutionState):
         raise McmdError(message=str(e))
 
     _block_nested_scripts(sub_args.command)
+    return cmd, sub_args
+
 
+def _execute_command(cmd: str, sub_args, state: _ScriptExecutionState):
     if state.options.dry_run:
         log.info(cmd)
     else:
@@ -0,0 +1,118 @@
+"""
+Streams files from the web to disk.
+
+Files are written to a temporary '.part' file that is renamed when the download is complete, so a file is never left
+half-written. The ETag and Last-Modified headers of every download are remembered in a cache file in the download
+folder. They are used to skip files that didn't change since the last download and to resume interrupted downloads with
+a Range request.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import requests
+
+from mcmd.core.errors import McmdError
+from mcmd.molgenis.session import get_session
+
+_CHUNK_SIZE = 64 * 1024
+_CACHE_FILE = '.downloads.json'
+_PART_SUFFIX = '.part'
+
+_cache_lock = threading.Lock()
+
+
+def download(url: str, file_path: Path) -> bool:
+    """
+    Downloads a file, unless the file at file_path is the same as the file at the URL.
+    :param url: the URL of the file
+    :param file_path: where to store the file
+    :return: True if the file was downloaded, False if the existing file was unchanged
+
+    :exception McmdError if the download fails, a partial download will be resumed the next time
+    """
+    part_path = file_path.with_name(file_path.name + _PART_SUFFIX)
+    cached = _get_cached(file_path)
+
+    headers = dict()
+    if file_path.exists() and cached.get('url') == url:
+        _add_validators(headers, cached, 'If-None-Match', 'If-Modified-Since')
+    elif part_path.exists() and cached.get('partial') and cached['partial'].get('url') == url:
+        if _add_validators(headers, cached['partial'], 'If-Range', 'If-Range'):
+            headers['Range'] = 'bytes={}-'.format(part_path.stat().st_size)
+
+    try:
+        with get_session(url).get(url, headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                return False
+            if response.status_code == 416:
+                # the partial download is already complete (or broken), start over
+                part_path.unlink()
+                return download(url, file_path)
+            response.raise_for_status()
+
+            validators = _get_validators(url, response)
+            _set_cached(file_path, dict(cached, partial=validators))
+
+            mode = 'ab' if response.status_code == 206 else 'wb'
+            with part_path.open(mode) as part:
+                for chunk in response.iter_content(_CHUNK_SIZE):
+                    part.write(chunk)
+    except (OSError, requests.RequestException) as e:
+        raise McmdError('Error downloading {}: {}'.format(url, str(e)))
+
+    os.replace(str(part_path), str(file_path))
+    _set_cached(file_path, validators)
+    return True
+
+
+def is_cached(file_path: Path) -> bool:
+    """Whether a file was downloaded before, so that its changes can be detected."""
+    return file_path.exists() and 'url' in _get_cached(file_path)
+
+
+def _add_validators(headers: dict, cached: dict, etag_header: str, date_header: str) -> bool:
+    if cached.get('etag'):
+        headers[etag_header] = cached['etag']
+    elif cached.get('last_modified'):
+        headers[date_header] = cached['last_modified']
+    else:
+        return False
+    return True
+
+
+def _get_validators(url: str, response) -> dict:
+    return {'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')}
+
+
+def _get_cached(file_path: Path) -> dict:
+    with _cache_lock:
+        return _read_cache(file_path.parent).get(file_path.name, dict())
+
+
+def _set_cached(file_path: Path, entry: dict):
+    with _cache_lock:
+        cache = _read_cache(file_path.parent)
+        cache[file_path.name] = entry
+        cache_file = file_path.parent.joinpath(_CACHE_FILE)
+        temp_file = cache_file.with_name(cache_file.name + _PART_SUFFIX)
+        try:
+            temp_file.write_text(json.dumps(cache, indent=2))
+            os.replace(str(temp_file), str(cache_file))
+        except OSError as e:
+            raise McmdError('Error writing download cache: {}'.format(str(e)))
+
+
+def _read_cache(folder: Path) -> dict:
+    cache_file = folder.joinpath(_CACHE_FILE)
+    if not cache_file.is_file():
+        return dict()
+    try:
+        return json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        # a broken cache only means that files are downloaded again
+        return dict()
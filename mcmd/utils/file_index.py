@@ -0,0 +1,184 @@
+"""
+A persistent index of the files in the quick-folders: the dataset, resource and git folders that are searched when a
+file is referred to by its name.
+
+Listing large folders (especially on network drives) is slow, so the file names are kept in an index in the cache
+folder. Every folder in the index is stored with its modification time, which changes when a file is added to it,
+removed from it or renamed. Only the folders that changed since they were indexed are listed again. Files are looked up
+by name or by stem (the name without the extension) in a dictionary.
+
+When the 'recursive' setting is enabled the subfolders of the quick-folders are indexed as well. Files and folders with
+a name that matches one of the 'ignore' patterns are left out.
+"""
+
+import os
+import pickle
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+import attr
+
+from mcmd.config import config
+from mcmd.core.context import context
+from mcmd.in_out import in_out
+from mcmd.utils import file_lock
+
+_INDEX_FILE = 'file_index.pickle'
+
+# Increase when the structure of the index changes
+_FORMAT = 1
+
+# File systems store modification times with a limited precision: a folder that changed shortly before it was listed
+# might change again without getting a new modification time, so it is listed again the next time
+_RACY_SECONDS = 2
+
+# The index of the current process, loaded from disk the first time it's needed
+_trees: Optional[Dict[str, '_Tree']] = None
+
+
+@attr.s(auto_attribs=True)
+class _Folder:
+    mtime: Optional[int]
+    files: List[str]
+    folders: List[str]
+
+
+@attr.s(auto_attribs=True)
+class _Tree:
+    """The index of a quick-folder (and its subfolders)."""
+    recursive: bool
+    ignore: Tuple[str, ...]
+    folders: Dict[str, _Folder] = attr.ib(factory=dict)
+    by_name: Dict[str, List[Path]] = attr.ib(factory=dict)
+    by_stem: Dict[str, List[Path]] = attr.ib(factory=dict)
+
+
+def find(folders: List[Path], file_name: str) -> List[Path]:
+    """
+    Finds the files in the quick-folders with the specified name.
+    :param folders: a list of quick-folders
+    :param file_name: the name of the file, with or without extension
+    :return: the matching files
+    """
+    matches = list()
+    for tree in _get_trees(folders):
+        matches += tree.by_name.get(file_name, list())
+        matches += tree.by_stem.get(file_name, list())
+    return matches
+
+
+def get_files(folders: List[Path]) -> List[Path]:
+    """Returns all files in the quick-folders."""
+    return [file for tree in _get_trees(folders) for files in tree.by_name.values() for file in files]
+
+
+def _get_trees(folders: List[Path]) -> List[_Tree]:
+    global _trees
+    if _trees is None:
+        _trees = _load()
+
+    recursive = bool(config.get('resources', 'recursive'))
+    ignore = tuple(config.get('resources', 'ignore') or list())
+
+    trees = list()
+    changed = False
+    for folder in folders:
+        if not folder.is_dir():
+            in_out.warn("Folder %s doesn't exist" % folder)
+            continue
+
+        tree = _trees.get(str(folder))
+        if tree is None or tree.recursive != recursive or tree.ignore != ignore:
+            tree = _Tree(recursive=recursive, ignore=ignore)
+            _trees[str(folder)] = tree
+
+        changed |= _update(tree, str(folder))
+        trees.append(tree)
+
+    if changed:
+        _save(_trees)
+    return trees
+
+
+def _update(tree: _Tree, root: str) -> bool:
+    """Lists the folders of the tree that changed since they were indexed. Returns whether anything changed."""
+    changed = False
+    visited = set()
+    pending = [root]
+    while pending:
+        folder = pending.pop()
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+            indexed = tree.folders.get(folder)
+            if indexed is None or indexed.mtime != mtime:
+                indexed = _list(folder, mtime, tree)
+                tree.folders[folder] = indexed
+                changed = True
+        except OSError:
+            continue
+
+        visited.add(folder)
+        pending += [os.path.join(folder, name) for name in indexed.folders]
+
+    for removed in set(tree.folders) - visited:
+        del tree.folders[removed]
+        changed = True
+
+    if changed:
+        _create_lookups(tree)
+    return changed
+
+
+def _list(folder: str, mtime: int, tree: _Tree) -> _Folder:
+    files = list()
+    folders = list()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if any(fnmatch(entry.name, pattern) for pattern in tree.ignore):
+                continue
+            try:
+                # symbolic links to folders aren't followed to prevent cycles
+                if entry.is_dir(follow_symlinks=False):
+                    if tree.recursive:
+                        folders.append(entry.name)
+                elif '.' in entry.name and entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+
+    racy = time.time() - mtime / 1e9 < _RACY_SECONDS
+    return _Folder(mtime=None if racy else mtime, files=sorted(files), folders=sorted(folders))
+
+
+def _create_lookups(tree: _Tree):
+    tree.by_name = dict()
+    tree.by_stem = dict()
+    for folder in sorted(tree.folders):
+        for name in tree.folders[folder].files:
+            file = Path(folder, name)
+            tree.by_name.setdefault(name, list()).append(file)
+            tree.by_stem.setdefault(file.stem, list()).append(file)
+
+
+def _load() -> Dict[str, _Tree]:
+    try:
+        with _get_index_file().open('rb') as f:
+            format_, trees = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+        return dict()
+    return trees if format_ == _FORMAT else dict()
+
+
+def _save(trees: Dict[str, _Tree]):
+    """The index is an optimization: when saving it fails the folders are simply listed again next time."""
+    try:
+        content = pickle.dumps((_FORMAT, trees), protocol=pickle.HIGHEST_PROTOCOL)
+        file_lock.replace_atomically(_get_index_file(), content)
+    except (OSError, pickle.PickleError):
+        pass
+
+
+def _get_index_file() -> Path:
+    return context().get_cache_folder().joinpath(_INDEX_FILE)
@@ -0,0 +1,58 @@
+"""
+Advisory file locks, to keep commander processes that run at the same time (in parallel CI jobs for example) from
+writing the same file at once.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_LOCK_SUFFIX = '.lock'
+
+
+@contextmanager
+def locked(file: Path):
+    """
+    Holds an exclusive lock on a file while the context is active. The lock is taken on a separate '.lock' file so
+    that the file itself can be replaced while the lock is held.
+    """
+    lock_file = file.with_name(file.name + _LOCK_SUFFIX)
+    with lock_file.open('a+b') as lock:
+        _lock(lock)
+        try:
+            yield
+        finally:
+            _unlock(lock)
+
+
+def _lock(lock):
+    if fcntl:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+    else:
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock(lock):
+    if fcntl:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    else:
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def replace_atomically(file: Path, content: bytes):
+    """Writes a file by writing a temporary file first and renaming it, so that readers never see a partial file."""
+    temp_file = file.with_name('{}.{}.tmp'.format(file.name, os.getpid()))
+    try:
+        temp_file.write_bytes(content)
+        os.replace(str(temp_file), str(file))
+    finally:
+        if temp_file.exists():
+            temp_file.unlink()
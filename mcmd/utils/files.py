@@ -5,6 +5,7 @@ from typing import List
 import mcmd.in_out.ask
 from mcmd.core.errors import McmdError
 from mcmd.in_out import in_out
+from mcmd.utils import file_index
 
 
 def get_file_name_from_path(file_path: str) -> str:
@@ -16,6 +17,20 @@ def get_file_name_from_path(file_path: str) -> str:
     return path.basename(file_path)
 
 
+def format_size(num_bytes: int) -> str:
+    """
+    format_size formats a number of bytes for humans
+    :param num_bytes: the number of bytes (i.e. 1536)
+    :return: the formatted size (i.e. 1.5 KB)
+    """
+    size = float(num_bytes)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return '{:.0f} {}'.format(size, unit) if unit == 'B' else '{:.1f} {}'.format(size, unit)
+        size /= 1024
+    return '{:.1f} TB'.format(size)
+
+
 def get_files(folders: List[Path]) -> List[Path]:
     """
     loops through specified folders and appends their files to a list
@@ -63,15 +78,15 @@ def read_file_lines(file: Path) -> List[str]:
 def select_file_from_folders(folders: List[Path], file_name: str) -> Path:
     """
     Selects a file from a list of folders. File name can be supplied with or without extension. When there are multiple
-    matches, the user will be asked to choose one.
+    matches, the user will be asked to choose one. The files are looked up in the file index (see file_index).
     :param folders: a list of folders
     :param file_name: the name of the file to get the path of, with or without extension
     :return: the selected path
 
     :exception McmdError if selected file was not found
     """
-    files = get_files(folders)
-    return select_file(files, file_name)
+    matches = file_index.find(folders, file_name)
+    return _select_match(matches, file_name)
 
 
 def select_file(files: List[Path], file_name: str) -> Path:
@@ -84,11 +99,11 @@ def select_file(files: List[Path], file_name: str) -> Path:
     :exception McmdError if selected file was not found
     """
 
-    matches = list()
-    for file in files:
-        if file_name == file.stem or file_name == file.name:
-            matches.append(file)
+    matches = [file for file in files if file_name == file.stem or file_name == file.name]
+    return _select_match(matches, file_name)
+
 
+def _select_match(matches: List[Path], file_name: str) -> Path:
     if len(matches) > 0:
         if len(matches) > 1:
             file_path = _choose_file(matches, file_name)
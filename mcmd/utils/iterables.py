@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+from mcmd.core import metrics
+
+T = TypeVar('T')
+
+_END = object()
+
+
+def chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Splits items into lists of at most 'size' items. Works on any iterable, so the items don't have to be in memory all
+    at once.
+    :param items: the items to split
+    :param size: the maximum size of a chunk
+    :return: a generator of chunks
+    """
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def prefetched(items: Iterable[T]) -> Iterator[T]:
+    """
+    Yields the items of an iterable while the next item is already being produced in another thread. Useful when
+    producing an item (like requesting a page of data) and consuming it (like writing it to a file) both take time. At
+    most two items are in memory at once.
+    :param items: the items to prefetch
+    :return: a generator of the items
+    """
+    iterator = iter(items)
+    fetch = metrics.propagate(lambda: next(iterator, _END))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch)
+        while True:
+            item = future.result()
+            if item is _END:
+                return
+            future = executor.submit(fetch)
+            yield item
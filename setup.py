@@ -22,7 +22,6 @@ setup(
         'Jinja2==3.0.3',
         'packaging==20.9',
         'parsy==1.3.0',
-        'polling==0.3.2',
         'PyGithub==1.55',
         'questionary==1.10.0',
         'rainbow_logging_handler==2.2.2',
@@ -0,0 +1,53 @@
+"""
+Micro-benchmark of the @version decorator: dispatching to a versioned implementation should cost about as much as a
+couple of plain function calls, not a sort of all registered versions.
+
+Run with: pytest -s -m benchmark tests/benchmark
+"""
+import timeit
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from mcmd.core.compatibility import version
+
+_CALLS = 100000
+
+
+@version('2.0.0')
+def dispatched(value):
+    return value
+
+
+@version('3.0.0')
+def dispatched(value):
+    return value
+
+
+@version('4.0.0')
+def dispatched(value):
+    return value
+
+
+def plain(value):
+    return value
+
+
+def _get_version_number():
+    return '3.5.0'
+
+
+@pytest.mark.benchmark
+class DispatchBenchmarkTest(unittest.TestCase):
+
+    @patch('mcmd.molgenis.version.get_version_number', _get_version_number)
+    def test_dispatch_overhead(self):
+        plain_time = min(timeit.repeat(lambda: plain(1), number=_CALLS, repeat=5))
+        dispatch_time = min(timeit.repeat(lambda: dispatched(1), number=_CALLS, repeat=5))
+
+        print('\nplain call: {:.0f} ns, dispatched call: {:.0f} ns'.format(plain_time / _CALLS * 1e9,
+                                                                         dispatch_time / _CALLS * 1e9))
+
+        # a dispatched call consists of the call itself, the version lookup and the dispatch table lookup
+        assert dispatch_time < plain_time * 10
@@ -0,0 +1,56 @@
+"""
+Compares the time it takes to parse a large script with and without the fast path for literal templates.
+
+Run with: pytest -s -m benchmark tests/benchmark
+"""
+
+import time
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from mcmd.script.model import templates
+from mcmd.script.parser import script_parser
+
+_NUM_LINES = 10000
+
+
+def _create_script():
+    lines = ["$value user_name = 'henk'", '']
+    for i in range(_NUM_LINES - len(lines)):
+        if i % 10 == 0:
+            lines.append('# step {}'.format(i))
+        elif i % 10 == 5:
+            lines.append('add group {{{{user_name}}}}_{}'.format(i))
+        else:
+            lines.append('add user user_{} --set-active'.format(i))
+    return lines
+
+
+def _clear_caches():
+    templates._parse.cache_clear()
+    templates._find_variables.cache_clear()
+    templates._compile.cache_clear()
+
+
+def _time_parse(lines) -> float:
+    _clear_caches()
+    start = time.perf_counter()
+    script_parser.parse(lines)
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark
+class ScriptParserBenchmarkTest(unittest.TestCase):
+
+    def test_parse_literal_templates(self):
+        lines = _create_script()
+
+        with patch('mcmd.script.model.templates.Template.is_literal', return_value=False):
+            without_fast_path = _time_parse(lines)
+        with_fast_path = _time_parse(lines)
+
+        print('\nParsing {} lines: {:.3f}s without and {:.3f}s with the fast path for literal templates'
+              .format(len(lines), without_fast_path, with_fast_path))
+        assert with_fast_path < without_fast_path
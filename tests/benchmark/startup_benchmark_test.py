@@ -0,0 +1,35 @@
+"""
+Measures the time it takes to start the commander and create the argument parser for a simple command.
+
+Run with: pytest -s -m benchmark tests/benchmark
+"""
+
+import subprocess
+import sys
+import unittest
+
+import pytest
+
+_STARTUP_SCRIPT = '''
+import time
+
+start = time.perf_counter()
+import mcmd.__main__
+from mcmd.args import parser
+parser._get_parser(['ping'])
+print(time.perf_counter() - start)
+'''
+
+
+@pytest.mark.benchmark
+class StartupBenchmarkTest(unittest.TestCase):
+
+    def test_startup_time(self):
+        result = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT],
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True,
+                                check=True)
+        startup_time = float(result.stdout)
+
+        print('\nStarting up for ping: {:.3f}s'.format(startup_time))
+        assert startup_time < 2
@@ -20,7 +20,7 @@ def mock_config():
 def mock_store():
     import mcmd.core.store
     # Remove the possibility for the store to save itself to disk
-    sys.modules['mcmd.core.store']._persist = lambda: None
+    sys.modules['mcmd.core.store']._persist = lambda *args: None
     # Remove the possibility for the store to load itself from disk
     sys.modules['mcmd.core.store'].load = lambda: None
 
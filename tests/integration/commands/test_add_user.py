@@ -1,3 +1,5 @@
+import tempfile
+from pathlib import Path
 from urllib.parse import urljoin
 
 import molgenis.client
@@ -105,3 +107,25 @@ def test_add_user_set_password(session):
     assert user['active'] is True
     assert user['superuser'] is False
     assert user['changePassword'] is False
+
+
+@pytest.mark.integration
+def test_add_users_from_file(session):
+    existing = random_name()
+    run_commander('add user {}'.format(existing))
+    names = [random_name() for _ in range(3)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file = Path(temp_dir).joinpath('users.csv')
+        file.write_text('username,email,superuser\n' +
+                        '\n'.join('{},{}@test.nl,false'.format(name, name) for name in names + [existing]))
+        run_commander('add users --from-file {}'.format(file))
+
+    for name in names:
+        assert _user_can_login(name, name)
+        result = session.get('sys_sec_User', q=_user_by_name_query(name))
+        assert len(result) == 1
+        assert result[0]['Email'] == '{}@test.nl'.format(name)
+
+    result = session.get('sys_sec_User', q=_user_by_name_query(existing))
+    assert result[0]['Email'] == '{}@molgenis.org'.format(existing)
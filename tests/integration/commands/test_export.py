@@ -0,0 +1,17 @@
+import csv
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tests.integration.utils import run_commander
+
+
+@pytest.mark.integration
+def test_export(session, entity_type):
+    with tempfile.TemporaryDirectory() as folder:
+        run_commander('export {} --to-folder {}'.format(entity_type, folder))
+
+        with Path(folder).joinpath(entity_type + '.csv').open(newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == len(session.get(entity_type))
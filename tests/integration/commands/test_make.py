@@ -1,3 +1,5 @@
+import tempfile
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -143,3 +145,33 @@ def test_include_group_role_explicit(session, group):
 
     role = _get_role_by_name(role_name, session)
     assert role['includes'][0]['name'] == group_role_name
+
+
+@pytest.mark.integration
+def test_make_multiple_group_members(session, group):
+    users = [random_name() for _ in range(3)]
+    for user in users:
+        run_commander('add user {}'.format(user))
+    role_name = '{}_EDITOR'.format(group)
+
+    run_commander('make {} {}'.format(' '.join(users), role_name))
+
+    for user in users:
+        memberships = _get_memberships_by_username(user, session)
+        assert len(memberships) == 1
+        assert memberships[0]['role']['name'] == role_name
+
+
+@pytest.mark.integration
+def test_make_members_from_file(session, user, group):
+    role_name = random_name()
+    run_commander('add role {}'.format(role_name))
+    group_role_name = '{}_VIEWER'.format(group)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file = Path(temp_dir).joinpath('memberships.csv')
+        file.write_text('subject,role,type\n{},{},user\n{},{},\n'.format(user, role_name, user, group_role_name))
+        run_commander('make --from-file {}'.format(file))
+
+    assert len(_get_memberships_by_user_and_role(user, role_name, session)) == 1
+    assert len(_get_memberships_by_user_and_role(user, group_role_name, session)) == 1
@@ -4,6 +4,7 @@ from unittest.mock import patch, mock_open
 
 import pytest
 
+from mcmd.core.history import HistoryEntry
 from tests.integration.loader_mock import get_files_folder
 from tests.integration.utils import run_commander, get_test_context
 
@@ -11,9 +12,9 @@ _expected_list_messages = [file for file in os.listdir(get_files_folder().joinpa
 _expected_read_messages = ['add package scripttest', 'import testAutoId_unpackaged --in scripttest',
                            'add package otherpackage']
 _history_lines = [
-    'add user henk',
-    'add group test',
-    'make henk test_viewer'
+    HistoryEntry(success=True, command='add user henk'),
+    HistoryEntry(success=True, command='add group test'),
+    HistoryEntry(success=True, command='make henk test_viewer')
 ]
 
 
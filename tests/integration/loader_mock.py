@@ -13,6 +13,9 @@ resources:
   - {dataset_folder}
   resource_folders:
   - {resource_folder}
+  recursive: false
+  ignore:
+  - .*
 host:
   selected: {url}
   auth:
@@ -22,6 +25,17 @@ host:
 settings:
   import_action: add_update_existing
   non_interactive: false
+  token_check_interval: 60
+  version_check_interval: 24
+  batch_size: 1000
+  max_parallel_imports: 4
+  update_check: false
+http:
+  pool_size: 10
+  retries: 3
+  timeout:
+    connect: 10
+    read: 300
 """
 
 _url: str = None
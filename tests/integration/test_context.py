@@ -14,6 +14,7 @@ class IntegrationTestContext(Context):
         self._TEMP_HISTORY = None
         self._TEMP_ISSUES_FOLDER = None
         self._TEMP_BACKUP_FOLDER = None
+        self._TEMP_CACHE_FOLDER = None
 
     def _raise_exception(self, msg):
         raise NotImplementedError(msg)
@@ -48,5 +49,10 @@ class IntegrationTestContext(Context):
     def get_git_folders(self) -> List[Path]:
         return [get_files_folder().joinpath('git')]
 
+    def get_cache_folder(self) -> Path:
+        if not self._TEMP_CACHE_FOLDER:
+            self._TEMP_CACHE_FOLDER = Path(tempfile.mkdtemp())
+        return self._TEMP_CACHE_FOLDER
+
     def get_storage_file(self):
         self._raise_exception("The storage file is not available from within tests")
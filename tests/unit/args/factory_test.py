@@ -0,0 +1,62 @@
+import importlib
+import subprocess
+import sys
+import unittest
+
+import pytest
+
+# noinspection PyProtectedMember
+from mcmd.args import _factory
+# noinspection PyProtectedMember
+from mcmd.commands import _manifest, _registry
+from mcmd.core.command import CommandType
+
+# Modules that a simple command like 'ping' should not need at startup
+_HEAVY_MODULES = ['github', 'jinja2', 'parsy', 'questionary', 'mcmd.commands.import_']
+
+_STARTUP_SCRIPT = '''
+import sys
+
+import mcmd.__main__
+from mcmd.args import parser
+parser._get_parser(['ping'])
+print(','.join(module for module in {} if module in sys.modules))
+'''.format(_HEAVY_MODULES)
+
+
+# noinspection PyProtectedMember
+def _get_help(parser, command):
+    subparsers = parser._subparsers._group_actions[0]
+    return [action.help for action in subparsers._choices_actions if action.dest == command][0]
+
+
+@pytest.mark.unit
+class FactoryTest(unittest.TestCase):
+
+    def test_manifest_matches_registered_commands(self):
+        for info in _manifest.get_commands():
+            importlib.import_module(info.module)
+
+        for type_ in CommandType:
+            assert _manifest.get_command_names(type_) == _registry.get_command_names(type_)
+
+    def test_manifest_matches_command_help(self):
+        for info in _manifest.get_commands():
+            parser = _factory.create_parser(info.name)
+            assert _get_help(parser, info.name) == info.get_help(), info.name
+
+    def test_find_command(self):
+        parser = _factory.create_parser()
+        assert _factory.find_command(parser, ['ping']) == 'ping'
+        assert _factory.find_command(parser, ['-v', 'add', 'user', 'bofke']) == 'add'
+        assert _factory.find_command(parser, ['--as-user', 'admin', '-p', 'secret', 'delete', 'x']) == 'delete'
+        assert _factory.find_command(parser, ['--version']) is None
+        assert _factory.find_command(parser, []) is None
+
+    def test_startup_imports_only_needed_modules(self):
+        result = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT],
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True,
+                                check=True)
+
+        assert result.stdout.strip() == ''
@@ -0,0 +1,106 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, Mock
+
+import pytest
+import requests
+
+from mcmd.core import store
+from mcmd.core.errors import McmdError
+from mcmd.molgenis import auth
+from mcmd.molgenis.request_handler import request
+
+
+class MockResponse:
+    def __init__(self, status_code, json_=None):
+        self.status_code = status_code
+        self._json = json_
+        self.headers = dict()
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        pass
+
+
+# noinspection PyUnusedLocal
+@pytest.mark.unit
+@patch('mcmd.core.store._persist', Mock())
+@patch('mcmd.config.config.url', Mock(return_value='https://molgenis.org/'))
+@patch('mcmd.config.config.get', Mock(return_value=60))
+@patch('mcmd.config.config.set_token', Mock())
+@patch('mcmd.molgenis.api.rest2', Mock(return_value='https://molgenis.org/api/v2/sys_sec_Token'))
+@patch('mcmd.molgenis.api.login', Mock(return_value='https://molgenis.org/api/v1/login/'))
+class AuthTest(unittest.TestCase):
+
+    def setUp(self):
+        auth.set_('admin', password='admin', token='token')
+        auth._validated_token = None
+        store._store['token_validity'].clear()
+
+    @patch('mcmd.molgenis.auth.get_session')
+    def test_token_validated_once(self, get_session):
+        get_session.return_value.get.return_value = MockResponse(200)
+
+        auth.check_token()
+        auth.check_token()
+
+        assert get_session.return_value.get.call_count == 1
+
+    @patch('mcmd.molgenis.auth.get_session')
+    def test_token_check_timeout(self, get_session):
+        get_session.return_value.get.side_effect = requests.exceptions.ReadTimeout('read timed out')
+
+        with pytest.raises(McmdError):
+            auth.check_token()
+
+    @patch('mcmd.molgenis.auth.get_session')
+    def test_login_timeout(self, get_session):
+        auth.set_('admin', password='admin')
+        get_session.return_value.post.side_effect = requests.exceptions.ReadTimeout('read timed out')
+
+        with pytest.raises(McmdError):
+            auth.check_token()
+
+    @patch('mcmd.molgenis.auth.get_session')
+    def test_token_validity_from_store(self, get_session):
+        store.set_token_validity('https://molgenis.org/',
+                                 store.TokenValidity(token_hash=auth._hash('token'),
+                                                     validated_at=datetime.now(),
+                                                     ttl=timedelta(minutes=60)))
+
+        auth.check_token()
+
+        assert not get_session.return_value.get.called
+
+    @patch('mcmd.molgenis.auth.get_session')
+    def test_token_validity_expired(self, get_session):
+        get_session.return_value.get.return_value = MockResponse(200)
+        store.set_token_validity('https://molgenis.org/',
+                                 store.TokenValidity(token_hash=auth._hash('token'),
+                                                     validated_at=datetime.now() - timedelta(minutes=61),
+                                                     ttl=timedelta(minutes=60)))
+
+        auth.check_token()
+
+        assert get_session.return_value.get.call_count == 1
+        assert store.get_token_validity('https://molgenis.org/').validated_at > datetime.now() - timedelta(minutes=1)
+
+    @patch('mcmd.molgenis.auth.get_session')
+    def test_request_replayed_after_unauthorized(self, get_session):
+        get_session.return_value.get.return_value = MockResponse(200)
+        get_session.return_value.post.return_value = MockResponse(200, {'token': 'new_token'})
+        responses = [MockResponse(401), MockResponse(200)]
+        used_tokens = list()
+
+        @request
+        def do_request():
+            used_tokens.append(auth.get_token())
+            return responses.pop(0)
+
+        response = do_request()
+
+        assert response.status_code == 200
+        assert used_tokens == ['token', 'new_token']
+        assert get_session.return_value.post.call_count == 1
@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.core.errors import McmdError
+from mcmd.molgenis import import_runs
+from mcmd.molgenis.import_runs import ImportRunTracker
+
+_URL = 'https://molgenis.org/api/v2/sys_ImportRun/'
+
+
+def _response(status, progress=None, message=None):
+    return Mock(json=Mock(return_value={'status': status, 'progress': progress, 'message': message}))
+
+
+@pytest.mark.unit
+@patch('mcmd.molgenis.import_runs.random.uniform', Mock(return_value=1))
+class ImportRunTrackerTest(unittest.TestCase):
+
+    @patch('mcmd.molgenis.import_runs.time.sleep')
+    @patch('mcmd.molgenis.import_runs.get')
+    def test_final_status_from_last_poll(self, get, sleep):
+        get.side_effect = [_response('RUNNING', 0), _response('FINISHED', 2, 'done')]
+
+        import_run = import_runs.wait_for(_URL + 'abc')
+
+        assert get.call_count == 2
+        assert import_run == import_runs.ImportRun(id='abc', url=_URL + 'abc', status='FINISHED', message='done',
+                                                   progress=2)
+        sleep.assert_called_once_with(0.5)
+
+    @patch('mcmd.molgenis.import_runs.get')
+    def test_backoff_without_progress(self, get):
+        get.return_value = _response('RUNNING', 1)
+        tracker = ImportRunTracker()
+        tracker.track(_URL + 'abc')
+
+        delays = list()
+        for _ in range(12):
+            tracker.poll()
+            delays.append(tracker.next_delay())
+
+        assert delays[0] == 0.5
+        assert delays[1] == 0.75
+        assert delays == sorted(delays)
+        assert delays[-1] == 10
+
+    @patch('mcmd.molgenis.import_runs.get')
+    def test_backoff_reset_on_progress(self, get):
+        get.side_effect = [_response('RUNNING', 1), _response('RUNNING', 1), _response('RUNNING', 1),
+                           _response('RUNNING', 2)]
+        tracker = ImportRunTracker()
+        tracker.track(_URL + 'abc')
+
+        for _ in range(3):
+            tracker.poll()
+        assert tracker.next_delay() > 0.5
+
+        tracker.poll()
+        assert tracker.next_delay() == 0.5
+
+    @patch('mcmd.molgenis.import_runs.get')
+    def test_polls_all_runs_together(self, get):
+        get.side_effect = lambda url: _response('FINISHED' if url.endswith('a') else 'RUNNING')
+        tracker = ImportRunTracker()
+        tracker.track(_URL + 'a')
+        tracker.track(_URL + 'b')
+
+        done = tracker.poll()
+
+        assert [run.id for run in done] == ['a']
+        assert tracker.get_outstanding() == ['b']
+
+    @patch('mcmd.molgenis.import_runs.time.sleep', Mock())
+    @patch('mcmd.molgenis.import_runs.time.monotonic')
+    @patch('mcmd.molgenis.import_runs.get')
+    def test_timeout(self, get, monotonic):
+        get.return_value = _response('RUNNING')
+        monotonic.side_effect = [0, 5, 5, 11]
+
+        with pytest.raises(McmdError) as e:
+            import_runs.wait_for(_URL + 'abc', timeout=10)
+
+        assert 'mcmd import --status abc' in e.value.info
@@ -0,0 +1,105 @@
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+from email.parser import BytesParser
+
+import pytest
+from requests import Request
+
+from mcmd.core.errors import McmdError
+from mcmd.molgenis import multipart
+
+
+def _parse(body: bytes, content_type: str) -> dict:
+    message = BytesParser().parsebytes('Content-Type: {}\r\n\r\n'.format(content_type).encode() + body)
+    part = message.get_payload()[0]
+    return {'filename': part.get_filename(), 'content': part.get_payload(decode=True)}
+
+
+@pytest.mark.unit
+class MultipartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.content = os.urandom(300 * 1024)
+        self.file = tempfile.NamedTemporaryFile(suffix='.vcf', delete=False)
+        self.file.write(self.content)
+        self.file.close()
+
+    def tearDown(self):
+        os.remove(self.file.name)
+
+    def test_encoder(self):
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf')
+            data = body.read()
+
+        assert len(data) == len(body)
+        assert _parse(data, body.content_type) == {'filename': 'test.vcf', 'content': self.content}
+
+    def test_encoder_reads_in_chunks(self):
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf')
+            chunks = iter(lambda: body.read(8192), b'')
+            sizes = [len(chunk) for chunk in chunks]
+
+        assert max(sizes) == 8192
+        assert sum(sizes) == len(body)
+
+    def test_encoder_rewind(self):
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf')
+            first = body.read()
+            body.seek(0)
+            second = body.read()
+
+        assert first == second
+        assert body.tell() == len(body)
+
+    def test_encoder_content_length(self):
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf')
+            prepared = Request('POST', 'https://molgenis.org', data=body,
+                               headers={'Content-Type': body.content_type}).prepare()
+
+        assert prepared.headers['Content-Length'] == str(len(body))
+        assert prepared.body is body
+
+    def test_progress(self):
+        reports = list()
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf',
+                                    progress=lambda sent, total: reports.append((sent, total)))
+            body.read()
+
+        assert reports[-1] == (len(self.content), len(self.content))
+
+    def test_gzip_stream(self):
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf', compress=True)
+            data = b''.join(body)
+
+        parsed = _parse(data, body.content_type)
+        assert parsed['filename'] == 'test.vcf.gz'
+        assert gzip.decompress(parsed['content']) == self.content
+
+    def test_cancel_encoder(self):
+        cancel = threading.Event()
+        with open(self.file.name, 'rb') as file:
+            body = multipart.encode(file, field='file', file_name='test.vcf', cancel=cancel)
+            body.read(8192)
+            cancel.set()
+
+            with pytest.raises(McmdError):
+                body.read(8192)
+
+    def test_cancel_stream(self):
+        cancel = threading.Event()
+        with open(self.file.name, 'rb') as file:
+            chunks = iter(multipart.encode(file, field='file', file_name='test.vcf', compress=True, cancel=cancel))
+            next(chunks)
+            cancel.set()
+
+            with pytest.raises(McmdError):
+                list(chunks)
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from mcmd.molgenis import package_tree
+from mcmd.molgenis.package_tree import PackageTree
+
+# package 'root' contains 'sub', which contains 'subsub'
+_PACKAGES = [{'id': 'sub', 'parent': 'root'},
+             {'id': 'subsub', 'parent': 'sub'},
+             {'id': 'other', 'parent': 'elsewhere'}]
+
+_ENTITY_TYPES = [{'id': 'root_Abstract', 'package': 'root'},
+                 {'id': 'root_Person', 'package': 'root', 'extends': {'id': 'root_Abstract'},
+                  'attributes': [{'refEntityType': {'id': 'sub_Country'}}, {'refEntityType': None}, {}]},
+                 {'id': 'sub_Country', 'package': 'sub',
+                  'attributes': [{'refEntityType': {'id': 'sys_sec_User'}}]},
+                 {'id': 'subsub_Sample', 'package': 'subsub',
+                  'attributes': [{'refEntityType': {'id': 'subsub_Sample'}}]},
+                 {'id': 'other_Thing', 'package': 'other'}]
+
+
+def _get_rows_in(entity_type_id, attribute, values, attrs=None):
+    rows = _PACKAGES if entity_type_id == 'sys_md_Package' else _ENTITY_TYPES
+    return [row for row in rows if row[attribute] in values]
+
+
+@pytest.mark.unit
+class PackageTreeTest(unittest.TestCase):
+
+    @patch('mcmd.molgenis.data.get_rows_in', side_effect=_get_rows_in)
+    def test_read(self, get_rows_in):
+        tree = package_tree.read('root')
+
+        assert tree.package_levels == [['sub'], ['subsub']]
+        assert tree.entity_types == {'root_Abstract': set(),
+                                     'root_Person': {'root_Abstract', 'sub_Country'},
+                                     'sub_Country': set(),
+                                     'subsub_Sample': {'subsub_Sample'}}
+        assert tree.size() == 6
+
+    def test_waves(self):
+        waves = package_tree.get_waves({'a': {'b'},
+                                        'b': {'c'},
+                                        'c': set(),
+                                        'd': {'d'}})
+
+        assert waves == [[['a', 'd']], [['b']], [['c']]]
+
+    def test_waves_with_cycle(self):
+        waves = package_tree.get_waves({'a': {'b'},
+                                        'b': {'a', 'c'},
+                                        'c': set(),
+                                        'd': {'a'}})
+
+        assert waves == [[['d']], [['a', 'b']], [['c']]]
+
+    def test_waves_with_several_cycles(self):
+        waves = package_tree.get_waves({'a': {'b', 'e'},
+                                        'b': {'a'},
+                                        'c': {'d'},
+                                        'd': {'c', 'e'},
+                                        'e': {'f'},
+                                        'f': {'e', 'g'},
+                                        'g': set()})
+
+        assert waves == [[['a', 'b'], ['c', 'd']], [['e', 'f']], [['g']]]
+
+    @patch('mcmd.molgenis.package_tree._IDS_PER_REQUEST', 2)
+    def test_waves_are_chunked(self):
+        waves = package_tree.get_waves({name: set() for name in 'abcde'})
+
+        assert waves == [[['a', 'b'], ['c', 'd'], ['e']]]
+
+    @patch('mcmd.molgenis.data.delete_rows')
+    @patch('mcmd.molgenis.package_tree.read')
+    def test_delete_contents(self, read, delete_rows):
+        read.return_value = PackageTree(package_levels=[['sub'], ['subsub']],
+                                        entity_types={'root_Abstract': set(),
+                                                      'root_Person': {'root_Abstract'}})
+        progress = list()
+
+        result = package_tree.delete_contents('root', progress=lambda deleted, total: progress.append((deleted, total)))
+
+        assert [call[0] for call in delete_rows.call_args_list] == [('sys_md_EntityType', ['root_Person']),
+                                                                   ('sys_md_EntityType', ['root_Abstract']),
+                                                                   ('sys_md_Package', ['subsub']),
+                                                                   ('sys_md_Package', ['sub'])]
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        assert result.entity_types == 2
+        assert result.packages == 2
+
+    @patch('mcmd.molgenis.data.delete_rows', side_effect=ValueError('failed'))
+    @patch('mcmd.molgenis.package_tree.read')
+    def test_delete_stops_after_failure(self, read, delete_rows):
+        read.return_value = PackageTree(package_levels=[['sub']], entity_types={'a': {'b'}, 'b': set()})
+
+        with pytest.raises(ValueError):
+            package_tree.delete_contents('root')
+
+        delete_rows.assert_called_once_with('sys_md_EntityType', ['a'])
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.molgenis.principals import PrincipalType
+from mcmd.molgenis.security import permissions_api
+from mcmd.molgenis.security.permission import Permission
+
+
+def _objects_response(objects, page_number=1, total_pages=1):
+    response = Mock()
+    response.json.return_value = {'data': {'objects': objects},
+                                  'page': {'number': page_number, 'totalPages': total_pages}}
+    return response
+
+
+# noinspection PyUnusedLocal
+@pytest.mark.unit
+@patch('mcmd.molgenis.api.permissions', Mock(return_value='https://molgenis.org/api/permissions/'))
+@patch('mcmd.molgenis.security.permissions_api.to_role_name', lambda name: name)
+@patch('mcmd.config.config.get', Mock(return_value=2))
+@patch('mcmd.molgenis.security.permissions_api.delete')
+@patch('mcmd.molgenis.security.permissions_api.patch')
+@patch('mcmd.molgenis.security.permissions_api.post')
+@patch('mcmd.molgenis.security.permissions_api.get')
+class PermissionsApiTest(unittest.TestCase):
+
+    def test_grant_row_permissions_diff(self, get, post, patch_, delete):
+        get.side_effect = [
+            _objects_response([{'id': '1', 'permissions': [{'user': 'henk', 'permission': 'READ'}]},
+                               {'id': '2', 'permissions': [{'user': 'henk', 'permission': 'WRITE'}]}],
+                              page_number=1, total_pages=2),
+            _objects_response([{'id': 'not_wanted', 'permissions': [{'user': 'henk', 'permission': 'READ'}]}],
+                              page_number=2, total_pages=2)
+        ]
+        entity_ids = [str(i) for i in range(1, 12)]
+
+        changes = permissions_api.grant_row_permissions([(PrincipalType.USER, 'henk')], 'biobanks', entity_ids,
+                                                        Permission.WRITE)
+
+        assert get.call_count == 2
+        assert get.call_args[1]['params'] == {'q': 'user=in=(henk)', 'page': 2, 'pageSize': 1000}
+
+        # ten additions in chunks of two rows
+        assert post.call_count == 5
+        assert post.call_args_list[0][1]['data'] == {
+            'objects': [{'objectId': '3', 'permissions': [{'user': 'henk', 'permission': 'WRITE'}]},
+                        {'objectId': '4', 'permissions': [{'user': 'henk', 'permission': 'WRITE'}]}]}
+
+        patch_.assert_called_once_with('https://molgenis.org/api/permissions/entity-biobanks',
+                                       data={'objects': [{'objectId': '1',
+                                                          'permissions': [{'user': 'henk',
+                                                                           'permission': 'WRITE'}]}]})
+        assert not delete.called
+        assert changes == permissions_api.PermissionChanges(added=9, updated=1, removed=0, unchanged=1)
+
+    def test_grant_row_permissions_none(self, get, post, patch_, delete):
+        get.return_value.json.return_value = {'data': {'permissions': [{'role': 'EDITOR', 'permission': 'READ'}]}}
+
+        changes = permissions_api.grant_row_permissions([(PrincipalType.ROLE, 'EDITOR')], 'biobanks', ['1'],
+                                                        Permission.NONE)
+
+        delete.assert_called_once_with('https://molgenis.org/api/permissions/entity-biobanks/1',
+                                       data={'role': 'EDITOR'})
+        assert not post.called
+        assert not patch_.called
+        assert changes == permissions_api.PermissionChanges(removed=1)
@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.core.errors import McmdError
+from mcmd.molgenis import resources
+from mcmd.molgenis.resources import ResourceType
+from mcmd.molgenis.session import PooledSession
+
+
+def _get_pages(existing):
+    def get_pages(entity_type_id, attrs, query):
+        ids = query.split('=in=(')[1].rstrip(')').split(',')
+        return iter([{'items': [{attrs: id_} for id_ in ids if id_ in existing.get(entity_type_id, [])]}])
+
+    return get_pages
+
+
+_EXISTING = {'sys_md_EntityType': ['it_emx_Entity', 'shared'],
+             'sys_md_Package': ['it_emx', 'shared'],
+             'sys_Plugin': ['plugin']}
+
+
+# noinspection PyUnusedLocal
+@pytest.mark.unit
+@patch('mcmd.config.config.get', Mock(side_effect=lambda *keys: 'https://molgenis.org/' if keys[0] == 'host' else 4))
+class ResourcesTest(unittest.TestCase):
+
+    def setUp(self):
+        resources.clear_cache()
+
+    @patch('mcmd.molgenis.data.get_pages', side_effect=_get_pages(_EXISTING))
+    def test_one_query_per_type(self, get_pages):
+        types = [ResourceType.ENTITY_TYPE, ResourceType.PACKAGE, ResourceType.PLUGIN]
+
+        found = resources.resolve_resources(['it_emx_Entity', 'it_emx', 'plugin', 'unknown'], types)
+
+        assert get_pages.call_count == 3
+        assert found == {'it_emx_Entity': [ResourceType.ENTITY_TYPE],
+                         'it_emx': [ResourceType.PACKAGE],
+                         'plugin': [ResourceType.PLUGIN],
+                         'unknown': []}
+
+    @patch('mcmd.molgenis.data.get_pages', side_effect=_get_pages(_EXISTING))
+    def test_cached(self, get_pages):
+        resources.ensure_resource_exists('it_emx_Entity', ResourceType.ENTITY_TYPE)
+        resources.ensure_resource_exists('it_emx_Entity', ResourceType.ENTITY_TYPE)
+        assert not resources.resource_exists('unknown', ResourceType.ENTITY_TYPE)
+        assert not resources.resource_exists('unknown', ResourceType.ENTITY_TYPE)
+
+        assert get_pages.call_count == 2
+
+    @patch('mcmd.molgenis.data.get_pages', side_effect=_get_pages(_EXISTING))
+    def test_cache_invalidated_by_write(self, get_pages):
+        resources.ensure_resource_exists('it_emx_Entity', ResourceType.ENTITY_TYPE)
+
+        with patch('requests.Session.request'):
+            PooledSession(timeout=(1, 1)).request('DELETE', 'https://molgenis.org/api/v2/sys_md_EntityType')
+        resources.ensure_resource_exists('it_emx_Entity', ResourceType.ENTITY_TYPE)
+
+        assert get_pages.call_count == 2
+
+    @patch('mcmd.molgenis.data.get_pages', side_effect=_get_pages(_EXISTING))
+    def test_cache_not_invalidated_by_read(self, get_pages):
+        resources.ensure_resource_exists('it_emx_Entity', ResourceType.ENTITY_TYPE)
+
+        with patch('requests.Session.request'):
+            PooledSession(timeout=(1, 1)).request('GET', 'https://molgenis.org/api/v2/sys_md_EntityType')
+        resources.ensure_resource_exists('it_emx_Entity', ResourceType.ENTITY_TYPE)
+
+        assert get_pages.call_count == 1
+
+    @patch('mcmd.molgenis.data.get_pages', side_effect=_get_pages(_EXISTING))
+    def test_detect_resource_types(self, get_pages):
+        types = [ResourceType.ENTITY_TYPE, ResourceType.PACKAGE]
+
+        with patch('mcmd.molgenis.resources.multi_choice', return_value='Package') as multi_choice:
+            detected = resources.detect_resource_types(['it_emx_Entity', 'shared'], types)
+
+        assert detected == {'it_emx_Entity': ResourceType.ENTITY_TYPE, 'shared': ResourceType.PACKAGE}
+        multi_choice.assert_called_once()
+
+    @patch('mcmd.molgenis.data.get_pages', side_effect=_get_pages(_EXISTING))
+    def test_detect_resource_type_not_found(self, get_pages):
+        with pytest.raises(McmdError):
+            resources.detect_resource_type('unknown', [ResourceType.ENTITY_TYPE, ResourceType.PACKAGE])
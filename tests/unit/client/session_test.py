@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from mcmd.molgenis import session
+
+_HTTP_CONFIG = {
+    'pool_size': 4,
+    'retries': 2,
+    'timeout': {
+        'connect': 5,
+        'read': 60
+    }
+}
+
+
+def _get_config(*args):
+    prop = {'http': _HTTP_CONFIG}
+    for at in args:
+        prop = prop[at]
+    return prop
+
+
+@pytest.mark.unit
+@patch('mcmd.config.config.get', side_effect=_get_config)
+class SessionTest(unittest.TestCase):
+
+    def tearDown(self):
+        session.close_sessions()
+
+    def test_same_host_shares_session(self, get_config):
+        first = session.get_session('https://molgenis.org/api/v2/sys_sec_User')
+        second = session.get_session('https://molgenis.org/api/v1/login/')
+        assert first is second
+
+    def test_different_hosts_have_own_session(self, get_config):
+        first = session.get_session('https://molgenis.org/api/v2/sys_sec_User')
+        second = session.get_session('https://other.molgenis.org/api/v2/sys_sec_User')
+        assert first is not second
+
+    def test_session_configuration(self, get_config):
+        pooled = session.get_session('https://molgenis.org/')
+        adapter = pooled.get_adapter('https://molgenis.org/')
+
+        assert pooled.timeout == (5, 60)
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 2
+
+    @patch('requests.Session.request')
+    def test_default_timeout(self, request, get_config):
+        pooled = session.get_session('https://molgenis.org/')
+
+        pooled.get('https://molgenis.org/api/v2/version')
+        assert request.call_args[1]['timeout'] == (5, 60)
+
+        pooled.get('https://molgenis.org/api/v2/version', timeout=1)
+        assert request.call_args[1]['timeout'] == 1
+
+    @patch('requests.Session.request')
+    def test_write_notifies_listeners(self, request, get_config):
+        hosts = list()
+        with patch('mcmd.molgenis.session._write_listeners', [hosts.append]):
+            pooled = session.get_session('https://molgenis.org/')
+            pooled.get('https://molgenis.org/api/v2/sys_sec_User')
+            pooled.post('https://molgenis.org/api/v2/sys_sec_User', json={})
+            pooled.delete('https://molgenis.org/api/v2/sys_sec_User/henk')
+
+        assert hosts == ['https://molgenis.org', 'https://molgenis.org']
+
+    @patch('requests.Session.request')
+    def test_login_does_not_notify_listeners(self, request, get_config):
+        hosts = list()
+        with patch('mcmd.molgenis.session._write_listeners', [hosts.append]):
+            pooled = session.get_session('https://molgenis.org/')
+            pooled.post('https://molgenis.org/api/v1/login/', data='{}')
+            pooled.post('https://molgenis.org/menu/api/v1/logout', data='{}')
+
+        assert hosts == []
@@ -0,0 +1,85 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.commands import add
+from mcmd.core.errors import McmdError
+from mcmd.molgenis.resources import ResourceType
+
+
+def _read_users(content: str):
+    return list(add._read_users(io.StringIO(content)))
+
+
+def _resolve(usernames, types):
+    assert types == [ResourceType.USER]
+    return {username: [ResourceType.USER] if username == 'piet' else [] for username in usernames}
+
+
+@pytest.mark.unit
+class AddUsersTest(unittest.TestCase):
+
+    def test_read_users(self):
+        users = _read_users('username,email,active,superuser,password,change_password\n'
+                            'henk,henk@example.org,false,yes,secret,true\n'
+                            'klaas,,,,,\n')
+
+        assert users == [
+            {'username': 'henk', 'password_': 'secret', 'changePassword': True, 'Email': 'henk@example.org',
+             'active': False, 'superuser': True},
+            {'username': 'klaas', 'password_': 'klaas', 'changePassword': False, 'Email': 'klaas@molgenis.org',
+             'active': True, 'superuser': False}]
+
+    def test_missing_username_column(self):
+        with pytest.raises(McmdError):
+            _read_users('name\nhenk\n')
+
+    def test_missing_username(self):
+        with pytest.raises(McmdError) as e:
+            _read_users('username,email\n,henk@example.org\n')
+        assert 'line 2' in str(e.value)
+
+    def test_duplicate_username(self):
+        with pytest.raises(McmdError) as e:
+            _read_users('username\nhenk\nklaas\njan\nhenk\n')
+        assert 'line 5' in str(e.value)
+
+    def test_invalid_boolean(self):
+        with pytest.raises(McmdError):
+            _read_users('username,active\nhenk,maybe\n')
+
+    @patch('mcmd.commands.add.resolve_resources', side_effect=_resolve)
+    @patch('mcmd.commands.add.data.add_rows')
+    def test_add_users_chunk(self, add_rows, resolve_resources):
+        result = add._add_users_chunk([{'username': 'henk'}, {'username': 'piet'}])
+
+        assert result == (1, 1)
+        add_rows.assert_called_once_with('sys_sec_User', [{'username': 'henk'}])
+
+    @patch('mcmd.commands.add.resolve_resources', side_effect=_resolve)
+    @patch('mcmd.commands.add.data.add_rows')
+    def test_add_users_chunk_all_exist(self, add_rows, resolve_resources):
+        assert add._add_users_chunk([{'username': 'piet'}]) == (0, 1)
+        assert not add_rows.called
+
+    @patch('mcmd.commands.add.config.get', Mock(return_value=2))
+    @patch('mcmd.commands.add.resolve_resources', side_effect=_resolve)
+    @patch('mcmd.commands.add.data.add_rows')
+    def test_add_users_from_file_in_chunks(self, add_rows, resolve_resources):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath('users.csv')
+            file.write_text('username\n' + '\n'.join(['henk', 'piet', 'klaas', 'jan', 'kees']) + '\n')
+
+            assert add._add_users_from_file(file) == (4, 1)
+
+        chunks = [call[0][1] for call in add_rows.call_args_list]
+        assert sorted(user['username'] for chunk in chunks for user in chunk) == ['henk', 'jan', 'kees', 'klaas']
+        assert all(len(chunk) <= 2 for chunk in chunks)
+
+    def test_add_users_from_missing_file(self):
+        with pytest.raises(McmdError):
+            add._add_users_from_file(Path('missing.csv'))
@@ -0,0 +1,106 @@
+import gzip
+import json
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.commands import export
+# noinspection PyProtectedMember
+from mcmd.commands.export import _Format, _Progress
+from mcmd.core.errors import McmdError
+
+_META = {'idAttribute': 'id',
+         'attributes': [{'name': 'id', 'fieldType': 'STRING'},
+                        {'name': 'info', 'fieldType': 'COMPOUND', 'attributes': [
+                            {'name': 'name', 'fieldType': 'STRING'},
+                            {'name': 'active', 'fieldType': 'BOOL'}]},
+                        {'name': 'country', 'fieldType': 'XREF', 'refEntity': {'idAttribute': 'code'}},
+                        {'name': 'tags', 'fieldType': 'MREF'}]}
+
+
+def _pages(entity_type_id, attrs=None, query=None, page_size=None):
+    """Fakes two pages of rows."""
+    items = [{'_href': '/api/v2/Person/1', 'id': '1', 'name': 'Henk', 'active': True,
+              'country': {'_href': '/api/v2/Country/NL', 'code': 'NL', 'label': 'Netherlands'},
+              'tags': [{'_href': '/api/v2/Tag/a', 'id': 'a'}, {'_href': '/api/v2/Tag/b', 'id': 'b'}]},
+             {'_href': '/api/v2/Person/2', 'id': '2', 'name': 'Piet, Jr.', 'active': False, 'country': None,
+              'tags': []}]
+    yield {'meta': _META, 'total': 2, 'items': items[:1]}
+    yield {'meta': _META, 'total': 2, 'items': items[1:]}
+
+
+def _args(**kwargs):
+    args = {'attrs': None, 'query': None, 'page_size': 100, 'gzip': False, 'parallel': 4}
+    args.update(kwargs)
+    return Namespace(**args)
+
+
+@pytest.mark.unit
+@patch('mcmd.in_out.in_out.start', Mock())
+@patch('mcmd.in_out.in_out.update', Mock())
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @patch('mcmd.commands.export.data.get_pages', side_effect=_pages)
+    def test_csv(self, get_pages):
+        file = self.folder.joinpath('Person.csv')
+        progress = _Progress('Exporting')
+
+        export._export('Person', file, _Format.CSV, _args(query='name==Henk', attrs='id,name'), progress)
+
+        get_pages.assert_called_once_with('Person', attrs='id,name', query='name==Henk', page_size=100)
+        assert file.read_bytes() == (b'id,name,active,country,tags\r\n'
+                                     b'1,Henk,true,NL,"a,b"\r\n'
+                                     b'2,"Piet, Jr.",false,,\r\n')
+        assert not self.folder.joinpath('Person.csv.part').exists()
+        assert (progress.exported, progress.total) == (2, 2)
+
+    @patch('mcmd.commands.export.data.get_pages', side_effect=_pages)
+    def test_tsv_gzip(self, get_pages):
+        file = self.folder.joinpath('Person.tsv.gz')
+
+        export._export('Person', file, _Format.TSV, _args(gzip=True), _Progress('Exporting'))
+
+        with gzip.open(str(file), 'rt') as f:
+            assert f.read().splitlines()[1] == '1\tHenk\ttrue\tNL\ta,b'
+
+    @patch('mcmd.commands.export.data.get_pages', side_effect=_pages)
+    def test_jsonl_multiple_entity_types(self, get_pages):
+        files = export._export_entity_types(['Person', 'Employee'], self.folder, _Format.JSONL, _args())
+
+        assert files == [self.folder.joinpath('Person.jsonl'), self.folder.joinpath('Employee.jsonl')]
+        for file in files:
+            lines = file.read_text().splitlines()
+            assert len(lines) == 2
+            assert json.loads(lines[0])['country'] == {'code': 'NL', 'label': 'Netherlands'}
+
+    def test_failed_export_leaves_no_file(self):
+        def failing_pages(*args, **kwargs):
+            yield from list(_pages(*args, **kwargs))[:1]
+            raise McmdError('connection lost')
+
+        with patch('mcmd.commands.export.data.get_pages', side_effect=failing_pages):
+            with pytest.raises(McmdError):
+                export._export('Person', self.folder.joinpath('Person.csv'), _Format.CSV, _args(),
+                               _Progress('Exporting'))
+
+        assert list(self.folder.iterdir()) == []
+
+    def test_missing_folder(self):
+        with pytest.raises(McmdError):
+            export._export_entity_types(['Person'], self.folder.joinpath('missing'), _Format.CSV, _args())
+
+    @patch('mcmd.commands.export._p_export', Mock(error=Mock(side_effect=SystemExit(2))))
+    def test_invalid_page_size(self):
+        with pytest.raises(SystemExit):
+            export._validate_args(_args(page_size=0))
@@ -0,0 +1,24 @@
+import unittest
+from datetime import datetime, timedelta
+
+import pytest
+
+# noinspection PyProtectedMember
+from mcmd.commands.history import _parse_since
+from mcmd.core.errors import McmdError
+
+
+@pytest.mark.unit
+class HistoryCommandTest(unittest.TestCase):
+
+    def test_parse_since_date(self):
+        assert _parse_since('2020-01-31') == datetime(2020, 1, 31)
+        assert _parse_since('2020-01-31T14:30') == datetime(2020, 1, 31, 14, 30)
+
+    def test_parse_since_period(self):
+        since = _parse_since('12h')
+        assert datetime.now() - timedelta(hours=12, seconds=5) < since <= datetime.now() - timedelta(hours=12)
+
+    def test_parse_since_invalid(self):
+        with pytest.raises(McmdError):
+            _parse_since('yesterday')
@@ -1,9 +1,17 @@
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from argparse import Namespace
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch, Mock
 
 import pytest
 
 from mcmd.commands import import_
+from mcmd.core import metrics
+from mcmd.core.errors import McmdError
 from mcmd.github.client import Attachment
 
 
@@ -31,3 +39,154 @@ class ImportMethodsTest(unittest.TestCase):
         a3 = Attachment('url/1234/other_file.xlsx')
         ret = import_._create_attachment_map([a1, a2, a3])
         self.assertEqual(ret, {'1234/file.xlsx': a1, '4567/file.xlsx': a2, 'other_file.xlsx': a3})
+
+
+def _args(**kwargs):
+    args = {'to_package': None, 'entity_type_id': None, 'import_action': 'add', 'gzip': False}
+    args.update(kwargs)
+    return Namespace(**args)
+
+
+class _ImportRuns:
+    """Fakes the import runs on the server: every run finishes after being polled a number of times."""
+
+    def __init__(self, failing=(), polls=1):
+        self.failing = failing
+        self.polls = polls
+        self.polled = Counter()
+        self.started = list()
+
+    def start(self, import_, cancel=None):
+        self.started.append(import_.name)
+        return 'https://molgenis.org/api/v2/sys_ImportRun/' + import_.name
+
+    def get(self, url):
+        name = url.split('/')[-1]
+        self.polled[name] += 1
+        if self.polled[name] < self.polls:
+            status = 'RUNNING'
+        else:
+            status = 'FAILED' if name in self.failing else 'FINISHED'
+        return Mock(json=Mock(return_value={'status': status, 'message': status.lower()}))
+
+
+# noinspection PyUnusedLocal
+@pytest.mark.unit
+@patch('mcmd.in_out.in_out.start', Mock())
+@patch('mcmd.in_out.in_out.update', Mock())
+@patch('mcmd.in_out.in_out.succeed', Mock())
+@patch('mcmd.in_out.in_out.error', Mock())
+@patch('mcmd.commands.import_._print_status_table', Mock())
+@patch('mcmd.commands.import_.time.sleep', Mock())
+@patch('mcmd.molgenis.import_runs.random.uniform', Mock(return_value=0))
+class ImportPipelineTest(unittest.TestCase):
+
+    def test_manifest(self):
+        with tempfile.TemporaryDirectory() as folder:
+            folder = Path(folder)
+            for name in ['base.xlsx', 'a.csv', 'b.csv']:
+                folder.joinpath(name).touch()
+            manifest = folder.joinpath('manifest.yaml')
+            manifest.write_text('imports:\n'
+                                '  - file: base.xlsx\n'
+                                '  - file: "*.csv"\n'
+                                '    in: base\n'
+                                '    after: base\n')
+
+            imports = import_._import_from_manifest(_args(manifest=str(manifest)))
+
+        assert [i.name for i in imports] == ['base.xlsx', 'a.csv', 'b.csv']
+        assert imports[1].after == ['base']
+        assert imports[1].params == {'action': 'add', 'metadataAction': 'upsert', 'packageId': 'base'}
+        assert 'packageId' not in imports[0].params
+
+    def test_dependency_cycle(self):
+        imports = [import_._Import(name='a.xlsx', after=['b']),
+                   import_._Import(name='b.xlsx', after=['a'])]
+
+        with pytest.raises(McmdError):
+            import_._validate_dependencies(imports, wait=True)
+
+    def test_unknown_dependency(self):
+        with pytest.raises(McmdError):
+            import_._validate_dependencies([import_._Import(name='a.xlsx', after=['unknown'])], wait=True)
+
+    def test_pipeline_respects_dependencies(self):
+        runs = _ImportRuns()
+        imports = [import_._Import(name='data.csv', after=['base.xlsx']),
+                   import_._Import(name='base.xlsx'),
+                   import_._Import(name='other.csv')]
+
+        with patch('mcmd.commands.import_._start_import', side_effect=runs.start), \
+                patch('mcmd.molgenis.import_runs.get', side_effect=runs.get):
+            import_._run_import_pipeline(imports, parallel=2, timeout=None, wait=True)
+
+        assert runs.started.index('base.xlsx') < runs.started.index('data.csv')
+        assert all(i.status == import_._Status.FINISHED for i in imports)
+
+    def test_pipeline_skips_dependents_of_failed_imports(self):
+        runs = _ImportRuns(failing=['base.xlsx'])
+        imports = [import_._Import(name='base.xlsx'),
+                   import_._Import(name='data.csv', after=['base']),
+                   import_._Import(name='other.csv')]
+
+        with patch('mcmd.commands.import_._start_import', side_effect=runs.start), \
+                patch('mcmd.molgenis.import_runs.get', side_effect=runs.get):
+            with pytest.raises(McmdError) as e:
+                import_._run_import_pipeline(imports, parallel=4, timeout=None, wait=True)
+
+        assert e.value.message == '2 of 3 imports did not succeed'
+        assert [i.status for i in imports] == [import_._Status.FAILED, import_._Status.SKIPPED,
+                                               import_._Status.FINISHED]
+        assert 'data.csv' not in runs.started
+
+    @patch('mcmd.core.metrics._enabled', True)
+    @patch('mcmd.core.metrics._events', [])
+    def test_pipeline_records_waiting_for_runs_only(self):
+        runs = _ImportRuns(polls=2)
+        imports = [import_._Import(name='a.csv')]
+
+        def slow_start(import_to_start, cancel=None):
+            threading.Event().wait(0.3)
+            return runs.start(import_to_start)
+
+        with patch('mcmd.commands.import_._start_import', side_effect=slow_start), \
+                patch('mcmd.molgenis.import_runs.get', side_effect=runs.get), \
+                patch('mcmd.molgenis.import_runs.ImportRunTracker.next_delay', return_value=1):
+            import_._run_import_pipeline(imports, parallel=2, timeout=None, wait=True)
+
+        waits = [event for event in metrics.get_events() if event.category == metrics.WAIT]
+        assert waits
+        assert sum(event.duration for event in waits) < 0.3
+
+    def test_pipeline_timeout_cancels_uploads(self):
+        cancelled = list()
+        stopped = threading.Event()
+
+        def slow_start(import_to_start, cancel=None):
+            cancelled.append(cancel.wait(10))
+            stopped.set()
+            raise McmdError('The upload of {} was cancelled'.format(import_to_start.name))
+
+        imports = [import_._Import(name='large.vcf')]
+        start = time.monotonic()
+        with patch('mcmd.commands.import_._start_import', side_effect=slow_start):
+            with pytest.raises(McmdError):
+                import_._run_import_pipeline(imports, parallel=2, timeout=0.2, wait=True)
+
+        assert time.monotonic() - start < 5
+        assert stopped.wait(5)
+        assert cancelled == [True]
+
+    def test_pipeline_without_waiting(self):
+        runs = _ImportRuns()
+        imports = [import_._Import(name='a.csv'),
+                   import_._Import(name='b.csv')]
+
+        with patch('mcmd.commands.import_._start_import', side_effect=runs.start), \
+                patch('mcmd.molgenis.import_runs.get') as get:
+            import_._run_import_pipeline(imports, parallel=2, timeout=None, wait=False)
+
+        assert not get.called
+        assert [i.status for i in imports] == [import_._Status.STARTED, import_._Status.STARTED]
+        assert imports[0].message == 'Import run a.csv'
@@ -0,0 +1,186 @@
+import re
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.commands import make
+# noinspection PyProtectedMember
+from mcmd.commands.make import _Request
+from mcmd.core.errors import McmdError
+from mcmd.molgenis.principals import PrincipalType
+
+_GROUP = {'id': 'g1', 'name': 'gcc'}
+_ROLES = [{'id': 'r1', 'name': 'GCC_VIEWER', 'label': 'Viewer', 'group': _GROUP},
+          {'id': 'r2', 'name': 'GCC_EDITOR', 'label': 'Editor', 'group': _GROUP},
+          {'id': 'r3', 'name': 'COUNTER', 'label': 'Counter'},
+          {'id': 'r4', 'name': 'ANONYMOUS', 'label': 'Anonymous'}]
+_USERS = [{'id': 'u1', 'username': 'john'},
+          {'id': 'u2', 'username': 'jane'}]
+
+
+class _Server:
+    """Fakes the rows of the security entity types and the '=in=' queries on them."""
+
+    def __init__(self):
+        self.rows = {'sys_sec_Role': _ROLES,
+                     'sys_sec_User': _USERS,
+                     'sys_sec_RoleMembership': [{'id': 'm1', 'user': _USERS[0], 'role': _ROLES[0]}]}
+        self.queries = list()
+
+    def get_pages(self, entity_type_id, attrs=None, query=None):
+        self.queries.append((entity_type_id, query))
+        items = [row for row in self.rows[entity_type_id] if self._matches(row, query)]
+        yield {'items': items, 'total': len(items)}
+
+    @staticmethod
+    def _matches(row, query):
+        for attribute, values in re.findall(r'(\w+)=in=\(([^)]*)\)', query):
+            value = row.get(attribute)
+            if isinstance(value, dict):
+                value = value['id']
+            if value not in values.split(','):
+                return False
+        return True
+
+
+def _args(principals=(), from_file=None, user=False, role=False):
+    return Namespace(principals=list(principals), from_file=from_file, user=user, role=role)
+
+
+@pytest.mark.unit
+@patch('mcmd.molgenis.version.get_version_number', Mock(return_value='8.3.0'))
+@patch('mcmd.molgenis.api.config.get', Mock(return_value='https://molgenis.org/'))
+@patch('mcmd.in_out.in_out.start', Mock())
+@patch('mcmd.in_out.in_out.info', Mock())
+class MakeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = _Server()
+
+        self.patches = [patch('mcmd.commands.make.data.get_pages', side_effect=self.server.get_pages),
+                        patch('mcmd.commands.make.data.add_rows'),
+                        patch('mcmd.commands.make.post'),
+                        patch('mcmd.commands.make.put'),
+                        patch('mcmd.in_out.ask.confirm', return_value=True)]
+        self.get_pages, self.add_rows, self.post, self.put, self.confirm = [p.start() for p in self.patches]
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_get_requests(self):
+        requests = make._get_requests(_args(['john', 'jane', 'GCC_EDITOR'], user=True))
+
+        assert requests == [_Request('john', 'GCC_EDITOR', PrincipalType.USER),
+                            _Request('jane', 'GCC_EDITOR', PrincipalType.USER)]
+
+    @patch('mcmd.commands.make._p_make', Mock(error=Mock(side_effect=SystemExit(2))))
+    def test_get_requests_missing_role(self):
+        with pytest.raises(SystemExit):
+            make._get_requests(_args(['john']))
+
+    @patch('mcmd.commands.make._p_make', Mock(error=Mock(side_effect=SystemExit(2))))
+    def test_get_requests_file_and_subjects(self):
+        with pytest.raises(SystemExit):
+            make._get_requests(_args(['john', 'COUNTER'], from_file='memberships.csv'))
+
+    def test_read_requests(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath('memberships.csv')
+            file.write_text('subject,role,type\n'
+                            'jane,GCC_VIEWER,\n'
+                            'jane,GCC_VIEWER,user\n'
+                            'ANONYMOUS,GCC_VIEWER,role\n')
+
+            requests = make._read_requests(file, None)
+
+        assert requests == [_Request('jane', 'GCC_VIEWER'),
+                            _Request('jane', 'GCC_VIEWER', PrincipalType.USER),
+                            _Request('ANONYMOUS', 'GCC_VIEWER', PrincipalType.ROLE)]
+
+    def test_read_requests_unknown_type(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath('memberships.csv')
+            file.write_text('subject,role,type\njane,GCC_VIEWER,group\n')
+
+            with pytest.raises(McmdError) as e:
+                make._read_requests(file, None)
+        assert 'line 2' in str(e.value)
+
+    def test_group_role(self):
+        changes = make._make_memberships([_Request('john', 'GCC_EDITOR'), _Request('jane', 'GCC_EDITOR')])
+
+        self.put.assert_called_once_with('https://molgenis.org/api/identities/group/gcc/member/john',
+                                         data='{"roleName": "GCC_EDITOR"}')
+        self.post.assert_called_once_with('https://molgenis.org/api/identities/group/gcc/member/',
+                                          data={'username': 'jane', 'roleName': 'GCC_EDITOR'})
+        assert (changes.added, changes.updated, changes.unchanged) == (1, 1, 0)
+        assert len(self.server.queries) == 4
+
+    @patch('mcmd.molgenis.data.IDS_PER_QUERY', 1)
+    def test_membership_queries_are_chunked(self):
+        make._make_memberships([_Request('john', 'GCC_EDITOR'), _Request('jane', 'GCC_EDITOR')])
+
+        membership_queries = [query for entity_type_id, query in self.server.queries
+                              if entity_type_id == 'sys_sec_RoleMembership']
+        assert len(membership_queries) == 4
+        assert all(len(ids.split(',')) == 1
+                   for query in membership_queries for ids in re.findall(r'=in=\(([^)]*)\)', query))
+        self.put.assert_called_once()
+        self.post.assert_called_once()
+
+    def test_group_role_update_cancelled(self):
+        self.confirm.return_value = False
+
+        changes = make._make_memberships([_Request('john', 'GCC_EDITOR')])
+
+        assert not self.put.called
+        assert changes.unchanged == 1
+
+    def test_already_member(self):
+        changes = make._make_memberships([_Request('john', 'GCC_VIEWER', PrincipalType.USER)])
+
+        assert not self.post.called
+        assert not self.put.called
+        assert not self.confirm.called
+        assert changes.unchanged == 1
+
+    @patch('mcmd.commands.make.timestamp', Mock(return_value='2020-01-01T00:00:00'))
+    def test_role_memberships_are_batched(self):
+        make._make_memberships([_Request('john', 'COUNTER'), _Request('jane', 'COUNTER')])
+
+        self.add_rows.assert_called_once_with('sys_sec_RoleMembership', [
+            {'user': 'u1', 'role': 'r3', 'from': '2020-01-01T00:00:00'},
+            {'user': 'u2', 'role': 'r3', 'from': '2020-01-01T00:00:00'}])
+
+    def test_duplicate_requests(self):
+        make._make_memberships([_Request('jane', 'GCC_VIEWER'),
+                                _Request('jane', 'GCC_VIEWER', PrincipalType.USER),
+                                _Request('ANONYMOUS', 'GCC_VIEWER', PrincipalType.ROLE)])
+
+        self.post.assert_called_once_with('https://molgenis.org/api/identities/group/gcc/member/',
+                                          data={'username': 'jane', 'roleName': 'GCC_VIEWER'})
+        self.put.assert_called_once_with('https://molgenis.org/api/identities/group/gcc/role/ANONYMOUS/',
+                                         data='{"role": "GCC_VIEWER"}')
+
+    def test_conflicting_group_roles(self):
+        with pytest.raises(McmdError):
+            make._make_memberships([_Request('jane', 'GCC_VIEWER'), _Request('jane', 'GCC_EDITOR')])
+        assert not self.post.called
+
+    def test_unknown_role(self):
+        with pytest.raises(McmdError):
+            make._make_memberships([_Request('john', 'UNKNOWN')])
+
+    def test_unknown_principal(self):
+        with pytest.raises(McmdError):
+            make._make_memberships([_Request('john', 'COUNTER'), _Request('piet', 'COUNTER')])
+        assert not self.add_rows.called
+
+    def test_include_non_group_role(self):
+        with pytest.raises(McmdError):
+            make._make_memberships([_Request('ANONYMOUS', 'COUNTER')])
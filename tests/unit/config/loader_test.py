@@ -1,10 +1,17 @@
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch, Mock
 
 import pytest
 from ruamel.yaml import YAML
 
+from mcmd.config import config, loader
 # noinspection PyProtectedMember
-from mcmd.config.loader import _merge
+from mcmd.config.loader import _merge, load_config
 
 DEFAULTS = """
 git:
@@ -76,3 +83,97 @@ class ConfigLoaderTest(unittest.TestCase):
 
         expected = yaml.load(MERGED_CONFIG)
         self.assertEqual(expected, defaults)
+
+
+USER_PROPERTIES = """
+git:
+  root:
+host:
+  selected: http://localhost/
+  auth:
+  - url: http://localhost/
+    username: admin
+"""
+
+
+@pytest.mark.unit
+class ConfigCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.properties_file = self.folder.joinpath('mcmd.yaml')
+        self.properties_file.write_text(USER_PROPERTIES)
+        self.context = Mock()
+        self.context.get_properties_file.return_value = self.properties_file
+        self._reset_config()
+
+    def tearDown(self):
+        shutil.rmtree(str(self.folder))
+        self._reset_config()
+
+    @staticmethod
+    def _reset_config():
+        config._config = None
+        config._properties_file = None
+        config._persisted_hash = None
+
+    def _load(self):
+        self._reset_config()
+        with patch('mcmd.config.loader.context', return_value=self.context):
+            load_config()
+
+    def test_unchanged_config_is_not_written(self):
+        self._load()
+        content = self.properties_file.read_text()
+
+        with patch('mcmd.utils.file_lock.replace_atomically') as replace:
+            self._load()
+            config.set_host('http://localhost/')
+
+        assert not replace.called
+        assert self.properties_file.read_text() == content
+
+    def test_changed_config_is_written(self):
+        self._load()
+
+        config.set_import_action('update')
+
+        self._load()
+        assert config.get('settings', 'import_action') == 'update'
+
+    def test_cached_config_is_used(self):
+        self._load()
+
+        with patch('mcmd.config.loader.YAML') as yaml:
+            self._load()
+
+        assert not yaml.return_value.load.called
+        assert config.get('host', 'selected') == 'http://localhost/'
+        assert config.get('settings', 'import_action') == 'add_update_existing'
+
+    def test_cache_is_invalidated_when_file_is_modified(self):
+        self._load()
+
+        self.properties_file.write_text(USER_PROPERTIES.replace('username: admin', 'username: henk'))
+        self._load()
+
+        assert config.username() == 'henk'
+
+    def test_cache_is_invalidated_by_same_size_change(self):
+        self._load()
+        stat = self.properties_file.stat()
+
+        self.properties_file.write_text(USER_PROPERTIES.replace('username: admin', 'username: klaas'))
+        os.utime(str(self.properties_file), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self._load()
+
+        assert self.properties_file.stat().st_size == stat.st_size
+        assert config.username() == 'klaas'
+
+    def test_corrupt_cache_is_ignored(self):
+        self._load()
+        for content in [b'', b'garbage', pickle.dumps(['not', 'a', 'dict'])]:
+            loader._get_cache_file(self.properties_file).write_bytes(content)
+            self._load()
+
+            assert config.get('host', 'selected') == 'http://localhost/'
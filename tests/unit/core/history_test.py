@@ -0,0 +1,95 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.core import history
+from mcmd.core.errors import McmdError
+
+
+@pytest.mark.unit
+class HistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.history_file = self.folder.joinpath('history.log')
+        context = Mock()
+        context.get_history_file.return_value = self.history_file
+        self.context_patch = patch('mcmd.core.history.context', return_value=context)
+        self.context_patch.start()
+
+    def tearDown(self):
+        self.context_patch.stop()
+        shutil.rmtree(str(self.folder))
+
+    def test_read_empty(self):
+        assert history.read(10, include_fails=True) == []
+
+    def test_write_and_read(self):
+        history.write('add user henk', success=True, duration=1.5)
+        history.write('add group test', success=False)
+
+        entries = history.read(10, include_fails=True)
+
+        assert [(entry.success, entry.command, entry.duration) for entry in entries] == [
+            (True, 'add user henk', 1.5),
+            (False, 'add group test', None)]
+        assert entries[0].timestamp <= datetime.now()
+
+    def test_read_old_entries(self):
+        self.history_file.write_text('v add user henk\nx add group test\n')
+        history.write('ping', success=True)
+
+        entries = history.read(10, include_fails=True)
+
+        assert [(entry.success, entry.command) for entry in entries] == [
+            (True, 'add user henk'), (False, 'add group test'), (True, 'ping')]
+        assert entries[0].timestamp is None
+
+    @patch('mcmd.core.history._BLOCK_SIZE', 7)
+    def test_read_last_lines_in_blocks(self):
+        for i in range(20):
+            history.write('add user user{}'.format(i), success=i % 2 == 0)
+
+        assert [entry.command for entry in history.read(3, include_fails=True)] == [
+            'add user user17', 'add user user18', 'add user user19']
+        assert [entry.command for entry in history.read(3, include_fails=False)] == [
+            'add user user14', 'add user user16', 'add user user18']
+
+    def test_filters(self):
+        self.history_file.write_text('v\t2020-01-01T10:00:00\t\tadd user old\n')
+        history.write('add user henk', success=True)
+        history.write('add group test', success=False)
+        history.write('add user piet', success=False)
+
+        def commands(**kwargs):
+            return [entry.command for entry in history.read(10, include_fails=True, **kwargs)]
+
+        assert commands(grep='user') == ['add user old', 'add user henk', 'add user piet']
+        assert commands(only_fails=True) == ['add group test', 'add user piet']
+        assert commands(grep='user', only_fails=True) == ['add user piet']
+        assert commands(since=datetime.now() - timedelta(hours=1)) == ['add user henk', 'add group test',
+                                                                       'add user piet']
+
+    def test_invalid_grep(self):
+        with pytest.raises(McmdError):
+            history.read(10, include_fails=True, grep='(')
+
+    @patch('mcmd.core.history._MAX_SIZE', 100)
+    def test_rotate(self):
+        for i in range(10):
+            history.write('add user user{}'.format(i), success=True)
+
+        rotated_file = self.folder.joinpath('history.log.1')
+        assert rotated_file.exists()
+        assert self.history_file.stat().st_size <= 100
+        assert [entry.command for entry in history.read(4, include_fails=True)] == [
+            'add user user6', 'add user user7', 'add user user8', 'add user user9']
+
+        history.clear()
+        assert not rotated_file.exists()
+        assert history.read(10, include_fails=True) == []
@@ -0,0 +1,114 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.core import metrics
+# noinspection PyProtectedMember
+from mcmd.molgenis.session import _record
+
+
+@pytest.mark.unit
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        metrics._events.clear()
+        metrics._counters.clear()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics._enabled = False
+        metrics._events.clear()
+        metrics._counters.clear()
+        shutil.rmtree(str(self.folder))
+
+    def test_url_template(self):
+        assert metrics.get_url_template('https://x.org/api/v2/sys_sec_User/aaaac5xkhmrhkqqbb2obkhaaae?q=a') == \
+               '/api/v2/sys_sec_User/{id}'
+        assert metrics.get_url_template('https://x.org/api/data/it_emx_Test1/12') == '/api/data/it_emx_Test1/{id}'
+        assert metrics.get_url_template('https://x.org/api/v2/sys_sec_Token') == '/api/v2/sys_sec_Token'
+
+    def test_disabled(self):
+        metrics._enabled = False
+        with metrics.timed(metrics.COMMAND, 'ping'):
+            pass
+        metrics.increment('logins')
+
+        assert metrics.get_events() == []
+        assert metrics.get_counters() == {}
+
+    def test_timed(self):
+        with metrics.timed(metrics.COMMAND, 'ping', arguments='ping'):
+            time.sleep(0.01)
+
+        event = metrics.get_events()[0]
+        assert (event.category, event.name, event.details) == (metrics.COMMAND, 'ping', {'arguments': 'ping'})
+        assert event.duration >= 0.01
+
+    def test_record_response(self):
+        response = Mock(status_code=200, content=b'12345', headers={}, raw=Mock(retries=Mock(history=(1, 2))))
+        response.request.body = b'abc'
+
+        _record('get', 'https://x.org/api/v2/sys_sec_User/1', time.perf_counter(), response, stream=False)
+
+        event = metrics.get_events()[0]
+        assert event.name == 'GET /api/v2/sys_sec_User/{id}'
+        assert event.details['status'] == 200
+        assert event.details['bytes_sent'] == 3
+        assert event.details['bytes_received'] == 5
+        assert event.details['retries'] == 2
+        assert metrics.get_counters()['http retries'] == 2
+
+    def test_record_streamed_response(self):
+        response = Mock(status_code=200, headers={'Content-Length': '2048'}, raw=Mock(retries=None))
+        response.request.body = None
+
+        _record('get', 'https://x.org/files/1', time.perf_counter(), response, stream=True)
+
+        event = metrics.get_events()[0]
+        assert event.details['bytes_sent'] is None
+        assert event.details['bytes_received'] == 2048
+        assert event.details['retries'] == 0
+
+    @patch('mcmd.core.metrics.log')
+    def test_summary(self, log):
+        with metrics.timed(metrics.COMMAND, 'ping'):
+            metrics.record_request('GET', 'https://x.org/api/v2/version', time.perf_counter(), 200, None, 1024, 0)
+        metrics.increment('token checks')
+
+        metrics.print_summary()
+
+        lines = [call[0][0] for call in log.info.call_args_list]
+        assert any(line.startswith('ping ') for line in lines)
+        assert any(line.startswith('GET /api/v2/version') and line.endswith('1.0 KB') for line in lines)
+        assert any(line.startswith('token checks') for line in lines)
+
+    def test_write_jsonl(self):
+        with metrics.timed(metrics.COMMAND, 'ping'):
+            pass
+        metrics.increment('logins')
+        trace_file = self.folder.joinpath('trace.jsonl')
+
+        metrics.write_trace(trace_file)
+
+        lines = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert lines[0]['category'] == metrics.COMMAND
+        assert lines[0]['name'] == 'ping'
+        assert lines[1] == {'category': 'counter', 'name': 'logins', 'count': 1}
+
+    def test_write_chrome_trace(self):
+        with metrics.timed(metrics.COMMAND, 'ping'):
+            pass
+        trace_file = self.folder.joinpath('trace.json')
+
+        metrics.write_trace(trace_file)
+
+        trace = json.loads(trace_file.read_text())
+        assert trace['traceEvents'][0]['ph'] == 'X'
+        assert trace['traceEvents'][0]['name'] == 'ping'
@@ -0,0 +1,104 @@
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+from packaging.version import Version
+
+from mcmd.core import store
+from mcmd.core.store import TokenValidity, CachedVersion
+
+
+@pytest.mark.unit
+class StoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.storage_file = self.folder.joinpath('.storage.db')
+        self.context = Mock()
+        self.context.get_storage_file.return_value = self.storage_file
+        self._reset()
+
+    def tearDown(self):
+        self._reset()
+        shutil.rmtree(str(self.folder))
+
+    @staticmethod
+    def _reset():
+        if store._connection:
+            store._connection.close()
+        store._connection = None
+        store._store['update_available'] = None
+        store._store['token_validity'].clear()
+        store._store['molgenis_versions'].clear()
+
+    def _load(self):
+        self._reset()
+        with patch('mcmd.core.store.context', return_value=self.context):
+            store.load()
+
+    def _keys(self):
+        with sqlite3.connect(str(self.storage_file)) as connection:
+            return sorted(key for key, in connection.execute('SELECT key FROM store'))
+
+    def test_new_store(self):
+        self._load()
+
+        assert self._keys() == ['last_version_check']
+        assert store.get_update_available() is None
+
+    def test_values_are_persisted(self):
+        validity = TokenValidity('hash', datetime.now(), timedelta(minutes=5))
+        self._load()
+        store.set_update_available(Version('2.0.0'))
+        store.set_token_validity('http://a/', validity)
+        store.set_molgenis_version('http://b/', CachedVersion('8.3.0', datetime.now(), timedelta(hours=1)))
+
+        self._load()
+
+        assert store.get_update_available() == Version('2.0.0')
+        assert store.get_token_validity('http://a/') == validity
+        assert store.get_molgenis_version('http://b/').version == '8.3.0'
+
+    def test_removed_host_values_are_deleted(self):
+        self._load()
+        store.set_token_validity('http://a/', TokenValidity('hash', datetime.now(), timedelta(minutes=5)))
+        store.set_token_validity('http://a/', None)
+
+        assert 'token_validity:http://a/' not in self._keys()
+        self._load()
+        assert store.get_token_validity('http://a/') is None
+
+    def test_writes_do_not_overwrite_other_keys(self):
+        self._load()
+        # another process writes a value after this process loaded the store
+        with sqlite3.connect(str(self.storage_file)) as connection:
+            connection.execute('INSERT INTO store VALUES (?, ?)', ('update_available', pickle.dumps(Version('3.0.0'))))
+
+        store.set_token_validity('http://a/', TokenValidity('hash', datetime.now(), timedelta(minutes=5)))
+
+        self._load()
+        assert store.get_update_available() == Version('3.0.0')
+        assert store.get_token_validity('http://a/') is not None
+
+    def test_migrate_pickle(self):
+        validity = TokenValidity('hash', datetime.now(), timedelta(minutes=5))
+        legacy = {'last_version_check': datetime(2020, 1, 1),
+                  'update_available': Version('1.9.0'),
+                  'token_validity': {'http://a/': validity},
+                  'molgenis_versions': dict()}
+        legacy_file = self.folder.joinpath('.storage.pkl')
+        legacy_file.write_bytes(pickle.dumps(legacy))
+
+        self._load()
+
+        assert not legacy_file.exists()
+        assert store.get_last_version_check() == datetime(2020, 1, 1)
+        assert store.get_update_available() == Version('1.9.0')
+        assert store.get_token_validity('http://a/') == validity
+        assert self._keys() == ['last_version_check', 'token_validity:http://a/', 'update_available']
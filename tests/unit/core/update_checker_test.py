@@ -1,3 +1,4 @@
+import os
 import unittest
 from datetime import datetime, timedelta
 from unittest.mock import patch, Mock
@@ -7,7 +8,7 @@ from packaging.version import Version
 
 from mcmd.core import store
 # noinspection PyProtectedMember
-from mcmd.core.update_checker import _latest_version, check
+from mcmd.core.update_checker import _latest_version, _update_latest_version, check, _is_enabled
 
 
 class MockResponse:
@@ -19,26 +20,30 @@ class MockResponse:
 # noinspection PyUnusedLocal
 @pytest.mark.unit
 @patch('mcmd.core.store._persist', Mock())
+@patch('mcmd.core.store.load', Mock())
+@patch('mcmd.core.update_checker._is_enabled', Mock(return_value=True))
 class ErrorsTest(unittest.TestCase):
 
     # noinspection PyMethodMayBeStatic
-    def mocked_get_versions(*args):
+    def mocked_get_versions(*args, **kwargs):
         return MockResponse(pypi_version_page, 200)
 
     # noinspection PyMethodMayBeStatic
-    def mocked_get_versions_error(*args):
+    def mocked_get_versions_error(*args, **kwargs):
         return MockResponse(None, 500)
 
     @patch('requests.get', side_effect=mocked_get_versions)
     def test_latest_version(self, mock_get):
         assert _latest_version() == Version('1.9.0')
+        assert mock_get.call_args[1]['timeout'] > 0
 
     @patch('requests.get', side_effect=mocked_get_versions_error)
     def test_latest_version_error(self, mock_get):
         assert _latest_version() is None
 
+    @patch('mcmd.core.update_checker._start_worker')
     @patch('mcmd.core.update_checker._show_update_message')
-    def test_already_checked_today(self, message):
+    def test_already_checked_today(self, message, start_worker):
         now = datetime.now()
         store.set_last_version_check(now)
         store.set_update_available(None)
@@ -48,93 +53,93 @@ class ErrorsTest(unittest.TestCase):
         assert store.get_last_version_check() == now
         assert store.get_update_available() is None
         assert not message.called
+        assert not start_worker.called
 
     @patch('mcmd.core.update_checker._latest_version')
-    @patch('mcmd.core.update_checker._current_version')
+    @patch('mcmd.core.update_checker._start_worker')
     @patch('mcmd.core.update_checker._show_update_message')
-    def test_update_available(self, message, current_version, latest_version):
+    def test_check_starts_worker(self, message, start_worker, latest_version):
+        two_days_ago = datetime.now() - timedelta(days=2)
+        store.set_last_version_check(two_days_ago)
+        store.set_update_available(None)
+
+        check()
+
+        assert start_worker.called
+        assert not latest_version.called
+        assert store.get_last_version_check() > two_days_ago
+        assert not message.called
+
+    @patch('mcmd.core.update_checker._latest_version')
+    @patch('mcmd.core.update_checker._current_version')
+    def test_update_available(self, current_version, latest_version):
         current_version.return_value = Version('1.8.0')
         latest_version.return_value = Version('1.9.0')
         two_days_ago = datetime.now() - timedelta(days=2)
         store.set_last_version_check(two_days_ago)
         store.set_update_available(None)
 
-        check()
+        _update_latest_version()
 
         assert store.get_last_version_check() > two_days_ago
         assert store.get_update_available() == Version('1.9.0')
-        assert message.called
 
     @patch('mcmd.core.update_checker._latest_version')
     @patch('mcmd.core.update_checker._current_version')
-    @patch('mcmd.core.update_checker._show_update_message')
-    def test_no_update_available(self, message, current_version, latest_version):
+    def test_no_update_available(self, current_version, latest_version):
         current_version.return_value = Version('1.8.0')
         latest_version.return_value = Version('1.8.0')
         two_days_ago = datetime.now() - timedelta(days=2)
         store.set_last_version_check(two_days_ago)
         store.set_update_available(None)
 
-        check()
+        _update_latest_version()
 
         assert store.get_last_version_check() > two_days_ago
         assert store.get_update_available() is None
-        assert not message.called
 
     @patch('mcmd.core.update_checker._latest_version')
-    @patch('mcmd.core.update_checker._current_version')
-    @patch('mcmd.core.update_checker._show_update_message')
-    def test_update_found_previously_and_already_checked_today(self, message, current_version, latest_version):
-        current_version.return_value = Version('1.8.0')
-        latest_version.return_value = Version('1.10.0')
-        now = datetime.now()
-        store.set_last_version_check(now)
-        store.set_update_available(Version('1.9.0'))
+    def test_check_failed(self, latest_version):
+        latest_version.return_value = None
+        two_days_ago = datetime.now() - timedelta(days=2)
+        store.set_last_version_check(two_days_ago)
+        store.set_update_available(None)
 
-        check()
+        _update_latest_version()
 
-        assert store.get_last_version_check() == now
-        assert store.get_update_available() == Version('1.9.0')
-        assert message.called
+        assert store.get_last_version_check() == two_days_ago
+        assert store.get_update_available() is None
 
-    @patch('mcmd.core.update_checker._latest_version')
+    @patch('mcmd.core.update_checker._start_worker')
     @patch('mcmd.core.update_checker._current_version')
     @patch('mcmd.core.update_checker._show_update_message')
-    def test_update_found_previously(self, message, current_version, latest_version):
+    def test_update_found_previously(self, message, current_version, start_worker):
         current_version.return_value = Version('1.8.0')
-        latest_version.return_value = Version('1.9.0')
-        two_days_ago = datetime.now() - timedelta(days=2)
-        store.set_last_version_check(two_days_ago)
+        store.set_last_version_check(datetime.now())
         store.set_update_available(Version('1.9.0'))
 
         check()
 
-        assert store.get_last_version_check() > two_days_ago
         assert store.get_update_available() == Version('1.9.0')
         assert message.called
 
     @patch('mcmd.core.update_checker._latest_version')
     @patch('mcmd.core.update_checker._current_version')
-    @patch('mcmd.core.update_checker._show_update_message')
-    def test_update_found_previously_and_update_available(self, message, current_version, latest_version):
+    def test_update_found_previously_and_update_available(self, current_version, latest_version):
         current_version.return_value = Version('1.8.0')
         latest_version.return_value = Version('1.10.0')
-        two_days_ago = datetime.now() - timedelta(days=2)
-        store.set_last_version_check(two_days_ago)
+        store.set_last_version_check(datetime.now() - timedelta(days=2))
         store.set_update_available(Version('1.9.0'))
 
-        check()
+        _update_latest_version()
 
-        assert store.get_last_version_check() > two_days_ago
         assert store.get_update_available() == Version('1.10.0')
-        assert message.called
 
-    @patch('mcmd.core.update_checker._latest_version')
+    @patch('mcmd.core.update_checker._start_worker')
     @patch('mcmd.core.update_checker._current_version')
     @patch('mcmd.core.update_checker._show_update_message')
-    def test_update_found_previously_and_just_updated(self, message, current_version, latest_version):
+    def test_update_found_previously_and_just_updated(self, message, current_version, start_worker):
         current_version.return_value = Version('1.9.0')
-        latest_version.return_value = Version('1.9.0')
         now = datetime.now()
         store.set_last_version_check(now)
         store.set_update_available(Version('1.9.0'))
@@ -146,6 +151,33 @@ class ErrorsTest(unittest.TestCase):
         assert not message.called
 
 
+@pytest.mark.unit
+class EnabledTest(unittest.TestCase):
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('mcmd.config.config.get', Mock(return_value=True))
+    def test_enabled(self):
+        assert _is_enabled()
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('mcmd.config.config.get', Mock(return_value=False))
+    def test_disabled_in_config(self):
+        assert not _is_enabled()
+
+    @patch.dict(os.environ, {'MCMD_NO_UPDATE_CHECK': '1'})
+    @patch('mcmd.config.config.get', Mock(return_value=True))
+    def test_disabled_by_environment(self):
+        assert not _is_enabled()
+
+    @patch('mcmd.core.update_checker._start_worker')
+    @patch('mcmd.core.update_checker._is_enabled', Mock(return_value=False))
+    def test_disabled_check_does_nothing(self, start_worker):
+        with patch('mcmd.core.store.get_last_version_check') as last_check:
+            check()
+        assert not last_check.called
+        assert not start_worker.called
+
+
 pypi_version_page = """
 <!DOCTYPE html> <html> <head> <meta name="pypi:repository-version" content="1.0"> <title>Links for 
 molgenis-commander</title> </head> <body> <h1>Links for molgenis-commander</h1> <a 
@@ -4,7 +4,7 @@ import pytest
 from parsy import ParseError
 
 from mcmd.script.model.statements import Value, Input, Wait, VisibleComment, Command, InvisibleComment, \
-    Empty
+    Empty, Barrier
 from mcmd.script.model.types_ import InputType
 # noinspection PyProtectedMember
 from mcmd.script.parser.line_parser import _parse_line
@@ -57,7 +57,7 @@ class LineParserTest(unittest.TestCase):
         with pytest.raises(ParseError) as e:
             _parse_line("$val myValue")
 
-        assert str(e.value) == "expected one of 'input', 'value', 'wait' at 0:1"
+        assert str(e.value) == "expected one of 'barrier', 'input', 'value', 'wait' at 0:1"
 
     @staticmethod
     def test_value_illegal_text():
@@ -126,6 +126,12 @@ class LineParserTest(unittest.TestCase):
         assert isinstance(wait, Wait)
         assert wait.message.string == "This is 'the' message"
 
+    @staticmethod
+    def test_barrier():
+        barrier = _parse_line("  $barrier ")
+
+        assert isinstance(barrier, Barrier)
+
     @staticmethod
     def test_comment_visible():
         wait = _parse_line("  # this is a visible comment")
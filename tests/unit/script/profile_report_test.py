@@ -0,0 +1,87 @@
+import csv
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mcmd.core import metrics
+from mcmd.script import script_runner, profile_report
+from mcmd.script.options import ScriptOptions
+from mcmd.script.parser import script_parser
+
+_SCRIPT = ["$value user = 'henk'",
+           "add user {{user}}",
+           "import big_dataset.xlsx",
+           "# a comment"]
+
+
+def _execute(cmd, sub_args, state):
+    """Pretends to run a command: the import sends two requests and waits for the import run."""
+    metrics.record_request('POST', 'https://x.org/plugin/importwizard/importFile', time.perf_counter(), 201, 1000, 10,
+                           0)
+    if cmd.startswith('import'):
+        metrics.record_request('GET', 'https://x.org/api/v2/sys_ImportRun/1', time.perf_counter(), 200, None, 500, 0)
+        with metrics.timed(metrics.WAIT, 'import runs'):
+            time.sleep(0.02)
+
+
+@pytest.mark.unit
+class ProfileReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        metrics._events.clear()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics._enabled = False
+        metrics._events.clear()
+        metrics._counters.clear()
+        shutil.rmtree(str(self.folder))
+
+    def _run(self, parallel: int):
+        script = script_parser.parse(_SCRIPT)
+        with patch('mcmd.script.script_runner._execute_command', side_effect=_execute):
+            script_runner.run(script, ScriptOptions(parallel=parallel, log_comments=False))
+        return profile_report.create_report(script.lines)
+
+    def _assert_report(self, report):
+        assert [profile.number for profile in report][0] == 3
+        import_line = report[0]
+        assert import_line.line == 'import big_dataset.xlsx'
+        assert import_line.requests == 2
+        assert import_line.bytes == 1510
+        assert 0.02 <= import_line.wait <= import_line.time
+
+        add_line = [profile for profile in report if profile.number == 2][0]
+        assert (add_line.requests, add_line.bytes, add_line.wait) == (1, 1010, 0)
+
+    def test_report(self):
+        self._assert_report(self._run(parallel=1))
+
+    def test_report_parallel(self):
+        self._assert_report(self._run(parallel=2))
+
+    def test_write_csv(self):
+        report = self._run(parallel=1)
+        file = self.folder.joinpath('profile.csv')
+
+        profile_report.write_report(report, file)
+
+        with file.open() as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]['number'] == '3'
+        assert rows[0]['requests'] == '2'
+
+    def test_write_json(self):
+        report = self._run(parallel=1)
+        file = self.folder.joinpath('profile.json')
+
+        profile_report.write_report(report, file)
+
+        assert json.loads(file.read_text())[0]['line'] == 'import big_dataset.xlsx'
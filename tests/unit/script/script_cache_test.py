@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.script import script_cache
+from mcmd.script.parser import script_parser
+from mcmd.script.parser.errors import InvalidScriptError
+
+_SCRIPT = ["$value user = 'henk'",
+           "add user {{user}}",
+           "# created {{user}}"]
+
+
+@pytest.mark.unit
+class ScriptCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        context = Mock()
+        context.get_cache_folder.return_value = self.folder
+        self.context_patch = patch('mcmd.script.script_cache.context', return_value=context)
+        self.context_patch.start()
+
+    def tearDown(self):
+        self.context_patch.stop()
+        shutil.rmtree(str(self.folder))
+
+    def test_cached_script_is_not_parsed_again(self):
+        script = script_cache.parse(_SCRIPT)
+
+        with patch('mcmd.script.script_cache.script_parser.parse') as parse:
+            cached = script_cache.parse(_SCRIPT)
+
+        assert not parse.called
+        assert cached == script
+        assert cached.lines[1].statement.command.render({'user': 'piet'}) == 'add user piet'
+        assert cached.get_lines_with_dependencies(3) == [script.lines[0], script.lines[2]]
+
+    def test_changed_script_is_parsed(self):
+        script_cache.parse(_SCRIPT)
+
+        with patch('mcmd.script.script_cache.script_parser.parse', wraps=script_parser.parse) as parse:
+            script_cache.parse(_SCRIPT + ['ping'])
+
+        assert parse.called
+
+    @patch('mcmd.core.distribution.get_version')
+    def test_new_version_parses_again(self, version):
+        version.return_value = '1.0.0'
+        script_cache.parse(_SCRIPT)
+        version.return_value = '1.1.0'
+
+        with patch('mcmd.script.script_cache.script_parser.parse', wraps=script_parser.parse) as parse:
+            script_cache.parse(_SCRIPT)
+
+        assert parse.called
+
+    def test_invalid_script_is_not_cached(self):
+        with pytest.raises(InvalidScriptError):
+            script_cache.parse(['$value = '])
+
+        assert list(self.folder.joinpath('scripts').iterdir()) == []
+
+    @patch('mcmd.script.script_cache._MAX_ENTRIES', 2)
+    def test_prune(self):
+        for i in range(4):
+            script_cache.parse(['add user user{}'.format(i)])
+
+        assert len(list(self.folder.joinpath('scripts').iterdir())) == 2
@@ -95,7 +95,7 @@ class ScriptParserTest(unittest.TestCase):
                 assert str(
                     exception.message) == "Line 11: $valu x = 'hoi'\n" \
                                           "          ^\n" \
-                                          "  - Expected one of 'input', 'value', 'wait' at 0:1"
+                                          "  - Expected one of 'barrier', 'input', 'value', 'wait' at 0:1"
             if num == 5:
                 assert str(
                     exception.message) == "Line 13: $input enum type : 'input something!'\n" \
@@ -1,9 +1,11 @@
+import threading
 import unittest
 from unittest.mock import patch
 
 import pytest
 from testfixtures import log_capture
 
+from mcmd.core.errors import McmdError, ScriptError
 from mcmd.script import script_runner
 from mcmd.script.options import ScriptOptions
 from mcmd.script.parser import script_parser
@@ -108,3 +110,86 @@ class ScriptRunnerTest(unittest.TestCase):
         capture.check(
             ('console', 'INFO', 'add user test')
         )
+
+    @staticmethod
+    @log_capture()
+    def test_parallel_output_in_order(capture):
+        script_lines = ["$value name = 'henk'",
+                        "# adding users",
+                        "add user {{name}}1",
+                        "add user {{name}}2",
+                        "$barrier",
+                        "# giving permissions",
+                        "give {{name}}1 view sys_md_Package",
+                        "give {{name}}2 view sys_md_Package"
+                        ]
+
+        script = script_parser.parse(script_lines)
+
+        options = ScriptOptions(dry_run=True,
+                                log_comments=True,
+                                parallel=4)
+
+        script_runner.run(script, options)
+
+        capture.check(
+            ('console', 'INFO', 'adding users'),
+            ('console', 'INFO', 'add user henk1'),
+            ('console', 'INFO', 'add user henk2'),
+            ('console', 'INFO', 'giving permissions'),
+            ('console', 'INFO', 'give henk1 view sys_md_Package'),
+            ('console', 'INFO', 'give henk2 view sys_md_Package')
+        )
+
+    @staticmethod
+    def test_parallel_batches():
+        script_lines = ["add user user1",
+                        "add user user2",
+                        "$barrier",
+                        "add user user3",
+                        "config set host",
+                        "add user user4"
+                        ]
+        threads = list()
+        running = list()
+
+        def execute(cmd, sub_args, state):
+            threads.append((cmd, threading.current_thread() is threading.main_thread()))
+            running.append(cmd)
+
+        script = script_parser.parse(script_lines)
+
+        with patch('mcmd.script.script_runner._execute_command', side_effect=execute):
+            script_runner.run(script, ScriptOptions(parallel=4))
+
+        assert sorted(threads) == [('add user user1', False),
+                                   ('add user user2', False),
+                                   ('add user user3', False),
+                                   ('add user user4', False),
+                                   ('config set host', True)]
+        assert running.index('add user user3') < running.index('config set host') < running.index('add user user4')
+        assert set(running[:2]) == {'add user user1', 'add user user2'}
+
+    @staticmethod
+    @patch('sys.stderr')
+    def test_parallel_ignore_errors(stderr):
+        script_lines = ["add user user1",
+                        "add user user2",
+                        "add user user3"
+                        ]
+        executed = list()
+
+        def execute(cmd, sub_args, state):
+            executed.append(cmd)
+            if cmd == 'add user user2':
+                raise McmdError('failed')
+
+        script = script_parser.parse(script_lines)
+
+        with patch('mcmd.script.script_runner._execute_command', side_effect=execute):
+            script_runner.run(script, ScriptOptions(parallel=2, exit_on_error=False))
+            assert sorted(executed) == ['add user user1', 'add user user2', 'add user user3']
+
+            with pytest.raises(ScriptError) as e:
+                script_runner.run(script, ScriptOptions(parallel=2, exit_on_error=True))
+            assert e.value.line == 2
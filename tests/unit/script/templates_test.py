@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+
+import pytest
+from jinja2 import TemplateSyntaxError
+
+from mcmd.script.model import templates
+from mcmd.script.model.templates import Template
+
+
+@pytest.mark.unit
+class TemplateTest(unittest.TestCase):
+
+    def test_literal(self):
+        with patch('mcmd.script.model.templates._parse') as parse:
+            template = Template('add user henk --set-active')
+
+            assert template.is_literal()
+            assert template.variables == frozenset()
+            assert template.render({'user': 'piet'}) == 'add user henk --set-active'
+        assert not parse.called
+
+    def test_template(self):
+        template = Template('add user {{user}} {% if active %}--set-active{% endif %}')
+
+        assert not template.is_literal()
+        assert template.variables == frozenset({'user', 'active'})
+        assert template.render({'user': 'piet', 'active': True}) == 'add user piet --set-active'
+
+    def test_comment_is_not_literal(self):
+        assert Template('ping {# check the host #}').render(dict()) == 'ping '
+
+    def test_syntax_error(self):
+        with pytest.raises(TemplateSyntaxError):
+            Template('add user {{user}')
+
+    def test_parsed_once(self):
+        string = 'add group {{group_name_for_parsed_once_test}}'
+        with patch('mcmd.script.model.templates._env.parse', wraps=templates._env.parse) as parse:
+            template = Template(string)
+            template.variables
+            template.render({'group_name_for_parsed_once_test': 'test'})
+            Template(string).render(dict())
+
+        assert parse.call_count == 1
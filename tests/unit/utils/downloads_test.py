@@ -0,0 +1,87 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+
+from mcmd.core.errors import McmdError
+from mcmd.utils import downloads
+
+_URL = 'https://github.com/molgenis/molgenis/files/1234/data.xlsx'
+
+
+def _response(status_code, chunks=(), headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or dict())
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+def _interrupted_response(chunks, headers):
+    def iter_content(chunk_size):
+        yield from chunks
+        raise requests.ConnectionError('connection reset')
+
+    response = _response(200, headers=headers)
+    response.iter_content.side_effect = iter_content
+    return response
+
+
+@pytest.mark.unit
+@patch('mcmd.utils.downloads.get_session')
+class DownloadsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file = Path(self.temp_dir.name).joinpath('data.xlsx')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_download(self, get_session):
+        get_session.return_value.get.return_value = _response(200, [b'abc', b'def'], {'ETag': '"v1"'})
+
+        assert downloads.download(_URL, self.file)
+
+        assert self.file.read_bytes() == b'abcdef'
+        assert not self.file.with_name('data.xlsx.part').exists()
+        assert downloads.is_cached(self.file)
+
+    def test_unchanged_file_not_downloaded(self, get_session):
+        get_session.return_value.get.return_value = _response(200, [b'abc'], {'ETag': '"v1"'})
+        downloads.download(_URL, self.file)
+
+        get_session.return_value.get.return_value = _response(304)
+        assert not downloads.download(_URL, self.file)
+
+        headers = get_session.return_value.get.call_args[1]['headers']
+        assert headers == {'If-None-Match': '"v1"'}
+        assert self.file.read_bytes() == b'abc'
+
+    def test_resume_interrupted_download(self, get_session):
+        get_session.return_value.get.return_value = _interrupted_response([b'abc'], {'ETag': '"v1"'})
+        with pytest.raises(McmdError):
+            downloads.download(_URL, self.file)
+
+        assert not self.file.exists()
+        assert self.file.with_name('data.xlsx.part').read_bytes() == b'abc'
+
+        get_session.return_value.get.return_value = _response(206, [b'def'], {'ETag': '"v1"'})
+        assert downloads.download(_URL, self.file)
+
+        headers = get_session.return_value.get.call_args[1]['headers']
+        assert headers == {'If-Range': '"v1"', 'Range': 'bytes=3-'}
+        assert self.file.read_bytes() == b'abcdef'
+
+    def test_restart_changed_download(self, get_session):
+        get_session.return_value.get.return_value = _interrupted_response([b'abc'], {'ETag': '"v1"'})
+        with pytest.raises(McmdError):
+            downloads.download(_URL, self.file)
+
+        # the file changed, so the server ignores the range and sends the whole file
+        get_session.return_value.get.return_value = _response(200, [b'xyz123'], {'ETag': '"v2"'})
+        downloads.download(_URL, self.file)
+
+        assert self.file.read_bytes() == b'xyz123'
@@ -0,0 +1,128 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, Mock
+
+import pytest
+
+from mcmd.utils import file_index
+
+
+@pytest.mark.unit
+class FileIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name).joinpath('datasets')
+        self.folder.mkdir()
+        self.cache_folder = Path(self.temp_dir.name).joinpath('cache')
+        self.cache_folder.mkdir()
+
+        context = Mock()
+        context.get_cache_folder.return_value = self.cache_folder
+        self.settings = {'recursive': False, 'ignore': ['.*']}
+        self.patches = [patch('mcmd.utils.file_index.context', return_value=context),
+                        patch('mcmd.utils.file_index.config.get', side_effect=lambda *args: self.settings[args[1]]),
+                        patch('mcmd.utils.file_index._trees', None),
+                        patch('mcmd.utils.file_index._RACY_SECONDS', 0)]
+        for patch_ in self.patches:
+            patch_.start()
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+        self.temp_dir.cleanup()
+
+    def _create(self, *names):
+        for name in names:
+            file = self.folder.joinpath(name)
+            file.parent.mkdir(parents=True, exist_ok=True)
+            file.touch()
+        return [self.folder.joinpath(name) for name in names]
+
+    def _set_mtime(self, folder: Path, mtime_ns: int):
+        os.utime(str(folder), ns=(mtime_ns, mtime_ns))
+
+    def test_find(self):
+        csv, xlsx, __ = self._create('data.csv', 'data.xlsx', 'other.csv')
+
+        assert file_index.find([self.folder], 'data') == [csv, xlsx]
+        assert file_index.find([self.folder], 'data.xlsx') == [xlsx]
+        assert file_index.find([self.folder], 'unknown') == []
+
+    def test_ignore(self):
+        self._create('.hidden.csv', 'backup.bak', 'no_extension', 'data.csv')
+        self.settings['ignore'] = ['.*', '*.bak']
+
+        assert [file.name for file in file_index.get_files([self.folder])] == ['data.csv']
+
+    def test_recursive(self):
+        top, nested = self._create('top.csv', 'sub/deeper/nested.csv')
+
+        assert file_index.get_files([self.folder]) == [top]
+
+        self.settings['recursive'] = True
+        assert sorted(file_index.get_files([self.folder])) == [self.folder.joinpath('sub/deeper/nested.csv'), top]
+        assert file_index.find([self.folder], 'nested') == [nested]
+
+    def test_missing_folder(self):
+        with patch('mcmd.utils.file_index.in_out.warn') as warn:
+            assert file_index.find([self.folder.joinpath('missing')], 'data') == []
+        assert warn.called
+
+    def test_unchanged_folder_is_not_listed(self):
+        self._create('data.csv')
+        self._set_mtime(self.folder, 10 ** 18)
+        file_index.find([self.folder], 'data')
+
+        with patch('mcmd.utils.file_index.os.scandir') as scandir:
+            assert file_index.find([self.folder], 'data') == [self.folder.joinpath('data.csv')]
+        assert not scandir.called
+
+    def test_changed_folder_is_listed_again(self):
+        self.settings['recursive'] = True
+        self._create('sub/data.csv')
+        self._set_mtime(self.folder.joinpath('sub'), 10 ** 18)
+        file_index.find([self.folder], 'data')
+
+        self._create('sub/new.csv')
+        self._set_mtime(self.folder.joinpath('sub'), 10 ** 18 + 1)
+
+        assert file_index.find([self.folder], 'new') == [self.folder.joinpath('sub/new.csv')]
+
+    def test_removed_folder(self):
+        self.settings['recursive'] = True
+        self._create('sub/data.csv')
+        assert file_index.find([self.folder], 'data')
+
+        os.remove(str(self.folder.joinpath('sub/data.csv')))
+        os.rmdir(str(self.folder.joinpath('sub')))
+
+        assert file_index.find([self.folder], 'data') == []
+
+    def test_persisted(self):
+        data, = self._create('data.csv')
+        self._set_mtime(self.folder, 10 ** 18)
+        file_index.find([self.folder], 'data')
+
+        with patch('mcmd.utils.file_index._trees', None), patch('mcmd.utils.file_index.os.scandir') as scandir:
+            assert file_index.find([self.folder], 'data') == [data]
+        assert not scandir.called
+
+    def test_changed_settings(self):
+        self._create('data.csv', 'data.bak')
+        self._set_mtime(self.folder, 10 ** 18)
+        assert len(file_index.find([self.folder], 'data')) == 2
+
+        self.settings['ignore'] = ['*.bak']
+        assert file_index.find([self.folder], 'data') == [self.folder.joinpath('data.csv')]
+
+    def test_racy_folder_is_listed_again(self):
+        self._create('data.csv')
+        with patch('mcmd.utils.file_index._RACY_SECONDS', 3600):
+            file_index.find([self.folder], 'data')
+
+        with patch('mcmd.utils.file_index.os.scandir', wraps=os.scandir) as scandir:
+            file_index.find([self.folder], 'data')
+        assert scandir.called
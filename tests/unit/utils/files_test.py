@@ -103,7 +103,10 @@ class FileUtilsTest(unittest.TestCase):
                 files.select_file([path1], 'tempfile1.csv')
 
     @staticmethod
-    def test_select_path_from_folders():
+    @patch('mcmd.utils.file_index._trees', dict())
+    @patch('mcmd.utils.file_index._save')
+    @patch('mcmd.utils.file_index.config.get', side_effect=lambda *args: {'recursive': False, 'ignore': []}[args[1]])
+    def test_select_path_from_folders(get, save):
         with TemporaryDirectory() as temp_dir1:
             with TemporaryDirectory() as temp_dir2:
                 path1 = Path(temp_dir1).joinpath('tempfile1.txt')
@@ -115,3 +118,9 @@ class FileUtilsTest(unittest.TestCase):
                                                                'tempfile1.txt')
 
                 assert selected_file == path1
+
+    @staticmethod
+    def test_format_size():
+        assert files.format_size(512) == '512 B'
+        assert files.format_size(1536) == '1.5 KB'
+        assert files.format_size(5 * 1024 ** 3) == '5.0 GB'
@@ -0,0 +1,49 @@
+import threading
+import unittest
+
+import pytest
+
+from mcmd.utils.iterables import chunks, prefetched
+
+
+@pytest.mark.unit
+class IterablesTest(unittest.TestCase):
+
+    @staticmethod
+    def test_chunks():
+        assert list(chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(chunks([], 2)) == []
+
+    @staticmethod
+    def test_prefetched():
+        assert list(prefetched(iter(range(5)))) == [0, 1, 2, 3, 4]
+        assert list(prefetched([])) == []
+
+    @staticmethod
+    def test_prefetched_fetches_next_item_while_consuming():
+        fetched = list()
+        second_fetched = threading.Event()
+
+        def produce():
+            for i in range(3):
+                fetched.append(i)
+                if i == 1:
+                    second_fetched.set()
+                yield i
+
+        items = prefetched(produce())
+        assert next(items) == 0
+        # the consumer is still busy with the first item, the second is fetched in the background
+        assert second_fetched.wait(timeout=5)
+        assert list(items) == [1, 2]
+
+    @staticmethod
+    def test_prefetched_raises_errors():
+        def produce():
+            yield 1
+            raise ValueError('failed')
+
+        items = prefetched(produce())
+        assert next(items) == 1
+        with pytest.raises(ValueError):
+            next(items)
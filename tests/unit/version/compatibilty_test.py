@@ -3,6 +3,7 @@ from unittest.mock import patch
 
 import pytest
 
+from mcmd.core import compatibility
 from mcmd.core.compatibility import version, deprecated
 from mcmd.core.errors import McmdError
 
@@ -51,6 +52,19 @@ class CompatibilityTest(unittest.TestCase):
         version_number.return_value = '4.0.0'
         assert get_impl() == '3.0.0'
 
+    @patch('mcmd.molgenis.version.get_version_number')
+    @patch('mcmd.core.compatibility._dispatch_version', None)
+    @patch.dict('mcmd.core.compatibility._dispatch_table', clear=True)
+    def test_version_resolved_once_per_version(self, version_number):
+        with patch('mcmd.core.compatibility._get_closest_version',
+                   wraps=compatibility._get_closest_version) as get_closest_version:
+            version_number.return_value = '2.5.0'
+            assert [get_impl(), get_impl()] == ['2.2.2', '2.2.2']
+            version_number.return_value = '3.5.0'
+            assert [get_impl(), get_impl()] == ['3.0.0', '3.0.0']
+
+        assert get_closest_version.call_count == 2
+
     def test_version_duplicate(self):
         with self.assertRaises(ValueError):
             # noinspection PyShadowingNames
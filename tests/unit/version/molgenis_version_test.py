@@ -1,11 +1,20 @@
 import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, Mock
 
 import pytest
+import requests
 
+from mcmd.core import store
 from mcmd.core.errors import McmdError
 from mcmd.molgenis import version
 
 
+def _get_config(*args):
+    return {('host', 'selected'): 'https://molgenis.org/',
+            ('settings', 'version_check_interval'): 24}[args]
+
+
 @pytest.mark.unit
 class MolgenisVersionTest(unittest.TestCase):
 
@@ -32,3 +41,85 @@ class MolgenisVersionTest(unittest.TestCase):
     def test_extract_version_number_invalid(self):
         with self.assertRaises(McmdError):
             version._extract_version_number('4.0-TESTING')
+
+
+# noinspection PyUnusedLocal
+@pytest.mark.unit
+@patch('mcmd.core.store._persist', Mock())
+@patch('mcmd.config.config.get', side_effect=_get_config)
+class MolgenisVersionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        version._version = None
+        version._version_number = None
+        version._verified_host = None
+        store._store['molgenis_versions'].clear()
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_version_from_cache(self, get_session, get_config):
+        store.set_molgenis_version('https://molgenis.org/',
+                                   store.CachedVersion('8.3.0', fetched_at=datetime.now(), ttl=timedelta(hours=1)))
+
+        assert version.get_version_number() == '8.3.0'
+        assert not get_session.called
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_version_cache_expired(self, get_session, get_config):
+        get_session.return_value.get.return_value.json.return_value = {'molgenisVersion': '8.4.0-SNAPSHOT'}
+        store.set_molgenis_version('https://molgenis.org/',
+                                   store.CachedVersion('8.3.0',
+                                                       fetched_at=datetime.now() - timedelta(hours=2),
+                                                       ttl=timedelta(hours=1)))
+
+        assert version.get_version() == '8.4.0-SNAPSHOT'
+        assert version.get_version_number() == '8.4.0'
+        assert get_session.return_value.get.call_count == 1
+        assert store.get_molgenis_version('https://molgenis.org/').version == '8.4.0-SNAPSHOT'
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_refresh(self, get_session, get_config):
+        get_session.return_value.get.return_value.json.return_value = {'molgenisVersion': '8.4.0'}
+        store.set_molgenis_version('https://molgenis.org/',
+                                   store.CachedVersion('8.3.0', fetched_at=datetime.now(), ttl=timedelta(hours=1)))
+
+        assert version.refresh() == '8.4.0'
+        assert version.get_version_number() == '8.4.0'
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_verify_once(self, get_session, get_config):
+        get_session.return_value.get.return_value.json.return_value = {'molgenisVersion': '8.4.0'}
+        store.set_molgenis_version('https://molgenis.org/',
+                                   store.CachedVersion('8.3.0', fetched_at=datetime.now(), ttl=timedelta(hours=1)))
+        assert version.get_version_number() == '8.3.0'
+
+        version.verify()
+        version.verify()
+
+        assert version.get_version_number() == '8.4.0'
+        assert get_session.return_value.get.call_count == 1
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_verify_unused_version(self, get_session, get_config):
+        version.verify()
+
+        assert not get_session.called
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_fetch_timeout(self, get_session, get_config):
+        get_session.return_value.get.side_effect = requests.exceptions.ReadTimeout('read timed out')
+
+        with pytest.raises(McmdError):
+            version.get_version_number()
+
+    @patch('mcmd.molgenis.version.get_session')
+    def test_verify_once_when_lookup_fails(self, get_session, get_config):
+        get_session.return_value.get.side_effect = requests.exceptions.ReadTimeout('read timed out')
+        store.set_molgenis_version('https://molgenis.org/',
+                                   store.CachedVersion('8.3.0', fetched_at=datetime.now(), ttl=timedelta(hours=1)))
+        assert version.get_version_number() == '8.3.0'
+
+        version.verify()
+        version.verify()
+
+        assert version.get_version_number() == '8.3.0'
+        assert get_session.return_value.get.call_count == 1